@@ -1,22 +1,113 @@
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Iterable, Iterator, List, Optional, Union
 
 
+_SIEVE_LIMIT = 1 << 16
+# Miller-Rabin with the first 12 prime bases (2..37) is exact for every n < 3.18 * 10^23 > 2^64.
+_MR_BASES_64 = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def _sieve(limit: int) -> bytearray:
+    is_p = bytearray([1]) * limit
+    is_p[0:2] = b"\x00\x00"
+    for i in range(2, math.isqrt(limit - 1) + 1):
+        if is_p[i]:
+            is_p[i * i::i] = bytearray(len(range(i * i, limit, i)))
+    return is_p
+
+
+_SIEVE = _sieve(_SIEVE_LIMIT)
+_SMALL_PRIMES = [i for i in range(2, 1000) if _SIEVE[i]]
+
+
+def _strong_probable_prime(n: int, a: int) -> bool:
+    """Miller-Rabin round: is odd n > 2 a strong probable prime to base a?"""
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    x = pow(a, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+
+def _jacobi(a: int, n: int) -> int:
+    a %= n
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def _strong_lucas_probable_prime(n: int) -> bool:
+    """Strong Lucas test with Selfridge parameters (odd n, not a square)."""
+    D = 5
+    while True:
+        j = _jacobi(D, n)
+        if j == -1:
+            break
+        if j == 0 and abs(D) != n:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    P, Q = 1, (1 - D) // 4
+
+    d, s = n + 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    def half(x: int) -> int:
+        x %= n
+        return (x + n if x & 1 else x) // 2
+
+    U, V, Qk = 1, P, Q % n
+    for bit in bin(d)[3:]:
+        U, V = U * V % n, (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+        if bit == "1":
+            U, V = half(P * U + V), half(D * U + P * V)
+            Qk = Qk * Q % n
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V = (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+        if V == 0:
+            return True
+    return False
+
+
+@lru_cache(maxsize=4096)
 def _is_prime(p: int) -> bool:
-    if p <= 1:
+    if p < _SIEVE_LIMIT:
+        return p >= 2 and bool(_SIEVE[p])
+    for q in _SMALL_PRIMES:
+        if p % q == 0:
+            return False
+    if p < 1 << 64:
+        return all(_strong_probable_prime(p, a) for a in _MR_BASES_64)
+    # Baillie-PSW: no counterexample is known.
+    if not _strong_probable_prime(p, 2):
         return False
-    if p <= 3:
-        return True
-    if p % 2 == 0 or p % 3 == 0:
+    if math.isqrt(p) ** 2 == p:
         return False
-    i = 5
-    while i * i <= p:
-        if p % i == 0 or p % (i + 2) == 0:
-            return False
-        i += 6
-    return True
+    return _strong_lucas_probable_prime(p)
 
 
 class FiniteField:
@@ -412,7 +503,14 @@ class _BaseGroup:
 class FiniteFieldAddGroup(_BaseGroup):
     def __init__(self, field: FiniteField):
         self.field = field
-        self.elements = field.elements()
+        self._elements: Optional[List[FFElement]] = None
+
+    @property
+    def elements(self) -> List[FFElement]:
+        # Built on first use: enumerating F_p is impossible for large p.
+        if self._elements is None:
+            self._elements = self.field.elements()
+        return self._elements
 
     def op(self, a: FFElement, b: FFElement) -> FFElement:
         return a + b
@@ -427,7 +525,14 @@ class FiniteFieldAddGroup(_BaseGroup):
 class FiniteFieldMulGroup(_BaseGroup):
     def __init__(self, field: FiniteField):
         self.field = field
-        self.elements = field.nonzero_elements()
+        self._elements: Optional[List[FFElement]] = None
+
+    @property
+    def elements(self) -> List[FFElement]:
+        # Built on first use: enumerating F_p is impossible for large p.
+        if self._elements is None:
+            self._elements = self.field.nonzero_elements()
+        return self._elements
 
     def op(self, a: FFElement, b: FFElement) -> FFElement:
         return a * b
@@ -0,0 +1,212 @@
+"""Throughput / memory benchmark for GF(p) arithmetic.
+
+Run ``python bench.py`` to print the table, ``python bench.py --out results.json``
+to also save the JSON report (``--out -`` writes it to stdout), and compare two
+runs with ``python bench.py --compare old.json new.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import inspect
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from finite_field import FFElement, FiniteField
+from poly import _batch_inverse
+
+PRIMES = [7, 251, 65537, 2**31 - 1, 2**61 - 1]
+# Exponent used by the pow benchmarks (same for every p).
+POW_EXPONENT = 65537
+
+
+def active_implementations() -> Dict[str, str]:
+    """Where each benchmarked method is defined.
+
+    1.py defines several methods more than once; the class body keeps the
+    last definition, so this records the line that is actually running.
+    """
+    out = {}
+    for name in ("__add__", "__mul__", "inverse", "__pow__", "__truediv__"):
+        fn = getattr(FFElement, name)
+        out[f"FFElement.{name}"] = f"1.py:{inspect.getsourcelines(fn)[1]}"
+    return out
+
+
+def _best_time(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _bytes_per_element(make: Callable[[], object], n: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = make()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return (after - before) / n
+
+
+def bench_scalar(p: int, n: int, repeat: int) -> List[dict]:
+    F = FiniteField(p)
+    rng = random.Random(p)
+    xs = [F(rng.randrange(1, p)) for _ in range(n)]
+    ys = [F(rng.randrange(1, p)) for _ in range(n)]
+    ops = {
+        "add": lambda: [a + b for a, b in zip(xs, ys)],
+        "mul": lambda: [a * b for a, b in zip(xs, ys)],
+        "inverse": lambda: [a.inverse() for a in xs],
+        "pow": lambda: [a ** POW_EXPONENT for a in xs],
+        # Montgomery's trick on plain ints: one modular inverse plus 3(n-1) products
+        "batch_inverse": lambda: _batch_inverse(values, p),
+    }
+    values = [a.value for a in xs]
+    bpe = _bytes_per_element(lambda: [F(rng.randrange(1, p)) for _ in range(n)], n)
+    return [_record(p, "scalar", op, n, _best_time(fn, repeat), bpe) for op, fn in ops.items()]
+
+
+def _np_pow(a: np.ndarray, e: int, p: int) -> np.ndarray:
+    result = np.ones_like(a)
+    base = a.copy()
+    while e:
+        if e & 1:
+            result = result * base % p
+        e >>= 1
+        if e:
+            base = base * base % p
+    return result
+
+
+def bench_ndarray(p: int, n: int, repeat: int) -> List[dict]:
+    # Same layout ff_linalg uses: int64 while products fit, else Python ints.
+    rng = np.random.default_rng(p % (2**32))
+    dtype = np.int64 if p < 2**31 else object
+    xs = rng.integers(1, min(p, 2**62), n)
+    ys = rng.integers(1, min(p, 2**62), n)
+    if dtype is object:
+        xs = np.array(xs.tolist(), dtype=object) % p
+        ys = np.array(ys.tolist(), dtype=object) % p
+    ops = {
+        "add": lambda: (xs + ys) % p,
+        "mul": lambda: xs * ys % p,
+        "inverse": lambda: _np_pow(xs, p - 2, p),  # Fermat: a^(p-2), elementwise
+        "pow": lambda: _np_pow(xs, POW_EXPONENT, p),
+    }
+    if dtype is object:
+        prng = random.Random(p)
+        bpe = _bytes_per_element(
+            lambda: np.array([prng.randrange(1, p) for _ in range(n)], dtype=object), n
+        )
+    else:
+        bpe = float(xs.itemsize)
+    name = f"ndarray[{np.dtype(dtype).name}]"
+    return [_record(p, name, op, n, _best_time(fn, repeat), bpe) for op, fn in ops.items()]
+
+
+def _record(p: int, representation: str, op: str, n: int, seconds: float, bpe: float) -> dict:
+    return {
+        "p": p,
+        "bits": p.bit_length(),
+        "representation": representation,
+        "op": op,
+        "n": n,
+        "seconds": seconds,
+        "ops_per_sec": n / seconds if seconds > 0 else float("inf"),
+        "bytes_per_element": bpe,
+    }
+
+
+def run(primes: List[int], n: int, repeat: int) -> dict:
+    results: List[dict] = []
+    for p in primes:
+        results += bench_scalar(p, n, repeat)
+        results += bench_ndarray(p, n, repeat)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "n": n,
+            "repeat": repeat,
+            "pow_exponent": POW_EXPONENT,
+            "implementations": active_implementations(),
+        },
+        "results": results,
+    }
+
+
+def compare(old: dict, new: dict, threshold: float = 0.9) -> List[dict]:
+    """Rows whose ops/sec dropped below ``threshold`` times the old run."""
+    key = lambda r: (r["p"], r["representation"], r["op"])
+    before = {key(r): r for r in old["results"]}
+    regressions = []
+    for r in new["results"]:
+        o = before.get(key(r))
+        if o is None:
+            continue
+        ratio = r["ops_per_sec"] / o["ops_per_sec"]
+        if ratio < threshold:
+            regressions.append({"p": r["p"], "representation": r["representation"],
+                                "op": r["op"], "ratio": ratio})
+    return regressions
+
+
+def _print_table(report: dict) -> None:
+    print(f"{'p':>22} {'representation':>16} {'op':>13} {'ops/sec':>14} {'bytes/elem':>11}")
+    for r in report["results"]:
+        print(f"{r['p']:>22} {r['representation']:>16} {r['op']:>13} "
+              f"{r['ops_per_sec']:>14.4g} {r['bytes_per_element']:>11.1f}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--out", help="also write the JSON report here ('-' for stdout)")
+    ap.add_argument("-n", type=int, default=20000, help="elements per operation")
+    ap.add_argument("--repeat", type=int, default=5, help="best of N timings")
+    ap.add_argument("--primes", type=int, nargs="*", default=PRIMES)
+    ap.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+                    help="report ops/sec regressions between two result files")
+    ap.add_argument("--threshold", type=float, default=0.9)
+    args = ap.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            old = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            new = json.load(f)
+        regressions = compare(old, new, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION p={r['p']} {r['representation']} {r['op']}: {r['ratio']:.2f}x")
+        if not regressions:
+            print("no regressions")
+        sys.exit(1 if regressions else 0)
+
+    report = run(args.primes, args.n, args.repeat)
+    if args.out == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+    _print_table(report)
+    print("active implementations:", report["meta"]["implementations"])
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print("written:", os.path.abspath(args.out))
+
+
+if __name__ == "__main__":
+    main()
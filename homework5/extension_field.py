@@ -0,0 +1,426 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from finite_field import FFElement, FiniteField
+from poly import Poly, _divmod_mod, _mul_mod, _prime_factors
+
+# Orders up to this size get log/antilog tables (and NumPy kernels).
+TABLE_MAX_ORDER = 1 << 16
+
+# Well-known primitive polynomials for GF(2^k), as bit masks (bit i = x^i).
+_DEFAULT_GF2_MODULI: Dict[int, int] = {
+    2: 0x7,
+    3: 0xB,
+    4: 0x13,
+    8: 0x11D,
+    16: 0x1100B,
+}
+
+
+def _bits_to_coeffs(mask: int) -> List[int]:
+    return [(mask >> i) & 1 for i in range(mask.bit_length())]
+
+
+class ExtensionField:
+    """GF(p^k) = GF(p)[x] / (f), f irreducible of degree k.
+
+    Elements are encoded as ints ``sum(c_i * p**i)`` where ``c_i`` are the
+    coefficients of the residue polynomial; for p = 2 this is the usual bit
+    mask representation (GF(2^8) elements are bytes).
+    """
+
+    def __init__(self, base: FiniteField, k: int, modulus: Union[Poly, Sequence[int], None] = None):
+        if not isinstance(base, FiniteField):
+            raise TypeError("base must be a FiniteField")
+        if not isinstance(k, int) or k < 1:
+            raise ValueError("k must be a positive int")
+        self.base = base
+        self.p = base.p
+        self.k = k
+        self.order = self.p ** k
+
+        if modulus is None:
+            f = self._default_modulus()
+        else:
+            f = modulus if isinstance(modulus, Poly) else Poly(base, list(modulus))
+            if f.field is not base:
+                raise ValueError("Cannot mix elements from different fields")
+            if f.degree != k:
+                raise ValueError("modulus must have degree k")
+            f = f.monic()
+            if not f.is_irreducible():
+                raise ValueError("modulus must be irreducible over GF(p)")
+        self.modulus = f
+        self._mod_coeffs = list(f.coeffs)
+        # For p = 2, x^k is reduced by XOR-ing this mask.
+        self._mod_mask = sum(c << i for i, c in enumerate(self._mod_coeffs)) if self.p == 2 else 0
+
+        self._exp: Optional[List[int]] = None
+        self._log: Optional[List[int]] = None
+        self._exp_np: Optional[np.ndarray] = None
+        self._log_np: Optional[np.ndarray] = None
+        self._mul_table: Optional[np.ndarray] = None
+        self._add_table: Optional[np.ndarray] = None
+        if self.order <= TABLE_MAX_ORDER:
+            self._build_tables()
+
+    def _default_modulus(self) -> Poly:
+        if self.p == 2 and self.k in _DEFAULT_GF2_MODULI:
+            return Poly(self.base, _bits_to_coeffs(_DEFAULT_GF2_MODULI[self.k]))
+        # First monic irreducible in lexicographic order of the low coefficients.
+        for n in range(self.order):
+            low = [(n // self.p ** i) % self.p for i in range(self.k)]
+            f = Poly(self.base, low + [1])
+            if f.is_irreducible():
+                return f
+        raise ValueError("no irreducible polynomial found")
+
+    # ------------------------------------------------------------------
+    # Encoding
+    # ------------------------------------------------------------------
+
+    def _encode(self, coeffs: Sequence[int]) -> int:
+        if self.p == 2:
+            return sum(c << i for i, c in enumerate(coeffs))
+        v = 0
+        for c in reversed(coeffs):
+            v = v * self.p + c
+        return v
+
+    def _decode(self, v: int) -> List[int]:
+        out = []
+        while v:
+            v, c = divmod(v, self.p)
+            out.append(c)
+        return out
+
+    # ------------------------------------------------------------------
+    # Scalar arithmetic on encoded ints
+    # ------------------------------------------------------------------
+
+    def _add(self, a: int, b: int) -> int:
+        if self.p == 2:
+            return a ^ b
+        p = self.p
+        out, scale = 0, 1
+        while a or b:
+            a, da = divmod(a, p)
+            b, db = divmod(b, p)
+            out += ((da + db) % p) * scale
+            scale *= p
+        return out
+
+    def _neg(self, a: int) -> int:
+        if self.p == 2:
+            return a
+        return self._encode([(-c) % self.p for c in self._decode(a)])
+
+    def _mul_slow(self, a: int, b: int) -> int:
+        if self.p == 2:
+            # Carry-less multiply with reduction by the modulus mask.
+            r = 0
+            top = 1 << self.k
+            while b:
+                if b & 1:
+                    r ^= a
+                b >>= 1
+                a <<= 1
+                if a & top:
+                    a ^= self._mod_mask
+            return r
+        prod = _mul_mod(self._decode(a), self._decode(b), self.p)
+        return self._encode(_divmod_mod(prod, self._mod_coeffs, self.p)[1])
+
+    def _mul(self, a: int, b: int) -> int:
+        if self._log is not None:
+            if a == 0 or b == 0:
+                return 0
+            return self._exp[self._log[a] + self._log[b]]
+        return self._mul_slow(a, b)
+
+    def _inv(self, a: int) -> int:
+        if a == 0:
+            raise ZeroDivisionError("0 has no multiplicative inverse")
+        if self._log is not None:
+            return self._exp[(self.order - 1) - self._log[a]]
+        return self._pow(a, self.order - 2)
+
+    def _pow(self, a: int, n: int) -> int:
+        if n < 0:
+            return self._pow(self._inv(a), -n)
+        if self._log is not None:
+            if a == 0:
+                return 1 if n == 0 else 0
+            return self._exp[(self._log[a] * n) % (self.order - 1)]
+        result = 1
+        while n:
+            if n & 1:
+                result = self._mul_slow(result, a)
+            n >>= 1
+            if n:
+                a = self._mul_slow(a, a)
+        return result
+
+    def _build_tables(self) -> None:
+        q = self.order
+        n = q - 1
+        factors = _prime_factors(n)
+        for g in range(2 if q > 2 else 1, q):
+            if all(self._pow(g, n // r) != 1 for r in factors):
+                break
+        else:
+            raise ValueError("no primitive element found")  # unreachable for a field
+
+        # exp has length 2(q-1) so exp[log a + log b] needs no reduction.
+        exp = [0] * (2 * n)
+        log = [0] * q
+        x = 1
+        for i in range(n):
+            exp[i] = x
+            log[x] = i
+            x = self._mul_slow(x, g)
+        exp[n:] = exp[:n]
+        # _pow/_mul switch to the tables once these are set.
+        self.generator = g
+        self._exp, self._log = exp, log
+        dtype = np.uint8 if q <= 256 else np.uint16
+        self._exp_np = np.array(exp, dtype=dtype)
+        self._log_np = np.array(log, dtype=np.int32)
+
+    # ------------------------------------------------------------------
+    # Element API (mirrors FiniteField)
+    # ------------------------------------------------------------------
+
+    def element(self, value: Union[int, "EFElement", FFElement, Poly]) -> "EFElement":
+        if isinstance(value, EFElement):
+            if value.field is not self:
+                raise ValueError("Cannot mix elements from different fields")
+            return value
+        if isinstance(value, FFElement):
+            if value.field is not self.base:
+                raise ValueError("Cannot mix elements from different fields")
+            return EFElement(self, value.value)
+        if isinstance(value, Poly):
+            if value.field is not self.base:
+                raise ValueError("Cannot mix elements from different fields")
+            return EFElement(self, self._encode((value % self.modulus).coeffs))
+        if not isinstance(value, int):
+            raise TypeError("Extension field elements must be constructed from int, FFElement or Poly")
+        if not 0 <= value < self.order:
+            raise ValueError(f"encoded element must be in [0, {self.order})")
+        return EFElement(self, value)
+
+    def __call__(self, value: Union[int, "EFElement", FFElement, Poly]) -> "EFElement":
+        return self.element(value)
+
+    @property
+    def zero(self) -> "EFElement":
+        return EFElement(self, 0)
+
+    @property
+    def one(self) -> "EFElement":
+        return EFElement(self, 1)
+
+    def __repr__(self) -> str:
+        return f"GF({self.p}^{self.k})"
+
+    # ------------------------------------------------------------------
+    # Vectorized buffer kernels (orders <= TABLE_MAX_ORDER)
+    # ------------------------------------------------------------------
+
+    @property
+    def dtype(self) -> np.dtype:
+        if self._exp_np is None:
+            raise ValueError(f"array kernels need order <= {TABLE_MAX_ORDER}")
+        return self._exp_np.dtype
+
+    def as_array(self, buf) -> np.ndarray:
+        """View bytes/bytearray/memoryview (or coerce an array) as field symbols.
+
+        A bytearray gives a writable view, so ``addmul`` can update it in place.
+        """
+        dtype = self.dtype
+        if isinstance(buf, (bytes, bytearray, memoryview)):
+            arr = np.frombuffer(buf, dtype=dtype.newbyteorder("<"))
+        else:
+            arr = np.asarray(buf)
+        # every value of the dtype is a symbol only when order fills it (2^8, 2^16)
+        if arr.dtype != dtype or self.order < 1 << (8 * dtype.itemsize):
+            if arr.size and (arr.min() < 0 or arr.max() >= self.order):
+                raise ValueError("array values out of range for this field")
+        if arr.dtype != dtype:
+            arr = arr.astype(dtype)
+        return arr
+
+    def mul_row(self, c: int) -> np.ndarray:
+        """Read-only lookup table ``row[x] = c * x`` for every symbol x."""
+        c = self.element(c).value
+        if self.order <= 256:
+            if self._mul_table is None:
+                xs = np.arange(self.order)
+                logs = self._log_np[xs]
+                table = self._exp_np[logs[:, None] + logs[None, :]]
+                table[0, :] = 0
+                table[:, 0] = 0
+                table.setflags(write=False)
+                self._mul_table = table
+            return self._mul_table[c]
+        xs = np.arange(self.order)
+        if c == 0:
+            row = np.zeros(self.order, dtype=self.dtype)
+        else:
+            row = self._exp_np[self._log_np[xs] + self._log[c]]
+            row[0] = 0
+        row.setflags(write=False)
+        return row
+
+    def add_arrays(self, a, b) -> np.ndarray:
+        a = self.as_array(a)
+        b = self.as_array(b)
+        if self.p == 2:
+            return np.bitwise_xor(a, b)
+        if self.order <= 256:
+            if self._add_table is None:
+                xs = np.arange(self.order)
+                self._add_table = np.array(
+                    [[self._add(int(i), int(j)) for j in xs] for i in xs], dtype=self.dtype
+                )
+            return self._add_table[a, b]
+        # Digit-wise addition mod p.
+        out = np.zeros(np.broadcast(a, b).shape, dtype=np.int64)
+        x, y = a.astype(np.int64), b.astype(np.int64)
+        scale = 1
+        for _ in range(self.k):
+            out += ((x % self.p + y % self.p) % self.p) * scale
+            x //= self.p
+            y //= self.p
+            scale *= self.p
+        return out.astype(self.dtype)
+
+    def mul_arrays(self, a, b) -> np.ndarray:
+        """Element-wise product of two symbol arrays."""
+        a = self.as_array(a)
+        b = self.as_array(b)
+        out = self._exp_np[self._log_np[a] + self._log_np[b]]
+        out[(a == 0) | (b == 0)] = 0
+        return out
+
+    def mul_scalar(self, buf, c: int) -> np.ndarray:
+        """c * buf for every symbol of buf (one table gather)."""
+        return self.mul_row(c)[self.as_array(buf)]
+
+    def addmul(self, dst, src, c: int) -> np.ndarray:
+        """dst += c * src in place; dst must be a writable array or bytearray."""
+        d = self.as_array(dst)
+        if not d.flags.writeable:
+            raise ValueError("dst must be writable")
+        if self.element(c).value == 0:
+            return d
+        prod = self.mul_row(c)[self.as_array(src)]
+        if self.p == 2:
+            np.bitwise_xor(d, prod, out=d)
+        else:
+            d[...] = self.add_arrays(d, prod)
+        return d
+
+    def linear_combination(self, coeffs: Sequence[int], bufs: Sequence) -> np.ndarray:
+        """sum_i coeffs[i] * bufs[i]; e.g. one parity block of a Reed-Solomon code."""
+        if len(coeffs) != len(bufs):
+            raise ValueError("coeffs and bufs must have the same length")
+        if not bufs:
+            raise ValueError("need at least one buffer")
+        out = np.zeros(self.as_array(bufs[0]).shape, dtype=self.dtype)
+        for c, buf in zip(coeffs, bufs):
+            self.addmul(out, buf, c)
+        return out
+
+
+@dataclass(frozen=True)
+class EFElement:
+    field: ExtensionField
+    value: int
+
+    def _coerce(self, other: Union[int, "EFElement", FFElement]) -> "EFElement":
+        return self.field.element(other)
+
+    def __int__(self) -> int:
+        return self.value
+
+    def __repr__(self) -> str:
+        return f"{self.value} (in {self.field})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, EFElement):
+            return False
+        return self.field is other.field and self.value == other.value
+
+    def __hash__(self) -> int:
+        return hash((id(self.field), self.value))
+
+    def to_poly(self) -> Poly:
+        return Poly(self.field.base, self.field._decode(self.value))
+
+    def __neg__(self) -> "EFElement":
+        return EFElement(self.field, self.field._neg(self.value))
+
+    def __add__(self, other: Union[int, "EFElement", FFElement]) -> "EFElement":
+        o = self._coerce(other)
+        return EFElement(self.field, self.field._add(self.value, o.value))
+
+    def __radd__(self, other: Union[int, "EFElement", FFElement]) -> "EFElement":
+        return self.__add__(other)
+
+    def __sub__(self, other: Union[int, "EFElement", FFElement]) -> "EFElement":
+        return self + (-self._coerce(other))
+
+    def __rsub__(self, other: Union[int, "EFElement", FFElement]) -> "EFElement":
+        return self._coerce(other) - self
+
+    def __mul__(self, other: Union[int, "EFElement", FFElement]) -> "EFElement":
+        o = self._coerce(other)
+        return EFElement(self.field, self.field._mul(self.value, o.value))
+
+    def __rmul__(self, other: Union[int, "EFElement", FFElement]) -> "EFElement":
+        return self.__mul__(other)
+
+    def inverse(self) -> "EFElement":
+        return EFElement(self.field, self.field._inv(self.value))
+
+    def __truediv__(self, other: Union[int, "EFElement", FFElement]) -> "EFElement":
+        o = self._coerce(other)
+        return self * o.inverse()
+
+    def __rtruediv__(self, other: Union[int, "EFElement", FFElement]) -> "EFElement":
+        o = self._coerce(other)
+        return o * self.inverse()
+
+    def __pow__(self, n: int) -> "EFElement":
+        if not isinstance(n, int):
+            raise TypeError("Exponent must be int")
+        return EFElement(self.field, self.field._pow(self.value, n))
+
+
+def demo() -> None:
+    GF256 = ExtensionField(FiniteField(2), 8)  # x^8 + x^4 + x^3 + x^2 + 1
+    a = GF256(0x53)
+    b = GF256(0xCA)
+    print("Field:", GF256, "modulus:", GF256.modulus)
+    print("a * b =", a * b)
+    print("a / b =", a / b)
+    print("a ** 254 == a^-1:", a ** 254 == a.inverse())
+
+    data = bytearray(b"erasure coding!!")
+    parity = bytearray(len(data))
+    GF256.addmul(parity, data, 0x1D)
+    print("parity =", bytes(parity).hex())
+
+    F9 = ExtensionField(FiniteField(3), 2)
+    print("Field:", F9, "modulus:", F9.modulus, "generator:", F9(F9.generator))
+
+
+if __name__ == "__main__":
+    demo()
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import numpy as np
+
+from finite_field import FiniteField
+
+# int64 row operations are exact while (p-1)^2 fits; larger p falls back to
+# NumPy object arrays of Python ints (same code path, slower).
+_INT64_MAX_P = 1 << 31
+# Columns per panel in the blocked elimination.
+BLOCK = 128
+
+
+def _dtype(p: int):
+    return np.int64 if p < _INT64_MAX_P else object
+
+
+def _as_matrix(A, p: int) -> np.ndarray:
+    if _dtype(p) is object:
+        # tolist() turns NumPy integers into Python ints, which cannot overflow.
+        M = np.array(np.asarray(A).tolist(), dtype=object)
+    else:
+        M = np.array(A, dtype=np.int64)
+    if M.ndim == 1:
+        M = M.reshape(-1, 1)
+    if M.ndim != 2:
+        raise ValueError("A must be a 2-D matrix")
+    return M % p
+
+
+def _matmul_mod(A: np.ndarray, B: np.ndarray, p: int) -> np.ndarray:
+    """(A @ B) mod p for reduced A, B, exact for every p.
+
+    Small p: float64 BLAS on K-chunks short enough that no partial sum
+    exceeds 2^53. p < 2^31: split both sides into 16-bit limbs first.
+    """
+    if A.dtype == object:
+        return np.dot(A, B) % p
+    K = A.shape[1]
+    if K == 0:
+        return np.zeros((A.shape[0], B.shape[1]), dtype=np.int64)
+
+    def exact_dot(X: np.ndarray, Y: np.ndarray, bound: int) -> np.ndarray:
+        # bound: largest possible single product X[i,k] * Y[k,j]
+        chunk = max(1, (1 << 53) // max(bound, 1))
+        out = np.zeros((X.shape[0], Y.shape[1]), dtype=np.int64)
+        Xf = X.astype(np.float64)
+        Yf = Y.astype(np.float64)
+        for s in range(0, K, chunk):
+            part = Xf[:, s:s + chunk] @ Yf[s:s + chunk]
+            out = (out + part.astype(np.int64) % p) % p
+        return out
+
+    if (p - 1) ** 2 * min(K, 1 << 10) < (1 << 53):
+        return exact_dot(A, B, (p - 1) ** 2)
+
+    A1, A0 = A >> 16, A & 0xFFFF
+    B1, B0 = B >> 16, B & 0xFFFF
+    bound = 1 << 32
+    hh = exact_dot(A1, B1, bound)
+    mid = (exact_dot(A1, B0, bound) + exact_dot(A0, B1, bound)) % p
+    ll = exact_dot(A0, B0, bound)
+    r32 = (1 << 32) % p
+    return (hh * r32 % p + mid * (1 << 16) % p + ll) % p
+
+
+def _inv(a: int, p: int) -> int:
+    return pow(int(a), p - 2, p)
+
+
+def _row_echelon(M: np.ndarray, p: int, ncols: int) -> List[int]:
+    """In-place blocked row reduction of M to row echelon form over GF(p).
+
+    Pivots are searched only in the first ``ncols`` columns; the remaining
+    columns (e.g. right-hand sides) are carried along. Each panel of BLOCK
+    columns is eliminated with vectorized rank-1 updates, and the rows to
+    the right are then updated at once via ``_matmul_mod``.
+    Returns the pivot columns.
+    """
+    m, n = M.shape
+    pivots: List[int] = []
+    r = 0
+    for c0 in range(0, ncols, BLOCK):
+        if r >= m:
+            break
+        c1 = min(c0 + BLOCK, ncols)
+        r0 = r
+        panel = M[r0:, c0:c1]            # view
+        L = np.zeros((m - r0, c1 - c0), dtype=M.dtype)
+        panel_pivots = 0
+        for j in range(c1 - c0):
+            if r >= m:
+                break
+            i = r - r0
+            nz = np.flatnonzero(panel[i:, j])
+            if nz.size == 0:
+                continue
+            piv = i + int(nz[0])
+            if piv != i:
+                M[[r, r0 + piv]] = M[[r0 + piv, r]]
+                L[[i, piv]] = L[[piv, i]]
+            inv = _inv(panel[i, j], p)
+            f = panel[i + 1:, j] * inv % p
+            L[i + 1:, panel_pivots] = f
+            rows = np.flatnonzero(f) + i + 1
+            if rows.size:
+                panel[rows, j:] = (panel[rows, j:] - np.outer(f[rows - i - 1], panel[i, j:])) % p
+            pivots.append(c0 + j)
+            panel_pivots += 1
+            r += 1
+        if panel_pivots == 0 or c1 >= n:
+            continue
+
+        # Trailing update: U12 = L11^{-1} A12, A22 -= L21 @ U12.
+        k = panel_pivots
+        L11 = L[:k, :k].copy()
+        np.fill_diagonal(L11, 1)
+        L21 = L[k:, :k]
+        U12 = _matmul_mod(_inv_triangular(L11, p, lower=True), M[r0:r0 + k, c1:], p)
+        M[r0:r0 + k, c1:] = U12
+        if r0 + k < m:
+            M[r0 + k:, c1:] = (M[r0 + k:, c1:] - _matmul_mod(L21, U12, p)) % p
+    return pivots
+
+
+def _inv_triangular(T: np.ndarray, p: int, lower: bool) -> np.ndarray:
+    """Inverse of a small (block-sized) triangular matrix, row by row."""
+    k = T.shape[0]
+    X = np.eye(k, dtype=T.dtype)
+    for i in (range(k) if lower else range(k - 1, -1, -1)):
+        done = slice(0, i) if lower else slice(i + 1, k)
+        if done.start != done.stop:
+            X[i] = (X[i] - _matmul_mod(T[i:i + 1, done], X[done], p)[0]) % p
+        X[i] = X[i] * _inv(T[i, i], p) % p
+    return X
+
+
+def _solve_upper(U: np.ndarray, B: np.ndarray, p: int) -> np.ndarray:
+    """X with U X = B for square upper-triangular U with nonzero diagonal."""
+    n = U.shape[0]
+    X = B.copy()
+    for b1 in range(n, 0, -BLOCK):
+        b0 = max(0, b1 - BLOCK)
+        if b1 < n:
+            X[b0:b1] = (X[b0:b1] - _matmul_mod(U[b0:b1, b1:], X[b1:], p)) % p
+        X[b0:b1] = _matmul_mod(_inv_triangular(U[b0:b1, b0:b1], p, lower=False), X[b0:b1], p)
+    return X
+
+
+def row_echelon(A, field: FiniteField) -> Tuple[np.ndarray, List[int]]:
+    """Row echelon form of A over field and its pivot columns."""
+    p = field.p
+    M = _as_matrix(A, p)
+    pivots = _row_echelon(M, p, M.shape[1])
+    return M, pivots
+
+
+def rank(A, field: FiniteField) -> int:
+    return len(row_echelon(A, field)[1])
+
+
+def solve(A, b, field: FiniteField) -> np.ndarray:
+    """One solution x of A x = b over field (free variables set to 0).
+
+    b may be a vector or a matrix of right-hand sides; raises ValueError if
+    the system is inconsistent.
+    """
+    p = field.p
+    A = _as_matrix(A, p)
+    b_arr = np.asarray(b)
+    B = _as_matrix(b_arr, p)
+    m, n = A.shape
+    if B.shape[0] != m:
+        raise ValueError("A and b must have the same number of rows")
+
+    M = np.concatenate([A, B], axis=1)
+    pivots = _row_echelon(M, p, n)
+    r = len(pivots)
+    if np.any(M[r:, n:]):
+        raise ValueError("system is inconsistent")
+
+    X = np.zeros((n, B.shape[1]), dtype=M.dtype)
+    if r:
+        X[pivots] = _solve_upper(M[:r][:, pivots], M[:r, n:], p)
+    return X[:, 0] if b_arr.ndim == 1 else X
+
+
+def inverse(A, field: FiniteField) -> np.ndarray:
+    p = field.p
+    A = _as_matrix(A, p)
+    n, m = A.shape
+    if n != m:
+        raise ValueError("A must be square")
+    M = np.concatenate([A, np.eye(n, dtype=A.dtype)], axis=1)
+    pivots = _row_echelon(M, p, n)
+    if len(pivots) < n:
+        raise ValueError("matrix is singular")
+    return _solve_upper(M[:, :n], M[:, n:], p)
+
+
+def nullspace(A, field: FiniteField) -> np.ndarray:
+    """Basis of {x : A x = 0} as the columns of an (n, n - rank) matrix."""
+    p = field.p
+    M, pivots = row_echelon(A, field)
+    n = M.shape[1]
+    r = len(pivots)
+    pivot_set = set(pivots)
+    free = [j for j in range(n) if j not in pivot_set]
+    N = np.zeros((n, len(free)), dtype=M.dtype)
+    if not free:
+        return N
+    N[free, np.arange(len(free))] = 1
+    if r:
+        # U_P x_P + U_F x_F = 0  =>  x_P = -U_P^{-1} U_F
+        N[pivots] = (-_solve_upper(M[:r][:, pivots], M[:r][:, free], p)) % p
+    return N
+
+
+def demo() -> None:
+    F = FiniteField(7)
+    A = np.array([[1, 2, 3],
+                  [4, 5, 6],
+                  [7, 8, 10]])
+    b = np.array([1, 2, 3])
+    print("rank(A) =", rank(A, F))
+    x = solve(A, b, F)
+    print("x =", x, " A@x mod 7 =", A @ x % 7)
+    Ainv = inverse(A, F)
+    print("A^-1 =\n", Ainv)
+    print("A @ A^-1 mod 7 =\n", A @ Ainv % 7)
+
+    S = np.array([[1, 2, 3], [2, 4, 6]])
+    N = nullspace(S, F)
+    print("nullspace basis =\n", N)
+    print("S @ N mod 7 =\n", S @ N % 7)
+
+
+if __name__ == "__main__":
+    demo()
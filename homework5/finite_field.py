@@ -0,0 +1,32 @@
+"""Importable name for homework5/1.py (``from finite_field import FiniteField``)."""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import sys
+
+_MODULE_NAME = "homework5_finite_field_impl"
+
+
+def _load():
+    mod = sys.modules.get(_MODULE_NAME)
+    if mod is not None:
+        return mod
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1.py")
+    spec = importlib.util.spec_from_file_location(_MODULE_NAME, path)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[_MODULE_NAME] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+_impl = _load()
+
+FiniteField = _impl.FiniteField
+FFElement = _impl.FFElement
+FiniteFieldAddGroup = _impl.FiniteFieldAddGroup
+FiniteFieldMulGroup = _impl.FiniteFieldMulGroup
+_is_prime = _impl._is_prime
+
+__all__ = ["FiniteField", "FFElement", "FiniteFieldAddGroup", "FiniteFieldMulGroup"]
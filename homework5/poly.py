@@ -0,0 +1,607 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple, Union
+
+from finite_field import FFElement, FiniteField
+
+# Multiplication strategy by the length of the shorter operand.
+KARATSUBA_THRESHOLD = 32
+NTT_THRESHOLD = 128
+# Below this quotient length, long division beats Newton inversion.
+FAST_DIVISION_THRESHOLD = 64
+# Horner costs len(f) * len(points) multiplications; below this product it
+# beats the subproduct tree on CPython.
+MULTIPOINT_THRESHOLD = 1 << 23
+
+Coeff = Union[int, FFElement]
+
+# p -> (s, w) with p - 1 = 2^s * odd and w a primitive 2^s-th root of unity.
+_NTT_ROOTS: Dict[int, Tuple[int, int]] = {}
+_BITREV: Dict[int, List[int]] = {}
+
+
+def _trim(c: List[int]) -> List[int]:
+    while c and c[-1] == 0:
+        c.pop()
+    return c
+
+
+# ---------------------------------------------------------------------------
+# Multiplication kernels on plain int lists (coefficients low -> high)
+# ---------------------------------------------------------------------------
+
+def _mul_schoolbook(a: Sequence[int], b: Sequence[int]) -> List[int]:
+    if not a or not b:
+        return []
+    out = [0] * (len(a) + len(b) - 1)
+    for i, ai in enumerate(a):
+        if ai == 0:
+            continue
+        for j, bj in enumerate(b):
+            out[i + j] += ai * bj
+    return out
+
+
+def _mul_karatsuba(a: Sequence[int], b: Sequence[int]) -> List[int]:
+    # Works over Z; the caller reduces mod p once at the end.
+    n, m = len(a), len(b)
+    if n == 0 or m == 0:
+        return []
+    if min(n, m) <= KARATSUBA_THRESHOLD:
+        return _mul_schoolbook(a, b)
+    if n < m:
+        a, b, n, m = b, a, m, n
+    if 2 * m <= n:
+        # Very unbalanced: cut the long operand into m-sized blocks.
+        out = [0] * (n + m - 1)
+        for start in range(0, n, m):
+            part = _mul_karatsuba(a[start:start + m], b)
+            for k, v in enumerate(part):
+                out[start + k] += v
+        return out
+
+    h = n // 2
+    a0, a1 = a[:h], a[h:]
+    b0, b1 = b[:h], b[h:]
+    z0 = _mul_karatsuba(a0, b0)
+    z2 = _mul_karatsuba(a1, b1)
+    sa = _add_lists(a0, a1)
+    sb = _add_lists(b0, b1)
+    z1 = _mul_karatsuba(sa, sb)
+    for k, v in enumerate(z0):
+        z1[k] -= v
+    for k, v in enumerate(z2):
+        z1[k] -= v
+
+    out = [0] * (n + m - 1)
+    for k, v in enumerate(z0):
+        out[k] += v
+    for k, v in enumerate(z1):
+        out[k + h] += v
+    for k, v in enumerate(z2):
+        out[k + 2 * h] += v
+    return out
+
+
+def _add_lists(a: Sequence[int], b: Sequence[int]) -> List[int]:
+    if len(a) < len(b):
+        a, b = b, a
+    out = list(a)
+    for i, v in enumerate(b):
+        out[i] += v
+    return out
+
+
+def _ntt_root(p: int) -> Tuple[int, int]:
+    cached = _NTT_ROOTS.get(p)
+    if cached is not None:
+        return cached
+    s, odd = 0, p - 1
+    while odd % 2 == 0:
+        odd //= 2
+        s += 1
+    # Any quadratic non-residue z gives z^odd of order exactly 2^s.
+    z = 2
+    while pow(z, (p - 1) // 2, p) != p - 1:
+        z += 1
+    _NTT_ROOTS[p] = (s, pow(z, odd, p))
+    return _NTT_ROOTS[p]
+
+
+def _bit_reverse_perm(n: int) -> List[int]:
+    perm = _BITREV.get(n)
+    if perm is None:
+        bits = n.bit_length() - 1
+        perm = [0] * n
+        for i in range(1, n):
+            perm[i] = (perm[i >> 1] >> 1) | ((i & 1) << (bits - 1))
+        _BITREV[n] = perm
+    return perm
+
+
+def _ntt(a: List[int], w: int, p: int) -> None:
+    """In-place iterative NTT; len(a) is a power of two and w has order len(a)."""
+    n = len(a)
+    a[:] = [a[i] for i in _bit_reverse_perm(n)]
+
+    # Each butterfly stage runs as list comprehensions over whichever axis is
+    # longer (within a block, or across blocks via strided slices), so the
+    # Python-level loop count per stage is at most sqrt(n).
+    length = 2
+    while length <= n:
+        half = length >> 1
+        w_len = pow(w, n // length, p)
+        ws = [1] * half
+        for k in range(1, half):
+            ws[k] = ws[k - 1] * w_len % p
+        if half >= n // length:
+            for start in range(0, n, length):
+                mid, end = start + half, start + length
+                lo = a[start:mid]
+                t = [x * wk % p for x, wk in zip(a[mid:end], ws)]
+                a[start:mid] = [(u + v) % p for u, v in zip(lo, t)]
+                a[mid:end] = [(u - v) % p for u, v in zip(lo, t)]
+        else:
+            for k in range(half):
+                wk = ws[k]
+                lo = a[k::length]
+                t = [x * wk % p for x in a[k + half::length]]
+                a[k::length] = [(u + v) % p for u, v in zip(lo, t)]
+                a[k + half::length] = [(u - v) % p for u, v in zip(lo, t)]
+        length <<= 1
+
+
+def _ntt_supported(p: int, size: int) -> bool:
+    return p > 2 and (p - 1) % size == 0
+
+
+def _mul_ntt(a: Sequence[int], b: Sequence[int], p: int) -> List[int]:
+    out_len = len(a) + len(b) - 1
+    size = 1
+    while size < out_len:
+        size <<= 1
+    s, root = _ntt_root(p)
+    w = pow(root, (1 << s) // size, p)
+
+    fa = list(a) + [0] * (size - len(a))
+    fb = list(b) + [0] * (size - len(b))
+    _ntt(fa, w, p)
+    _ntt(fb, w, p)
+    for i in range(size):
+        fa[i] = fa[i] * fb[i] % p
+    _ntt(fa, pow(w, p - 2, p), p)
+    inv_size = pow(size, p - 2, p)
+    return [v * inv_size % p for v in fa[:out_len]]
+
+
+def _mul_mod(a: Sequence[int], b: Sequence[int], p: int) -> List[int]:
+    if not a or not b:
+        return []
+    shorter = min(len(a), len(b))
+    if shorter <= KARATSUBA_THRESHOLD:
+        out = _mul_schoolbook(a, b)
+    elif shorter >= NTT_THRESHOLD and _ntt_supported(p, _next_pow2(len(a) + len(b) - 1)):
+        return _trim(_mul_ntt(a, b, p))
+    else:
+        out = _mul_karatsuba(a, b)
+    return _trim([v % p for v in out])
+
+
+def _next_pow2(n: int) -> int:
+    size = 1
+    while size < n:
+        size <<= 1
+    return size
+
+
+# ---------------------------------------------------------------------------
+# Division kernels
+# ---------------------------------------------------------------------------
+
+def _divmod_schoolbook(a: List[int], b: List[int], p: int) -> Tuple[List[int], List[int]]:
+    r = list(a)
+    db = len(b) - 1
+    inv_lead = pow(b[-1], p - 2, p)
+    q = [0] * (len(a) - db)
+    for k in range(len(q) - 1, -1, -1):
+        coef = r[k + db] * inv_lead % p
+        q[k] = coef
+        if coef == 0:
+            continue
+        for j in range(db + 1):
+            r[k + j] = (r[k + j] - coef * b[j]) % p
+    return _trim(q), _trim(r[:db])
+
+
+def _inv_series(f: List[int], n: int, p: int) -> List[int]:
+    """g with f*g = 1 mod x^n (Newton iteration), f[0] != 0."""
+    g = [pow(f[0], p - 2, p)]
+    k = 1
+    while k < n:
+        k = min(2 * k, n)
+        fg = _mul_mod(f[:k], g, p)[:k]
+        # g <- g * (2 - f g) mod x^k
+        corr = [(-v) % p for v in fg] + [0] * (k - len(fg))
+        corr[0] = (corr[0] + 2) % p
+        g = _mul_mod(g, corr, p)[:k]
+    return g + [0] * (n - len(g))
+
+
+def _divmod_mod(a: List[int], b: List[int], p: int) -> Tuple[List[int], List[int]]:
+    if not b:
+        raise ZeroDivisionError("polynomial division by zero")
+    if len(a) < len(b):
+        return [], list(a)
+    qlen = len(a) - len(b) + 1
+    if qlen <= FAST_DIVISION_THRESHOLD or len(b) <= KARATSUBA_THRESHOLD:
+        return _divmod_schoolbook(a, b, p)
+    # rev(q) = rev(a) / rev(b) mod x^qlen
+    ra = a[::-1][:qlen]
+    rb = b[::-1][:qlen]
+    rq = _mul_mod(ra, _inv_series(rb, qlen, p), p)[:qlen]
+    q = _trim((rq + [0] * (qlen - len(rq)))[::-1])
+    qb = _mul_mod(q, b, p)
+    r = [(x - y) % p for x, y in zip(a, qb + [0] * (len(a) - len(qb)))]
+    return q, _trim(r[:len(b) - 1])
+
+
+# ---------------------------------------------------------------------------
+# Polynomial type
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Poly:
+    """Polynomial over GF(p); ``coeffs[i]`` is the coefficient of x^i."""
+
+    field: FiniteField
+    coeffs: Tuple[int, ...]
+
+    def __post_init__(self) -> None:
+        p = self.field.p
+        c = []
+        for v in self.coeffs:
+            if isinstance(v, FFElement):
+                if v.field is not self.field:
+                    raise ValueError("Cannot mix elements from different fields")
+                c.append(v.value)
+            elif isinstance(v, int):
+                c.append(v % p)
+            else:
+                raise TypeError("Polynomial coefficients must be int or FFElement")
+        object.__setattr__(self, "coeffs", tuple(_trim(c)))
+
+    @classmethod
+    def _raw(cls, field: FiniteField, coeffs: List[int]) -> "Poly":
+        # Coefficients already reduced and trimmed.
+        obj = object.__new__(cls)
+        object.__setattr__(obj, "field", field)
+        object.__setattr__(obj, "coeffs", tuple(coeffs))
+        return obj
+
+    @classmethod
+    def zero(cls, field: FiniteField) -> "Poly":
+        return cls._raw(field, [])
+
+    @classmethod
+    def one(cls, field: FiniteField) -> "Poly":
+        return cls._raw(field, [1])
+
+    @classmethod
+    def x(cls, field: FiniteField) -> "Poly":
+        return cls._raw(field, [0, 1])
+
+    @classmethod
+    def from_roots(cls, field: FiniteField, roots: Sequence[Coeff]) -> "Poly":
+        leaves = [[(-int(r)) % field.p, 1] for r in roots]
+        if not leaves:
+            return cls.one(field)
+        return cls._raw(field, _subproduct_tree(leaves, field.p)[-1][0])
+
+    @property
+    def degree(self) -> int:
+        return len(self.coeffs) - 1
+
+    @property
+    def leading(self) -> FFElement:
+        return self.field(self.coeffs[-1] if self.coeffs else 0)
+
+    def is_zero(self) -> bool:
+        return not self.coeffs
+
+    def __len__(self) -> int:
+        return len(self.coeffs)
+
+    def __getitem__(self, i: int) -> FFElement:
+        return self.field(self.coeffs[i] if 0 <= i < len(self.coeffs) else 0)
+
+    def __repr__(self) -> str:
+        if not self.coeffs:
+            return f"0 over {self.field}"
+        terms = []
+        for i in range(len(self.coeffs) - 1, -1, -1):
+            c = self.coeffs[i]
+            if c == 0:
+                continue
+            if i == 0:
+                terms.append(str(c))
+            elif i == 1:
+                terms.append("x" if c == 1 else f"{c}*x")
+            else:
+                terms.append(f"x^{i}" if c == 1 else f"{c}*x^{i}")
+        return " + ".join(terms) + f" over {self.field}"
+
+    def _coerce(self, other: Union["Poly", Coeff]) -> "Poly":
+        if isinstance(other, Poly):
+            if other.field is not self.field:
+                raise ValueError("Cannot mix elements from different fields")
+            return other
+        if isinstance(other, (int, FFElement)):
+            return Poly._raw(self.field, _trim([self.field.element(other).value]))
+        raise TypeError("unsupported operand for Poly")
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Poly):
+            return self.field is other.field and self.coeffs == other.coeffs
+        if isinstance(other, (int, FFElement)):
+            try:
+                return self == self._coerce(other)
+            except ValueError:
+                return False
+        return False
+
+    def __hash__(self) -> int:
+        return hash((id(self.field), self.coeffs))
+
+    def __neg__(self) -> "Poly":
+        p = self.field.p
+        return Poly._raw(self.field, [(-v) % p for v in self.coeffs])
+
+    def __add__(self, other: Union["Poly", Coeff]) -> "Poly":
+        o = self._coerce(other)
+        p = self.field.p
+        a, b = self.coeffs, o.coeffs
+        if len(a) < len(b):
+            a, b = b, a
+        out = list(a)
+        for i, v in enumerate(b):
+            out[i] = (out[i] + v) % p
+        return Poly._raw(self.field, _trim(out))
+
+    def __radd__(self, other: Coeff) -> "Poly":
+        return self.__add__(other)
+
+    def __sub__(self, other: Union["Poly", Coeff]) -> "Poly":
+        return self + (-self._coerce(other))
+
+    def __rsub__(self, other: Coeff) -> "Poly":
+        return self._coerce(other) - self
+
+    def __mul__(self, other: Union["Poly", Coeff]) -> "Poly":
+        o = self._coerce(other)
+        return Poly._raw(self.field, _mul_mod(self.coeffs, o.coeffs, self.field.p))
+
+    def __rmul__(self, other: Coeff) -> "Poly":
+        return self.__mul__(other)
+
+    def __pow__(self, n: int) -> "Poly":
+        if not isinstance(n, int):
+            raise TypeError("Exponent must be int")
+        if n < 0:
+            raise ValueError("Polynomial exponent must be >= 0")
+        result = Poly.one(self.field)
+        base = self
+        while n:
+            if n & 1:
+                result = result * base
+            n >>= 1
+            if n:
+                base = base * base
+        return result
+
+    def __divmod__(self, other: Union["Poly", Coeff]) -> Tuple["Poly", "Poly"]:
+        o = self._coerce(other)
+        q, r = _divmod_mod(list(self.coeffs), list(o.coeffs), self.field.p)
+        return Poly._raw(self.field, q), Poly._raw(self.field, r)
+
+    def __floordiv__(self, other: Union["Poly", Coeff]) -> "Poly":
+        return divmod(self, other)[0]
+
+    def __mod__(self, other: Union["Poly", Coeff]) -> "Poly":
+        return divmod(self, other)[1]
+
+    def __call__(self, x: Coeff) -> FFElement:
+        p = self.field.p
+        xv = self.field.element(x).value
+        acc = 0
+        for c in reversed(self.coeffs):
+            acc = (acc * xv + c) % p
+        return FFElement(self.field, acc)
+
+    def monic(self) -> "Poly":
+        if not self.coeffs:
+            return self
+        p = self.field.p
+        inv = pow(self.coeffs[-1], p - 2, p)
+        return Poly._raw(self.field, [v * inv % p for v in self.coeffs])
+
+    def derivative(self) -> "Poly":
+        p = self.field.p
+        return Poly._raw(self.field, _trim([i * c % p for i, c in enumerate(self.coeffs)][1:]))
+
+    def gcd(self, other: "Poly") -> "Poly":
+        """Monic gcd (Euclid); gcd(0, 0) = 0."""
+        a, b = self, self._coerce(other)
+        while b.coeffs:
+            a, b = b, a % b
+        return a.monic()
+
+    def powmod(self, n: int, modulus: "Poly") -> "Poly":
+        """self ** n mod modulus by square-and-multiply."""
+        if n < 0:
+            raise ValueError("Polynomial exponent must be >= 0")
+        m = self._coerce(modulus)
+        result = Poly.one(self.field) % m
+        base = self % m
+        while n:
+            if n & 1:
+                result = (result * base) % m
+            n >>= 1
+            if n:
+                base = (base * base) % m
+        return result
+
+    def is_irreducible(self) -> bool:
+        """Rabin's test: f | x^(p^k) - x and gcd(f, x^(p^(k/q)) - x) = 1 for primes q | k."""
+        k = self.degree
+        if k < 1:
+            return False
+        if k == 1:
+            return True
+        p = self.field.p
+        x = Poly.x(self.field)
+        f = self.monic()
+        # frob[i] = x^(p^i) mod f
+        frob = [x % f]
+        for _ in range(k):
+            frob.append(frob[-1].powmod(p, f))
+        if frob[k] != x % f:
+            return False
+        for q in _prime_factors(k):
+            if f.gcd(frob[k // q] - x).degree != 0:
+                return False
+        return True
+
+    def evaluate_many(self, xs: Sequence[Coeff]) -> List[FFElement]:
+        """Evaluate at every point of xs via the subproduct tree."""
+        p = self.field.p
+        pts = [self.field.element(x).value for x in xs]
+        return [FFElement(self.field, v) for v in _multipoint_eval(list(self.coeffs), pts, p)]
+
+    @classmethod
+    def interpolate(cls, field: FiniteField, xs: Sequence[Coeff], ys: Sequence[Coeff]) -> "Poly":
+        """The unique polynomial of degree < n through (xs[i], ys[i])."""
+        if len(xs) != len(ys):
+            raise ValueError("xs and ys must have the same length")
+        p = field.p
+        pts = [field.element(x).value for x in xs]
+        vals = [field.element(y).value for y in ys]
+        if len(set(pts)) != len(pts):
+            raise ValueError("interpolation points must be distinct")
+        if not pts:
+            return cls.zero(field)
+
+        tree = _subproduct_tree([[(-x) % p, 1] for x in pts], p)
+        # Lagrange weights: c_i = y_i / M'(x_i)
+        dm = Poly._raw(field, tree[-1][0]).derivative()
+        w = _remainder_tree(list(dm.coeffs), tree, p)
+        inv_w = _batch_inverse(w, p)
+        level = [_trim([y * iw % p]) for y, iw in zip(vals, inv_w)]
+        # Combine bottom-up: r = r_left * M_right + r_right * M_left
+        for depth in range(len(tree) - 1):
+            nodes = tree[depth]
+            nxt = []
+            for i in range(0, len(level) - 1, 2):
+                left = _mul_mod(level[i], nodes[i + 1], p)
+                right = _mul_mod(level[i + 1], nodes[i], p)
+                size = max(len(left), len(right))
+                left += [0] * (size - len(left))
+                right += [0] * (size - len(right))
+                nxt.append(_trim([(x + y) % p for x, y in zip(left, right)]))
+            if len(level) % 2:
+                nxt.append(level[-1])
+            level = nxt
+        return cls._raw(field, level[0])
+
+
+# ---------------------------------------------------------------------------
+# Subproduct tree
+# ---------------------------------------------------------------------------
+
+def _subproduct_tree(leaves: List[List[int]], p: int) -> List[List[List[int]]]:
+    """tree[0] = leaves, tree[-1] = [product]; an odd node is carried up unchanged."""
+    tree = [leaves]
+    while len(tree[-1]) > 1:
+        prev = tree[-1]
+        nxt = [_mul_mod(prev[i], prev[i + 1], p) for i in range(0, len(prev) - 1, 2)]
+        if len(prev) % 2:
+            nxt.append(prev[-1])
+        tree.append(nxt)
+    return tree
+
+
+def _remainder_tree(f: List[int], tree: List[List[List[int]]], p: int) -> List[int]:
+    rems = [_divmod_mod(f, tree[-1][0], p)[1]]
+    for depth in range(len(tree) - 2, -1, -1):
+        nodes = tree[depth]
+        nxt = []
+        for i, r in enumerate(rems):
+            left = 2 * i
+            nxt.append(_divmod_mod(r, nodes[left], p)[1])
+            if left + 1 < len(nodes):
+                nxt.append(_divmod_mod(r, nodes[left + 1], p)[1])
+        rems = nxt
+    # Each leaf is x - a, so the remainder is the constant f(a).
+    return [r[0] if r else 0 for r in rems]
+
+
+def _multipoint_eval(f: List[int], pts: List[int], p: int) -> List[int]:
+    if len(pts) * len(f) <= MULTIPOINT_THRESHOLD:
+        out = []
+        for x in pts:
+            acc = 0
+            for c in reversed(f):
+                acc = (acc * x + c) % p
+            out.append(acc)
+        return out
+    tree = _subproduct_tree([[(-x) % p, 1] for x in pts], p)
+    return _remainder_tree(f, tree, p)
+
+
+def _prime_factors(n: int) -> List[int]:
+    out = []
+    d = 2
+    while d * d <= n:
+        if n % d == 0:
+            out.append(d)
+            while n % d == 0:
+                n //= d
+        d += 1
+    if n > 1:
+        out.append(n)
+    return out
+
+
+def _batch_inverse(vals: List[int], p: int) -> List[int]:
+    # Montgomery's trick: one modular exponentiation for the whole batch.
+    prefix = [1] * (len(vals) + 1)
+    for i, v in enumerate(vals):
+        if v == 0:
+            raise ZeroDivisionError("0 has no multiplicative inverse")
+        prefix[i + 1] = prefix[i] * v % p
+    inv = pow(prefix[-1], p - 2, p)
+    out = [0] * len(vals)
+    for i in range(len(vals) - 1, -1, -1):
+        out[i] = prefix[i] * inv % p
+        inv = inv * vals[i] % p
+    return out
+
+
+def demo() -> None:
+    F = FiniteField(998244353)  # 119 * 2^23 + 1, supports NTT
+    f = Poly(F, [1, 2, 3])
+    g = Poly(F, [5, 0, 1])
+    print("f =", f)
+    print("g =", g)
+    print("f * g =", f * g)
+    print("divmod(f*g + 1, g) =", divmod(f * g + 1, g))
+    print("gcd(f*g, g*(x+1)) =", (f * g).gcd(g * Poly.x(F) + g))
+
+    xs = list(range(1, 9))
+    ys = f.evaluate_many(xs)
+    print("f(1..8) =", [y.value for y in ys])
+    print("interpolate back:", Poly.interpolate(F, xs, ys))
+
+
+if __name__ == "__main__":
+    demo()
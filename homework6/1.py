@@ -3,6 +3,8 @@ from dataclasses import dataclass
 import math
 from typing import List, Optional, Tuple
 
+from predicates import circle_intersection_count, line_circle_count, lines_parallel
+
 EPS = 1e-9
 
 def is_close(a: float, b: float, eps: float = EPS) -> bool:
@@ -84,9 +86,9 @@ class Line:
         # 解聯立：
         # a1 x + b1 y + c1 = 0
         # a2 x + b2 y + c2 = 0
+        if lines_parallel(self, other):
+            return None  # 平行或重合（精確判斷）：此處回傳 None
         d = self.a * other.b - other.a * self.b
-        if abs(d) < EPS:
-            return None  # 平行或重合：此處回傳 None
         x = (self.b * other.c - other.b * self.c) / d
         y = (other.a * self.c - self.a * other.c) / d
         return Point(x, y)
@@ -144,49 +146,44 @@ class Circle:
         # 圓圓交點（幾何解）：
         # 令 d = |C2-C1|
         # 若 d>r1+r2 或 d<|r1-r2| 或 d=0且r1=r2 => 無（或無限多，這裡回空）
+        # 交點個數用 predicates 精確判斷，不用 EPS
+        count = circle_intersection_count(self, other)
+        if count <= 0:
+            return []  # 分離、內含，或重合（無限多交點，這裡不處理）
         c1, c2 = self.center, other.center
         r1, r2 = self.r, other.r
         dx = c2.x - c1.x
         dy = c2.y - c1.y
         d = math.hypot(dx, dy)
 
-        if d < EPS and abs(r1 - r2) < EPS:
-            return []  # 重合：無限多交點，這裡不處理
-        if d > r1 + r2 + EPS:
-            return []
-        if d < abs(r1 - r2) - EPS:
-            return []
-        if d < EPS:
-            return []
-
         # a = (r1^2 - r2^2 + d^2) / (2d)
         a = (r1*r1 - r2*r2 + d*d) / (2*d)
-        # h^2 = r1^2 - a^2
-        h2 = r1*r1 - a*a
-        if h2 < -EPS:
-            return []
-        h = math.sqrt(max(0.0, h2))
 
         # P0 = C1 + a*(C2-C1)/d
         ux = dx / d
         uy = dy / d
         p0 = Point(c1.x + a*ux, c1.y + a*uy)
+        if count == 1:
+            return [p0]  # 相切
 
+        # h^2 = r1^2 - a^2
+        h = math.sqrt(max(0.0, r1*r1 - a*a))
         # 交點 = p0 ± h * (-uy, ux)
         rx = -uy * h
         ry = ux * h
 
         pA = Point(p0.x + rx, p0.y + ry)
         pB = Point(p0.x - rx, p0.y - ry)
-
-        if pA.dist(pB) < 1e-7:
-            return [pA]  # 相切
         return [pA, pB]
 
     def intersection_line(self, line: Line) -> List[Point]:
         # 線圓交點：把直線參數化並代回圓，解二次
         # 取線上一點 p0 與方向向量 v，點為 p(t)=p0 + t v
         # 代入 |p(t)-center|^2 = r^2 => At^2 + Bt + C = 0
+        # 交點個數（判別式的符號）用 predicates 精確判斷
+        count = line_circle_count(line, self)
+        if count == 0:
+            return []
         if abs(line.b) > EPS:
             p0 = Point(0.0, -line.c / line.b)
         else:
@@ -202,9 +199,7 @@ class Circle:
         C = x0*x0 + y0*y0 - self.r*self.r
 
         disc = B*B - 4*A*C
-        if disc < -EPS:
-            return []
-        if abs(disc) <= EPS:
+        if count == 1:
             t = -B / (2*A)
             p = Point(p0.x + t*vx, p0.y + t*vy)
             return [p]
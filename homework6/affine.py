@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import math
+from typing import Union
+
+import numpy as np
+
+from geometry import EPS, Circle, Line, Point, Triangle
+
+# 仿射變換矩陣（齊次座標 3x3）：
+#   [x']   [a b c] [x]
+#   [y'] = [d e f] [y]
+#   [1 ]   [0 0 1] [1]
+# 多個變換先相乘成一個矩陣，再一次套用到點或整批點上；
+# 直線 l = (a, b, c) 用逆轉置變換：l' = l M^{-1}，不必取樣重建。
+
+
+def _about(about: Point = None):
+    if about is None:
+        return 0.0, 0.0
+    return about.x, about.y
+
+
+class Affine:
+    __slots__ = ("m", "_coef")
+
+    def __init__(self, m) -> None:
+        m = np.array(m, dtype=np.float64)
+        if m.shape == (2, 3):
+            m = np.vstack([m, [0.0, 0.0, 1.0]])
+        if m.shape != (3, 3) or not np.allclose(m[2], [0.0, 0.0, 1.0]):
+            raise ValueError("需要 3x3 仿射矩陣（最後一列為 0 0 1）")
+        m.flags.writeable = False
+        self.m = m
+        # 純量路徑用 Python float，避免每次套用都進 NumPy
+        self._coef = tuple(m[:2].ravel().tolist())
+
+    # ---- 基本變換 ----
+    @classmethod
+    def identity(cls) -> "Affine":
+        return cls(np.eye(3))
+
+    @classmethod
+    def translation(cls, dx: float, dy: float) -> "Affine":
+        return cls([[1.0, 0.0, dx], [0.0, 1.0, dy]])
+
+    @classmethod
+    def scaling(cls, s: float, about: Point = None) -> "Affine":
+        # P' = O + s(P-O)
+        ox, oy = _about(about)
+        return cls([[s, 0.0, (1 - s) * ox], [0.0, s, (1 - s) * oy]])
+
+    @classmethod
+    def rotation(cls, theta: float, about: Point = None) -> "Affine":
+        # P' = O + R(theta)(P-O)，cos/sin 只在建立矩陣時算一次
+        ox, oy = _about(about)
+        c, s = math.cos(theta), math.sin(theta)
+        return cls([[c, -s, ox - c * ox + s * oy], [s, c, oy - s * ox - c * oy]])
+
+    # ---- 合成 ----
+    def __matmul__(self, other: "Affine") -> "Affine":
+        # (A @ B)(P) = A(B(P))：先做 B 再做 A
+        if not isinstance(other, Affine):
+            return NotImplemented
+        return Affine(self.m @ other.m)
+
+    def then(self, other: "Affine") -> "Affine":
+        """先做 self 再做 other。"""
+        return other @ self
+
+    # 鏈式寫法與 Triangle.rotate(...).translate(...) 相同順序
+    def translate(self, dx: float, dy: float) -> "Affine":
+        return self.then(Affine.translation(dx, dy))
+
+    def scale(self, s: float, about: Point = None) -> "Affine":
+        return self.then(Affine.scaling(s, about))
+
+    def rotate(self, theta: float, about: Point = None) -> "Affine":
+        return self.then(Affine.rotation(theta, about))
+
+    def inverse(self) -> "Affine":
+        L = self.m[:2, :2]
+        det = L[0, 0] * L[1, 1] - L[0, 1] * L[1, 0]
+        # 相對於矩陣大小判斷（|det| / ||L||^2 約為 1 / 條件數），等比例縮小很多倍的變換仍可逆
+        if not math.isfinite(det) or abs(det) <= EPS * float(np.sum(L * L)):
+            raise ValueError("變換不可逆（行列式接近 0）")
+        Linv = np.array([[L[1, 1], -L[0, 1]], [-L[1, 0], L[0, 0]]]) / det
+        t = -Linv @ self.m[:2, 2]
+        return Affine(np.column_stack([Linv, t]))
+
+    def det(self) -> float:
+        return float(np.linalg.det(self.m[:2, :2]))
+
+    def is_similarity(self) -> bool:
+        # 線性部分為「正交矩陣 × 等比例」：圓仍然是圓
+        L = self.m[:2, :2]
+        G = L.T @ L
+        tol = EPS * max(1.0, abs(G[0, 0]))
+        return abs(G[0, 1]) < tol and abs(G[0, 0] - G[1, 1]) < tol
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Affine) and np.array_equal(self.m, other.m)
+
+    def __hash__(self) -> int:
+        return hash(self.m.tobytes())
+
+    def __repr__(self) -> str:
+        a, b, c, d, e, f = self._coef
+        return f"Affine([[{a:.6g}, {b:.6g}, {c:.6g}], [{d:.6g}, {e:.6g}, {f:.6g}]])"
+
+    # ---- 套用 ----
+    def apply_xy(self, xy: np.ndarray) -> np.ndarray:
+        """整批點 (N, 2) -> (N, 2)。"""
+        xy = np.asarray(xy, dtype=np.float64)
+        return xy @ self.m[:2, :2].T + self.m[:2, 2]
+
+    def apply_lines(self, abc: np.ndarray) -> np.ndarray:
+        """整批直線係數 (N, 3) -> (N, 3)，使用逆轉置 l' = l M^{-1}。"""
+        return np.asarray(abc, dtype=np.float64) @ self.inverse().m
+
+    def apply(self, obj: Union[Point, Line, Circle, Triangle, object]):
+        if isinstance(obj, Point):
+            a, b, c, d, e, f = self._coef
+            return Point(a * obj.x + b * obj.y + c, d * obj.x + e * obj.y + f)
+        if isinstance(obj, Line):
+            a, b, c = self.apply_lines(np.array([obj.a, obj.b, obj.c])).tolist()
+            if abs(a) < EPS and abs(b) < EPS:
+                raise ValueError("變換後直線係數無效")
+            return Line(a, b, c)
+        if isinstance(obj, Circle):
+            if not self.is_similarity():
+                raise ValueError("非相似變換會把圓變成橢圓")
+            return Circle(self.apply(obj.center), obj.r * math.sqrt(abs(self.det())))
+        if isinstance(obj, Triangle):
+            return Triangle(self.apply(obj.a), self.apply(obj.b), self.apply(obj.c))
+        transform = getattr(obj, "transform", None)
+        if transform is not None:
+            # PointArray / LineArray / CircleArray 等陣列型別
+            return transform(self)
+        raise TypeError(f"不支援的型別：{type(obj).__name__}")
+
+    def __call__(self, obj):
+        return self.apply(obj)
+
+
+if __name__ == "__main__":
+    T = Triangle(Point(0, 0), Point(2, 0), Point(0, 1))
+    A = Affine.identity().rotate(math.radians(30), about=Point(0, 0)).translate(3, 1)
+    print("A =", A)
+    print("A(T) =", A(T))
+    print("step by step =", T.rotate(math.radians(30), about=Point(0, 0)).translate(3, 1))
+
+    L = Line.from_points(Point(0, 0), Point(2, 2))
+    print("A(L) =", A(L), " A(L) at A(P):", A(L).eval(A(Point(1, 1))))
+    print("A^-1(A(P)) =", A.inverse()(A(Point(1, 1))))
@@ -0,0 +1,435 @@
+from __future__ import annotations
+
+import math
+from typing import Iterable, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from affine import Affine
+from geometry import EPS, Circle, Line, Point
+from predicates import circle_intersection_count_array, line_circle_count_array
+
+# 陣列版（struct-of-arrays）幾何物件：
+# 座標放在連續的 float64 NumPy 緩衝區，所有運算一次處理整批，
+# 不為每個點建立 Point 物件。與 1.py 的純量類別可互相轉換。
+# 平移 / 縮放 / 旋轉都轉成一個 Affine 矩陣後一次套用（見 affine.py）。
+
+
+class PointArray:
+    """N 個點，xy 形狀為 (N, 2)。"""
+
+    __slots__ = ("xy",)
+
+    def __init__(self, xy) -> None:
+        xy = np.ascontiguousarray(xy, dtype=np.float64)
+        if xy.ndim == 1 and xy.size == 0:
+            xy = xy.reshape(0, 2)
+        if xy.ndim != 2 or xy.shape[1] != 2:
+            raise ValueError("xy 形狀必須是 (N, 2)")
+        self.xy = xy
+
+    @classmethod
+    def from_xy(cls, x, y) -> "PointArray":
+        return cls(np.column_stack([np.asarray(x, dtype=float), np.asarray(y, dtype=float)]))
+
+    @classmethod
+    def from_points(cls, points: Iterable[Point]) -> "PointArray":
+        return cls(np.array([(p.x, p.y) for p in points], dtype=float).reshape(-1, 2))
+
+    def to_points(self) -> List[Point]:
+        return [Point(x, y) for x, y in self.xy.tolist()]
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.xy[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.xy[:, 1]
+
+    def __len__(self) -> int:
+        return self.xy.shape[0]
+
+    def __getitem__(self, idx) -> Union[Point, "PointArray"]:
+        if isinstance(idx, (int, np.integer)):
+            x, y = self.xy[idx]
+            return Point(float(x), float(y))
+        return PointArray(self.xy[idx])
+
+    def __repr__(self) -> str:
+        return f"PointArray(n={len(self)})"
+
+    @staticmethod
+    def _other_xy(other) -> np.ndarray:
+        # Point 或長度 2 的向量 -> (2,)，可廣播；PointArray 或 (N, 2) 陣列 -> (N, 2)
+        if isinstance(other, PointArray):
+            return other.xy
+        if isinstance(other, Point):
+            return np.array([other.x, other.y], dtype=float)
+        try:
+            xy = np.asarray(other, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise TypeError("需要 Point、PointArray 或 (N, 2) 陣列") from None
+        return xy if xy.shape == (2,) else xy.reshape(-1, 2)
+
+    # 向量運算（與 Point 相同語意，可對 Point 廣播）
+    def __add__(self, other: Union[Point, "PointArray"]) -> "PointArray":
+        return PointArray(self.xy + self._other_xy(other))
+
+    def __sub__(self, other: Union[Point, "PointArray"]) -> "PointArray":
+        return PointArray(self.xy - self._other_xy(other))
+
+    def __mul__(self, k) -> "PointArray":  # scalar 或長度 N 的陣列
+        k = np.asarray(k, dtype=float)
+        return PointArray(self.xy * (k[:, None] if k.ndim == 1 else k))
+
+    def dot(self, other: Union[Point, "PointArray"]) -> np.ndarray:
+        o = self._other_xy(other)
+        if o.ndim == 1:
+            return self.xy @ o
+        return np.einsum("ij,ij->i", self.xy, o)
+
+    def norm2(self) -> np.ndarray:
+        return np.einsum("ij,ij->i", self.xy, self.xy)
+
+    def dist(self, other: Union[Point, "PointArray"]) -> np.ndarray:
+        d = self.xy - self._other_xy(other)
+        return np.hypot(d[:, 0], d[:, 1])
+
+    # 幾何變換（整批）
+    def transform(self, A: Affine) -> "PointArray":
+        return PointArray(A.apply_xy(self.xy))
+
+    def translate(self, dx, dy) -> "PointArray":
+        # dx, dy 可為純量或長度 N 的陣列
+        out = self.xy.copy()
+        out[:, 0] += dx
+        out[:, 1] += dy
+        return PointArray(out)
+
+    def scale(self, s: float, about: Point = None) -> "PointArray":
+        return self.transform(Affine.scaling(s, about))
+
+    def rotate(self, theta: float, about: Point = None) -> "PointArray":
+        return self.transform(Affine.rotation(theta, about))
+
+
+class LineArray:
+    """N 條直線 ax + by + c = 0，abc 形狀為 (N, 3)。"""
+
+    __slots__ = ("abc",)
+
+    def __init__(self, abc) -> None:
+        abc = np.ascontiguousarray(abc, dtype=np.float64)
+        if abc.ndim == 1 and abc.size == 0:
+            abc = abc.reshape(0, 3)
+        if abc.ndim != 2 or abc.shape[1] != 3:
+            raise ValueError("abc 形狀必須是 (N, 3)")
+        self.abc = abc
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[Line]) -> "LineArray":
+        return cls(np.array([(L.a, L.b, L.c) for L in lines], dtype=float).reshape(-1, 3))
+
+    @classmethod
+    def from_points(cls, p1: PointArray, p2: PointArray) -> "LineArray":
+        # 與 Line.from_points 相同：法向量 (dy, -dx)
+        d = p2.xy - p1.xy
+        a = d[:, 1]
+        b = -d[:, 0]
+        c = -(a * p1.x + b * p1.y)
+        if np.any((np.abs(a) < EPS) & (np.abs(b) < EPS)):
+            raise ValueError("兩點重合，無法定義直線")
+        return cls(np.column_stack([a, b, c]))
+
+    def to_lines(self) -> List[Line]:
+        return [Line(a, b, c) for a, b, c in self.abc.tolist()]
+
+    @property
+    def a(self) -> np.ndarray:
+        return self.abc[:, 0]
+
+    @property
+    def b(self) -> np.ndarray:
+        return self.abc[:, 1]
+
+    @property
+    def c(self) -> np.ndarray:
+        return self.abc[:, 2]
+
+    def __len__(self) -> int:
+        return self.abc.shape[0]
+
+    def __getitem__(self, idx) -> Union[Line, "LineArray"]:
+        if isinstance(idx, (int, np.integer)):
+            a, b, c = self.abc[idx]
+            return Line(float(a), float(b), float(c))
+        return LineArray(self.abc[idx])
+
+    def __repr__(self) -> str:
+        return f"LineArray(n={len(self)})"
+
+    def direction(self) -> PointArray:
+        return PointArray(np.column_stack([self.b, -self.a]))
+
+    def normal(self) -> PointArray:
+        return PointArray(self.abc[:, :2])
+
+    def eval(self, points: Union[Point, PointArray]) -> np.ndarray:
+        # 第 i 條線在第 i 個點（或同一個 Point）的值
+        xy = PointArray._other_xy(points)
+        if xy.ndim == 1:
+            return self.abc[:, :2] @ xy + self.c
+        return np.einsum("ij,ij->i", self.abc[:, :2], xy) + self.c
+
+    def foot_of_perpendicular(self, points: Union[Point, PointArray]) -> PointArray:
+        # 與 Line.foot_of_perpendicular 逐一相同（見 project_points）
+        return PointArray(project_points(self, points).feet)
+
+    def signed_distance(self, points: Union[Point, PointArray]) -> np.ndarray:
+        return project_points(self, points).signed_dist
+
+    # 幾何變換：係數乘上 M^{-1}（逆轉置），不用兩點取樣重建
+    def transform(self, A: Affine) -> "LineArray":
+        return LineArray(A.apply_lines(self.abc))
+
+    def translate(self, dx: float, dy: float) -> "LineArray":
+        return self.transform(Affine.translation(dx, dy))
+
+    def scale(self, s: float, about: Point = None) -> "LineArray":
+        return self.transform(Affine.scaling(s, about))
+
+    def rotate(self, theta: float, about: Point = None) -> "LineArray":
+        return self.transform(Affine.rotation(theta, about))
+
+
+class CircleArray:
+    """N 個圓，center 形狀為 (N, 2)，r 形狀為 (N,)。"""
+
+    __slots__ = ("center", "r")
+
+    def __init__(self, center, r) -> None:
+        self.center = np.ascontiguousarray(center, dtype=np.float64).reshape(-1, 2)
+        self.r = np.ascontiguousarray(r, dtype=np.float64).reshape(-1)
+        if self.center.shape[0] != self.r.shape[0]:
+            raise ValueError("center 與 r 的數量不同")
+
+    @classmethod
+    def from_circles(cls, circles: Iterable[Circle]) -> "CircleArray":
+        cs = list(circles)
+        return cls(np.array([(c.center.x, c.center.y) for c in cs], dtype=float).reshape(-1, 2),
+                   np.array([c.r for c in cs], dtype=float))
+
+    def to_circles(self) -> List[Circle]:
+        return [Circle(Point(x, y), r) for (x, y), r in zip(self.center.tolist(), self.r.tolist())]
+
+    @property
+    def centers(self) -> PointArray:
+        return PointArray(self.center)
+
+    def __len__(self) -> int:
+        return self.r.shape[0]
+
+    def __getitem__(self, idx) -> Union[Circle, "CircleArray"]:
+        if isinstance(idx, (int, np.integer)):
+            x, y = self.center[idx]
+            return Circle(Point(float(x), float(y)), float(self.r[idx]))
+        return CircleArray(self.center[idx], self.r[idx])
+
+    def __repr__(self) -> str:
+        return f"CircleArray(n={len(self)})"
+
+    def bounds(self) -> np.ndarray:
+        """外接矩形 (N, 4)：xmin, ymin, xmax, ymax。"""
+        return np.column_stack([self.center - self.r[:, None], self.center + self.r[:, None]])
+
+    def contains(self, points: Union[Point, PointArray]) -> np.ndarray:
+        # 第 i 個點是否在第 i 個圓內（含邊界，容許 EPS）
+        d = self.centers.dist(points)
+        return d <= self.r + EPS
+
+    def intersection_circle(self, other: "CircleArray") -> Tuple[np.ndarray, np.ndarray]:
+        """第 i 個圓與 other 第 i 個圓的交點（逐元素，與 Circle.intersection_circle 相同判斷）。
+
+        回傳 (count, pts)：count 形狀 (N,) 為 0/1/2，pts 形狀 (N, 2, 2)，
+        沒有的交點填 NaN；相切時只有 pts[:, 0]。
+        """
+        c1, c2 = self.center, other.center
+        r1, r2 = self.r, other.r
+        dx = c2[:, 0] - c1[:, 0]
+        dy = c2[:, 1] - c1[:, 1]
+        d = np.hypot(dx, dy)
+
+        # 交點個數精確判斷；重合（-1）與純量版一樣當成沒有交點
+        count = np.maximum(circle_intersection_count_array(c1, r1, c2, r2), 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            a = (r1 * r1 - r2 * r2 + d * d) / (2 * d)
+            h = np.where(count == 2, np.sqrt(np.maximum(0.0, r1 * r1 - a * a)), 0.0)
+            ux = dx / d
+            uy = dy / d
+        p0x = c1[:, 0] + a * ux
+        p0y = c1[:, 1] + a * uy
+        rx = -uy * h
+        ry = ux * h
+
+        pts = np.empty((len(d), 2, 2))
+        pts[:, 0, 0] = p0x + rx
+        pts[:, 0, 1] = p0y + ry
+        pts[:, 1, 0] = p0x - rx
+        pts[:, 1, 1] = p0y - ry
+        pts[count < 2, 1] = np.nan
+        pts[count == 0, 0] = np.nan
+        return count, pts
+
+    def intersection_line(self, lines: LineArray) -> LineCircleHits:
+        # 第 i 個圓與第 i 條線（逐元素）；所有配對用 line_circle_intersections
+        return line_circle_intersections(lines, self, outer=False)
+
+    def transform(self, A: Affine) -> "CircleArray":
+        if not A.is_similarity():
+            raise ValueError("非相似變換會把圓變成橢圓")
+        return CircleArray(A.apply_xy(self.center), self.r * math.sqrt(abs(A.det())))
+
+    def translate(self, dx, dy) -> "CircleArray":
+        # dx, dy 可為純量或長度 N 的陣列（同 PointArray.translate）
+        return CircleArray(self.centers.translate(dx, dy).xy, self.r)
+
+    def scale(self, s: float, about: Point = None) -> "CircleArray":
+        # 半徑也乘以 |s|
+        return CircleArray(self.centers.scale(s, about).xy, abs(s) * self.r)
+
+    def rotate(self, theta: float, about: Point = None) -> "CircleArray":
+        return CircleArray(self.centers.rotate(theta, about).xy, self.r)
+
+
+class Projection(NamedTuple):
+    feet: np.ndarray                  # (..., 2) 垂足 H
+    t: np.ndarray                     # H = P - t (a, b)
+    signed_dist: np.ndarray           # (a x + b y + c) / |(a, b)|，法向量那側為正
+    ap2: Optional[np.ndarray] = None  # |AP|^2（有給線上點 A 時）
+    ah2: Optional[np.ndarray] = None  # |AH|^2
+    ph2: Optional[np.ndarray] = None  # |PH|^2
+    residual: Optional[np.ndarray] = None  # (AH^2 + PH^2) - AP^2
+
+
+def _line_coeffs(lines: Union[Line, LineArray]):
+    if isinstance(lines, Line):
+        return lines.a, lines.b, lines.c
+    if isinstance(lines, LineArray):
+        return lines.a, lines.b, lines.c
+    raise TypeError("需要 Line 或 LineArray")
+
+
+def project_points(
+    lines: Union[Line, LineArray],
+    points: Union[Point, PointArray, np.ndarray],
+    on_line: Union[Point, PointArray, np.ndarray, None] = None,
+    outer: bool = False,
+) -> Projection:
+    """整批把點投影到直線上：垂足、有號距離，以及（給定線上點 A 時）畢氏定理誤差。
+
+    - Line 對 N 個點：所有點投影到同一條線
+    - LineArray(N) 對 N 個點：第 i 個點對第 i 條線
+    - outer=True：N 個點對 M 條線的所有配對，結果形狀 (N, M)
+    點可以是 Point、PointArray 或 (N, 2) 陣列。
+    運算順序與 Line.foot_of_perpendicular / verify_pythagorean 相同，結果逐一一致。
+    """
+    a, b, c = _line_coeffs(lines)
+    P = PointArray._other_xy(points)
+    x, y = P[..., 0], P[..., 1]
+    if outer:
+        x, y = x[:, None], y[:, None]
+    denom = a * a + b * b
+    if np.any(np.asarray(denom) < EPS):
+        raise ValueError("直線係數無效")
+    v = a * x + b * y + c
+    t = v / denom
+    hx = x - a * t
+    hy = y - b * t
+    feet = np.stack(np.broadcast_arrays(hx, hy), axis=-1)
+    dist = v / np.sqrt(denom)
+    if on_line is None:
+        return Projection(feet, t, dist)
+
+    # A 對應到直線（outer 時形狀 (M, 2)），P 是線外點
+    A = PointArray._other_xy(on_line)
+    ax, ay = A[..., 0], A[..., 1]
+    apx, apy = ax - x, ay - y
+    ahx, ahy = ax - hx, ay - hy
+    phx, phy = x - hx, y - hy
+    ap2 = apx * apx + apy * apy
+    ah2 = ahx * ahx + ahy * ahy
+    ph2 = phx * phx + phy * phy
+    return Projection(feet, t, dist, ap2, ah2, ph2, (ah2 + ph2) - ap2)
+
+
+def verify_pythagorean_batch(
+    lines: Union[Line, LineArray],
+    points_on_line: Union[Point, PointArray],
+    points_off_line: PointArray,
+) -> Tuple[PointArray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """verify_pythagorean 的整批版本，回傳 (H, AP2, AH2, PH2, (AH2+PH2)-AP2)。"""
+    r = project_points(lines, points_off_line, on_line=points_on_line)
+    return PointArray(r.feet), r.ap2, r.ah2, r.ph2, r.residual
+
+
+class LineCircleHits(NamedTuple):
+    count: np.ndarray   # 交點數 0 / 1 / 2
+    t: np.ndarray       # (..., 2) 參數 t，點 = p0 + t (b, -a)；沒有的填 NaN
+    points: np.ndarray  # (..., 2, 2) 交點座標；沒有的填 NaN
+
+
+def line_circle_intersections(lines: LineArray, circles: CircleArray, outer: bool = True) -> LineCircleHits:
+    """整批線圓交點，與 Circle.intersection_line 相同的參數化與判斷。
+
+    outer=True：M 條線對 C 個圓的所有配對，結果形狀 (M, C, ...)；
+    outer=False：第 i 條線對第 i 個圓。
+    p0 取法與純量版相同（|b| > EPS 時取 x = 0，否則 y = 0），t 值因此可直接對照。
+    """
+    a, b, c = lines.a, lines.b, lines.c
+    cx, cy, r = circles.center[:, 0], circles.center[:, 1], circles.r
+    if np.any((np.abs(a) < EPS) & (np.abs(b) < EPS)):
+        raise ValueError("直線係數無效")
+    has_b = np.abs(b) > EPS
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p0x = np.where(has_b, 0.0, -c / a)
+        p0y = np.where(has_b, -c / b, 0.0)
+    vx, vy = b, -a
+    if outer:
+        p0x, p0y, vx, vy = p0x[:, None], p0y[:, None], vx[:, None], vy[:, None]
+
+    x0, y0 = p0x - cx, p0y - cy
+    A = vx * vx + vy * vy
+    B = 2 * (x0 * vx + y0 * vy)
+    C = x0 * x0 + y0 * y0 - r * r
+    disc = B * B - 4 * A * C
+
+    abc = lines.abc[:, None, :] if outer else lines.abc
+    count = line_circle_count_array(abc, circles.center, r)
+    sqrt_disc = np.sqrt(np.maximum(0.0, disc))
+    t = np.stack([(-B + sqrt_disc) / (2 * A), (-B - sqrt_disc) / (2 * A)], axis=-1)
+    t[count == 1, 0] = (-B / (2 * A))[count == 1]
+    t[count < 2, 1] = np.nan
+    t[count == 0, 0] = np.nan
+    pts = np.stack([p0x[..., None] + t * vx[..., None], p0y[..., None] + t * vy[..., None]], axis=-1)
+    return LineCircleHits(count, t, pts)
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    P = PointArray(rng.uniform(-10, 10, size=(5, 2)))
+    print(P, P.to_points()[:2])
+    P2 = P.rotate(math.radians(30), about=Point(1, 1)).translate(3, 1)
+    print("rotate+translate:", P2[0], "scalar:", P[0].rotate(math.radians(30), Point(1, 1)).translate(3, 1))
+    print("dist to origin:", P.dist(Point(0, 0)))
+
+    L = LineArray.from_lines([Line.from_points(Point(0, 0), Point(2, 2))])
+    print("rotated line:", L.rotate(math.pi / 2)[0])
+
+    C = CircleArray.from_circles([Circle(Point(0, 0), 2), Circle(Point(2, 0), 1)])
+    print("scaled circles:", C.scale(2.0).to_circles())
+
+    # 整批垂足與畢氏定理誤差（對照 1.py 的 verify_pythagorean）
+    L1 = Line.from_points(Point(0, 0), Point(2, 2))
+    H, AP2, AH2, PH2, err = verify_pythagorean_batch(L1, Point(1, 1), P)
+    print("feet:", H[0], "scalar:", L1.foot_of_perpendicular(P[0]), "max |err|:", np.abs(err).max())
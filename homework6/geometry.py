@@ -0,0 +1,34 @@
+"""Importable name for homework6/1.py (``from geometry import Point, Line``)."""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import sys
+
+_MODULE_NAME = "homework6_geometry_impl"
+
+
+def _load():
+    mod = sys.modules.get(_MODULE_NAME)
+    if mod is not None:
+        return mod
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1.py")
+    spec = importlib.util.spec_from_file_location(_MODULE_NAME, path)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[_MODULE_NAME] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+_impl = _load()
+
+EPS = _impl.EPS
+is_close = _impl.is_close
+Point = _impl.Point
+Line = _impl.Line
+Circle = _impl.Circle
+Triangle = _impl.Triangle
+verify_pythagorean = _impl.verify_pythagorean
+
+__all__ = ["EPS", "is_close", "Point", "Line", "Circle", "Triangle", "verify_pythagorean"]
@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import math
+from typing import NamedTuple, Tuple, Union
+
+import numpy as np
+
+from arrays import PointArray
+from geometry import Point
+
+# KD-tree（平衡、隱式編號）：
+# 節點 k 的子節點為 2k+1、2k+2，每個節點只記錄它在重排後點陣列中的區間 [start, end)、
+# 外接矩形、切割軸與切割值，全部是連續的 NumPy 陣列，沒有節點物件。
+# 建樹一次處理同一層的所有節點（中位數切割），查詢也一次處理整批查詢點：
+# 落在同一葉節點的查詢點合成一組，每一層把外接矩形距離超過上界的 (組, 節點) 配對剪掉。
+
+LEAF_SIZE = 16
+# 一次處理的查詢點數，限制配對陣列的大小
+QUERY_BLOCK = 1 << 16
+
+
+def _as_xy(points) -> np.ndarray:
+    if isinstance(points, PointArray):
+        return points.xy
+    if isinstance(points, Point):
+        return np.array([[points.x, points.y]], dtype=float)
+    return np.asarray(points, dtype=np.float64).reshape(-1, 2)
+
+
+class RadiusResult(NamedTuple):
+    indptr: np.ndarray   # (Q+1,) 第 q 個查詢點的結果在 indices[indptr[q]:indptr[q+1]]
+    indices: np.ndarray  # 原始點編號，每個查詢點內依距離由近到遠
+    dist: np.ndarray
+
+
+class KDTree:
+    """(N, 2) 點集的 KD-tree。"""
+
+    def __init__(self, points, leaf_size: int = LEAF_SIZE) -> None:
+        if leaf_size < 2:
+            raise ValueError("leaf_size 至少為 2")
+        xy = np.ascontiguousarray(_as_xy(points), dtype=np.float64)
+        n = len(xy)
+        if n == 0:
+            raise ValueError("點集不能是空的")
+        self.leaf_size = leaf_size
+        self.depth = 0 if n <= leaf_size else math.ceil(math.log2(n / leaf_size))
+        n_nodes = (1 << (self.depth + 1)) - 1
+        n_inner = (1 << self.depth) - 1
+
+        self.start = np.empty(n_nodes, dtype=np.int64)
+        self.end = np.empty(n_nodes, dtype=np.int64)
+        self.bbox = np.empty((n_nodes, 4))           # xmin, ymin, xmax, ymax
+        self.split_dim = np.empty(n_inner, dtype=np.int8)
+        self.split_val = np.empty(n_inner)
+
+        # 兩個軸各自的排序（區間內由小到大），每一層同時處理所有節點：
+        # 在切割軸的排序上取中位數切開，另一軸的排序用 cumsum 做穩定分割，
+        # 整棵樹只需要開始時的兩次 argsort；外接矩形直接取排序的頭尾。
+        x, y = xy[:, 0], xy[:, 1]
+        order = [np.argsort(x, kind="stable"), np.argsort(y, kind="stable")]
+        right = np.empty(n, dtype=bool)
+        pos = np.arange(n, dtype=np.int64)
+        starts = np.zeros(1, dtype=np.int64)
+        ends = np.full(1, n, dtype=np.int64)
+        for level in range(self.depth + 1):
+            first = (1 << level) - 1
+            nodes = slice(first, first + len(starts))
+            ox, oy = order
+            lo = np.column_stack([x[ox[starts]], y[oy[starts]]])
+            hi = np.column_stack([x[ox[ends - 1]], y[oy[ends - 1]]])
+            self.start[nodes], self.end[nodes] = starts, ends
+            self.bbox[nodes] = np.hstack([lo, hi])
+            if level == self.depth:
+                break
+            dim = np.argmax(hi - lo, axis=1)
+            mid = starts + (ends - starts) // 2
+            seg = np.repeat(np.arange(len(starts), dtype=np.int64), ends - starts)
+            s_seg, m_seg = starts[seg], mid[seg]
+            chosen = np.where(dim[seg] == 0, ox, oy)
+            right[chosen] = pos >= m_seg
+            self.split_dim[nodes] = dim
+            self.split_val[nodes] = xy[chosen[mid], dim]
+            for k in (0, 1):
+                o = order[k]
+                f = right[o]
+                nf = ~f
+                zeros = np.cumsum(nf)
+                zeros -= nf
+                left = s_seg + zeros - zeros[s_seg]      # 左側點的新位置
+                new_pos = np.where(f, m_seg + pos - left, left)
+                out = np.empty_like(o)
+                out[new_pos] = o
+                order[k] = out
+            starts = np.column_stack([starts, mid]).ravel()
+            ends = np.column_stack([mid, ends]).ravel()
+
+        perm = order[0]
+        self.index = perm            # 重排後第 i 個點的原始編號
+        self.xy = xy[perm]           # 重排後的座標，葉節點的點連續存放
+
+    def __len__(self) -> int:
+        return len(self.xy)
+
+    def __repr__(self) -> str:
+        return f"KDTree(n={len(self)}, depth={self.depth}, leaf_size={self.leaf_size})"
+
+    # ---- 內部：整批搜尋 ----
+    def _candidates(self, qx: np.ndarray, qy: np.ndarray, r2: np.ndarray, leaf: np.ndarray):
+        """所有 |p - q|^2 <= r2[q] 的 (查詢編號, 點位置, 距離平方)。
+
+        查詢點須已依所在葉節點 leaf 排序。同一葉節點的查詢點合成一組，
+        先用「組的外接矩形 vs 節點外接矩形」往下剪枝，到葉節點才逐點檢查。
+        """
+        x0, y0, x1, y1 = self.bbox.T
+        n_inner = len(self.split_val)
+        gstart = np.flatnonzero(np.r_[True, leaf[1:] != leaf[:-1]])
+        gsize = np.diff(np.r_[gstart, len(qx)])
+        gx0, gx1 = np.minimum.reduceat(qx, gstart), np.maximum.reduceat(qx, gstart)
+        gy0, gy1 = np.minimum.reduceat(qy, gstart), np.maximum.reduceat(qy, gstart)
+        gr2 = np.maximum.reduceat(r2, gstart)
+
+        g = np.arange(len(gstart), dtype=np.int64)
+        node = np.zeros(len(g), dtype=np.int64)
+        for _ in range(self.depth + 1):
+            dx = np.maximum(np.maximum(x0[node] - gx1[g], gx0[g] - x1[node]), 0.0)
+            dy = np.maximum(np.maximum(y0[node] - gy1[g], gy0[g] - y1[node]), 0.0)
+            keep = dx * dx + dy * dy <= gr2[g]
+            g, node = g[keep], node[keep]
+            if node.size == 0 or node[0] >= n_inner:
+                break
+            g = np.repeat(g, 2)
+            node = (2 * node[:, None] + np.array([1, 2])).ravel()
+
+        # (組, 葉) -> (查詢點, 葉)，再用各自的半徑檢查葉節點外接矩形
+        pair = np.repeat(np.arange(len(g), dtype=np.int64), gsize[g])
+        qi = np.arange(pair.size, dtype=np.int64) + np.repeat(gstart[g] - (np.cumsum(gsize[g]) - gsize[g]), gsize[g])
+        node = node[pair]
+        px, py = qx[qi], qy[qi]
+        dx = np.maximum(np.maximum(x0[node] - px, px - x1[node]), 0.0)
+        dy = np.maximum(np.maximum(y0[node] - py, py - y1[node]), 0.0)
+        keep = dx * dx + dy * dy <= r2[qi]
+        qi, node = qi[keep], node[keep]
+
+        # (查詢點, 葉) -> (查詢點, 點)
+        counts = self.end[node] - self.start[node]
+        pair = np.repeat(np.arange(len(node), dtype=np.int64), counts)
+        pos = np.arange(pair.size, dtype=np.int64) + np.repeat(self.start[node] - (np.cumsum(counts) - counts), counts)
+        qi = qi[pair]
+        dx = self.xy[pos, 0] - qx[qi]
+        dy = self.xy[pos, 1] - qy[qi]
+        d2 = dx * dx + dy * dy
+        keep = d2 <= r2[qi]
+        return qi[keep], pos[keep], d2[keep]
+
+    def _descend(self, Q: np.ndarray, level: int) -> np.ndarray:
+        # 每個查詢點往下走 level 層，回傳所在節點
+        node = np.zeros(len(Q), dtype=np.int64)
+        rows = np.arange(len(Q))
+        for _ in range(level):
+            go = Q[rows, self.split_dim[node]] >= self.split_val[node]
+            node = 2 * node + 1 + go
+        return node
+
+    def _knn_bound(self, Q: np.ndarray, node: np.ndarray, k: int) -> np.ndarray:
+        # 查詢點所在、至少有 k 個點的節點附近連續 width 個點中，第 k 近的距離平方：
+        # 任意 k 個點的最遠距離都是 k-NN 距離的上界，所以視窗超出節點也沒關係
+        n = len(self)
+        width = int((self.end[node] - self.start[node]).max())
+        s = np.minimum(self.start[node], n - width)
+        wx = np.lib.stride_tricks.sliding_window_view(self.xy[:, 0], width)[s]
+        wy = np.lib.stride_tricks.sliding_window_view(self.xy[:, 1], width)[s]
+        dx = wx - Q[:, :1]
+        dy = wy - Q[:, 1:]
+        d2 = dx * dx + dy * dy
+        return np.partition(d2, k - 1, axis=1)[:, k - 1]
+
+    # ---- 查詢 ----
+    def query(self, points, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """每個查詢點的 k 個最近點，回傳 (dist, index)，形狀 (Q, k)，由近到遠。"""
+        if not 1 <= k <= len(self):
+            raise ValueError("k 必須介於 1 與點數之間")
+        Q = _as_xy(points)
+        dist = np.empty((len(Q), k))
+        idx = np.empty((len(Q), k), dtype=np.int64)
+        shift = self.depth - min(self.depth, int(math.floor(math.log2(len(self) / k))))
+        # 每個查詢點約有數倍 k 個候選：塊大小隨 k 縮小，候選矩陣的元素數維持在 QUERY_BLOCK 的常數倍
+        step = max(1, QUERY_BLOCK // k)
+        for b0 in range(0, len(Q), step):
+            q = Q[b0:b0 + step]
+            leaf = self._descend(q, self.depth)
+            perm = np.argsort(leaf, kind="stable")
+            q, leaf = q[perm], leaf[perm]
+            node = ((leaf + 1) >> shift) - 1     # 往上 shift 層：至少有 k 個點的祖先
+            qi, pos, d2 = self._candidates(q[:, 0], q[:, 1], self._knn_bound(q, node, k), leaf)
+            # 每個查詢點的候選放進一列（不足補 inf），再逐列取前 k 小
+            order = np.argsort(qi, kind="stable")
+            qi, pos, d2 = qi[order], pos[order], d2[order]
+            col = np.arange(len(qi)) - np.searchsorted(qi, qi, side="left")
+            D = np.full((len(q), int(col.max()) + 1), np.inf)
+            I = np.zeros(D.shape, dtype=np.int64)
+            D[qi, col] = d2
+            I[qi, col] = pos
+            top = np.argsort(D, axis=1)[:, :k]
+            rows = b0 + perm
+            dist[rows] = np.sqrt(np.take_along_axis(D, top, axis=1))
+            idx[rows] = self.index[np.take_along_axis(I, top, axis=1)]
+        return dist, idx
+
+    def query_radius(self, points, r: Union[float, np.ndarray]) -> RadiusResult:
+        """距離 <= r 的所有點（r 可為純量或每個查詢點各自的半徑）。"""
+        Q = _as_xy(points)
+        r = np.broadcast_to(np.asarray(r, dtype=np.float64), (len(Q),))
+        if np.any(r < 0):
+            raise ValueError("半徑不能為負")
+        counts = np.zeros(len(Q), dtype=np.int64)
+        parts_idx, parts_d = [], []
+        for b0 in range(0, len(Q), QUERY_BLOCK):
+            q = Q[b0:b0 + QUERY_BLOCK]
+            rb = r[b0:b0 + QUERY_BLOCK]
+            leaf = self._descend(q, self.depth)
+            perm = np.argsort(leaf, kind="stable")
+            qi, pos, d2 = self._candidates(q[perm, 0], q[perm, 1], rb[perm] * rb[perm], leaf[perm])
+            qi = perm[qi]
+            order = np.lexsort((d2, qi))
+            counts[b0:b0 + len(q)] = np.bincount(qi, minlength=len(q))
+            parts_idx.append(self.index[pos[order]])
+            parts_d.append(np.sqrt(d2[order]))
+        indptr = np.concatenate([[0], np.cumsum(counts)])
+        return RadiusResult(indptr, np.concatenate(parts_idx), np.concatenate(parts_d))
+
+    def closest_pair(self) -> Tuple[int, int, float]:
+        """距離最近的兩個點 (i, j, dist)，i < j。
+
+        先用每個點在所屬葉節點附近的最近距離得到全域上界 δ，再只搜尋距離 <= δ 的配對。
+        """
+        n = len(self)
+        if n < 2:
+            raise ValueError("至少需要 2 個點")
+        first_leaf = len(self.split_val)
+        leaves = np.arange(first_leaf, len(self.start))
+        leaf_of = np.repeat(leaves, self.end[leaves] - self.start[leaves])
+        delta2 = float(self._knn_bound(self.xy, leaf_of, 2).min())
+        if delta2 == 0.0:
+            # 有重複點：距離 0 已是最佳，直接排序找出一組，不必列舉所有重複配對
+            order = np.lexsort((self.index, self.xy[:, 1], self.xy[:, 0]))
+            s = self.xy[order]
+            k = int(np.flatnonzero(np.all(s[1:] == s[:-1], axis=1))[0])
+            i, j = sorted((int(self.index[order[k]]), int(self.index[order[k + 1]])))
+            return i, j, 0.0
+        best_d2, best_q, best_p = np.inf, -1, -1
+        for b0 in range(0, n, QUERY_BLOCK):
+            # 分塊搜尋，記憶體與點數無關；已找到的最短距離同時縮小後面的搜尋半徑
+            q = self.xy[b0:b0 + QUERY_BLOCK]
+            r2 = np.full(len(q), min(delta2, best_d2))
+            qi, pos, d2 = self._candidates(q[:, 0], q[:, 1], r2, leaf_of[b0:b0 + QUERY_BLOCK])
+            other = qi + b0 != pos
+            qi, pos, d2 = qi[other], pos[other], d2[other]
+            if d2.size and d2.min() < best_d2:
+                k = int(np.argmin(d2))
+                best_d2, best_q, best_p = float(d2[k]), b0 + int(qi[k]), int(pos[k])
+        i, j = sorted((int(self.index[best_q]), int(self.index[best_p])))
+        return i, j, float(np.sqrt(best_d2))
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    P = PointArray(rng.uniform(0, 1000, size=(1_000_000, 2)))
+    t0 = time.perf_counter()
+    T = KDTree(P)
+    t1 = time.perf_counter()
+    print(T, f"build {t1 - t0:.2f}s")
+
+    Q = rng.uniform(0, 1000, size=(100_000, 2))
+    t0 = time.perf_counter()
+    dist, idx = T.query(Q, k=5)
+    print(f"5-NN for {len(Q)} queries: {time.perf_counter() - t0:.2f}s")
+    print("query 0:", idx[0], dist[0], "brute:", np.sort(P.dist(Point(*Q[0])))[:5])
+
+    res = T.query_radius(Q[:1000], 2.0)
+    print("radius 2.0: mean neighbours", np.diff(res.indptr).mean())
+    t0 = time.perf_counter()
+    print("closest pair:", T.closest_pair(), f"{time.perf_counter() - t0:.2f}s")
@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from arrays import CircleArray
+from geometry import EPS
+from segments import sweep_intersections
+from spatial_index import GridIndex, all_circle_intersections
+
+# 多行程分塊（tile）執行：
+# 1. 以 GridIndex 把整個範圍切成大格子（tile），外接矩形放大 overlap 後登記到所有覆蓋的 tile；
+# 2. 座標陣列與 tile 清單放進 multiprocessing.shared_memory，worker 啟動時直接對應成 NumPy 陣列，
+#    每個工作只傳 tile 編號，不必 pickle 整批資料；
+# 3. 每個 tile 各自跑原本的單核演算法（all_circle_intersections / sweep_intersections / 投影）；
+# 4. 交點只由「包含它的 tile（含 overlap 邊界）」回報，合併後再依 (i, j, 座標) 去重。
+# tile 之間沒有共享狀態，工作量依 tile 大小由大到小排程，核心數增加時吞吐量接近線性成長。
+
+# 每個 worker 平均分到的 tile 數；多切一些讓大小不均的 tile 也能平均分配
+_TILES_PER_WORKER = 4
+# 投影時每次處理的點 x 線段配對數上限
+_BLOCK = 1 << 22
+# 投影用的細 tile 每軸最多幾格（工作數上限約為平方）
+_MAX_FINE_TILES = 128
+
+
+class TileHits(NamedTuple):
+    i: np.ndarray       # (K,) 第一個物件編號
+    j: np.ndarray       # (K,) 第二個物件編號，i < j
+    points: np.ndarray  # (K, 2) 交點；同一對有兩個交點時佔兩列
+
+
+class NearestSegment(NamedTuple):
+    index: np.ndarray   # (N,) 最近線段編號，超過 max_dist 為 -1
+    dist: np.ndarray    # (N,) 到該線段的距離，沒有時為 inf
+    feet: np.ndarray    # (N, 2) 線段上最近的點，沒有時為 NaN
+
+
+# ---- worker 端 ----
+# worker 啟動時把 shared memory 對應成陣列放在這裡；單行程模式直接放原陣列
+_ARRAYS: Dict[str, np.ndarray] = {}
+_PARAMS: Dict[str, float] = {}
+_HANDLES: List[shared_memory.SharedMemory] = []
+
+
+def _attach(specs: Dict[str, Tuple[str, tuple, str]], params: Dict[str, float]) -> None:
+    _ARRAYS.clear()
+    _PARAMS.clear()
+    _PARAMS.update(params)
+    for name, (shm_name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _HANDLES.append(shm)
+        _ARRAYS[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _tile_ids(t: int) -> np.ndarray:
+    ptr = _ARRAYS["tile_ptr"]
+    return _ARRAYS["tile_ids"][ptr[t]:ptr[t + 1]]
+
+
+def _in_tile(box: Tuple[float, float, float, float], x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    # tile 的範圍 [xmin, xmax) x [ymin, ymax)，四邊各放寬 overlap
+    x0, y0, x1, y1 = box
+    m = _PARAMS["overlap"]
+    return (x >= x0 - m) & (x < x1 + m) & (y >= y0 - m) & (y < y1 + m)
+
+
+def _circle_tile(task: Tuple[int, tuple]):
+    t, box = task
+    ids = _tile_ids(t)
+    res = all_circle_intersections(CircleArray(_ARRAYS["center"][ids], _ARRAYS["r"][ids]))
+    i, j = np.repeat(res.i, 2), np.repeat(res.j, 2)
+    pts = res.points.reshape(-1, 2)
+    ok = ~np.isnan(pts[:, 0])
+    ok[ok] = _in_tile(box, pts[ok, 0], pts[ok, 1])
+    # 同一 tile 內的編號是遞增的，區域編號 i < j 對應到全域仍是 i < j
+    return ids[i[ok]], ids[j[ok]], pts[ok]
+
+
+def _segment_tile(task: Tuple[int, tuple]):
+    t, box = task
+    ids = _tile_ids(t)
+    rows = []
+    for pt, local in sweep_intersections(_ARRAYS["segments"][ids]):
+        for a, b in combinations(local, 2):
+            rows.append((a, b, pt.x, pt.y))
+    if not rows:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty((0, 2))
+    arr = np.array(rows, dtype=float)
+    a, b, pts = arr[:, 0].astype(np.int64), arr[:, 1].astype(np.int64), arr[:, 2:]
+    ok = _in_tile(box, pts[:, 0], pts[:, 1])
+    return ids[a[ok]], ids[b[ok]], pts[ok]
+
+
+def _nearest_tile(task: Tuple[int, tuple, int, int]):
+    t, _, lo, hi = task
+    pid = _ARRAYS["pt_order"][lo:hi]
+    sid = _tile_ids(t)
+    P = _ARRAYS["points"][pid]
+    S = _ARRAYS["segments"][sid]
+    p, d = S[:, :2], S[:, 2:] - S[:, :2]
+    dd = np.einsum("ij,ij->i", d, d)
+    best = np.full(len(pid), -1, dtype=np.int64)
+    dist = np.full(len(pid), np.inf)
+    feet = np.full((len(pid), 2), np.nan)
+    step = max(1, _BLOCK // max(len(sid), 1))
+    for k in range(0, len(pid), step):
+        q = P[k:k + step, None, :]                           # (b, 1, 2)
+        u = np.clip(np.einsum("bsk,sk->bs", q - p, d) / dd, 0.0, 1.0)
+        f = p + u[..., None] * d                             # (b, s, 2)
+        r = np.hypot(q[..., 0] - f[..., 0], q[..., 1] - f[..., 1])
+        m = np.argmin(r, axis=1)
+        rows = np.arange(len(m))
+        dist[k:k + step] = r[rows, m]
+        best[k:k + step] = sid[m]
+        feet[k:k + step] = f[rows, m]
+    far = dist > _PARAMS["max_dist"]
+    best[far], dist[far], feet[far] = -1, np.inf, np.nan
+    return pid, best, dist, feet
+
+
+# ---- 主行程端 ----
+class _SharedArrays:
+    """把陣列複製到 shared memory 區塊；離開 with 時關閉並釋放。"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]) -> None:
+        self.specs: Dict[str, Tuple[str, tuple, str]] = {}
+        self._blocks: List[shared_memory.SharedMemory] = []
+        try:
+            for name, a in arrays.items():
+                a = np.ascontiguousarray(a)
+                shm = shared_memory.SharedMemory(create=True, size=max(a.nbytes, 1))
+                self._blocks.append(shm)
+                np.ndarray(a.shape, dtype=a.dtype, buffer=shm.buf)[...] = a
+                self.specs[name] = (shm.name, a.shape, a.dtype.str)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks.clear()
+
+    def __enter__(self) -> "_SharedArrays":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _dedup(i: np.ndarray, j: np.ndarray, pts: np.ndarray, tol: float = EPS) -> TileHits:
+    # 依 (i, j, x, y) 排序，相鄰且座標差在 tol 內的視為同一個交點（overlap 區重複回報）
+    order = np.lexsort((pts[:, 1], pts[:, 0], j, i))
+    i, j, pts = i[order], j[order], pts[order]
+    dup = np.zeros(len(i), dtype=bool)
+    if len(i) > 1:
+        dup[1:] = ((i[1:] == i[:-1]) & (j[1:] == j[:-1])
+                   & np.all(np.abs(pts[1:] - pts[:-1]) <= tol, axis=1))
+    return TileHits(i[~dup], j[~dup], pts[~dup])
+
+
+class TileExecutor:
+    """以多個行程分塊執行交點與投影計算。
+
+    workers：行程數，預設 os.cpu_count()；1 時在目前行程內依序處理（不建立 shared memory）。
+    tile_size：tile 邊長，預設依範圍與 workers 自動決定。
+    overlap：tile 邊界放寬的距離，落在邊界附近的交點由相鄰 tile 各算一次、合併時去重。
+    """
+
+    def __init__(self, workers: Optional[int] = None, tile_size: Optional[float] = None,
+                 overlap: float = 8 * EPS) -> None:
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        if tile_size is not None and not tile_size > 0:
+            raise ValueError("tile_size 必須為正數")
+        if not overlap >= EPS:
+            raise ValueError("overlap 不可小於 EPS")
+        self.tile_size = tile_size
+        self.overlap = float(overlap)
+
+    def __repr__(self) -> str:
+        return f"TileExecutor(workers={self.workers}, tile_size={self.tile_size})"
+
+    def _grid(self, bounds: np.ndarray, margin: float, fine: bool = False) -> GridIndex:
+        b = bounds.copy()
+        b[:, :2] -= margin
+        b[:, 2:] += margin
+        size = self.tile_size
+        if size is None and len(b):
+            span = max(float(b[:, 2].max() - b[:, 0].min()), float(b[:, 3].max() - b[:, 1].min()))
+            ext = np.maximum(b[:, 2] - b[:, 0], b[:, 3] - b[:, 1])
+            # tile 至少是典型物件的數倍大，避免同一物件被複製到太多 tile
+            size = 4 * float(np.median(ext))
+            if fine:
+                # 投影是 tile 內「點 x 線段」全配對，tile 越小越省，只限制工作數
+                size = max(size, span / _MAX_FINE_TILES)
+            else:
+                size = max(size, span / math.ceil(math.sqrt(_TILES_PER_WORKER * self.workers)))
+        return GridIndex(b, size)
+
+    def _run(self, fn: Callable, arrays: Dict[str, np.ndarray], params: Dict[str, float],
+             tasks: Sequence[tuple]) -> list:
+        if self.workers == 1 or len(tasks) <= 1:
+            _ARRAYS.clear()
+            _ARRAYS.update(arrays)
+            _PARAMS.clear()
+            _PARAMS.update(params)
+            try:
+                return [fn(t) for t in tasks]
+            finally:
+                _ARRAYS.clear()
+        with _SharedArrays(arrays) as shared, \
+                ProcessPoolExecutor(self.workers, initializer=_attach, initargs=(shared.specs, params)) as ex:
+            return list(ex.map(fn, tasks))
+
+    def _tiles(self, grid: GridIndex) -> Tuple[Dict[str, np.ndarray], Dict[str, float], np.ndarray, list]:
+        keys, ptr, ids = grid.cells()
+        arrays = {"tile_ptr": ptr, "tile_ids": ids}
+        params = {"overlap": self.overlap}
+        # 大的 tile 先排，減少最後只剩一個 worker 在跑的時間
+        order = np.argsort(-np.diff(ptr), kind="stable")
+        boxes = grid.cell_box(keys[order]).tolist()
+        tasks = [(int(t), tuple(box)) for t, box in zip(order, boxes)]
+        return arrays, params, keys[order], tasks
+
+    def _merge(self, parts: list) -> TileHits:
+        if not parts:
+            return TileHits(np.empty(0, np.int64), np.empty(0, np.int64), np.empty((0, 2)))
+        i, j, pts = (np.concatenate(x) for x in zip(*parts))
+        return _dedup(i, j, pts.reshape(-1, 2))
+
+    def circle_intersections(self, circles: CircleArray) -> TileHits:
+        """所有圓兩兩交點，每個交點一列（與 all_circle_intersections 展開後相同）。"""
+        grid = self._grid(circles.bounds(), self.overlap)
+        arrays, params, _, tasks = self._tiles(grid)
+        arrays.update(center=circles.center, r=circles.r)
+        return self._merge(self._run(_circle_tile, arrays, params, tasks))
+
+    def segment_intersections(self, segments) -> TileHits:
+        """所有線段兩兩交點（segments 為 (N, 4) 陣列），多線共點時每一對各一列。"""
+        S = np.ascontiguousarray(segments, dtype=np.float64).reshape(-1, 4)
+        bounds = np.column_stack([np.minimum(S[:, 0], S[:, 2]), np.minimum(S[:, 1], S[:, 3]),
+                                  np.maximum(S[:, 0], S[:, 2]), np.maximum(S[:, 1], S[:, 3])])
+        grid = self._grid(bounds, self.overlap)
+        arrays, params, _, tasks = self._tiles(grid)
+        arrays["segments"] = S
+        return self._merge(self._run(_segment_tile, arrays, params, tasks))
+
+    def nearest_segments(self, points, segments, max_dist: float) -> NearestSegment:
+        """每個點投影到 max_dist 內最近的線段（距離相同取編號小者）。
+
+        線段外接矩形放大 max_dist 後登記到 tile，點只屬於所在的 tile，因此不需要去重。
+        """
+        if not max_dist >= 0 or math.isinf(max_dist):
+            raise ValueError("max_dist 必須為有限的非負數")
+        P = np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 2)
+        S = np.ascontiguousarray(segments, dtype=np.float64).reshape(-1, 4)
+        out = NearestSegment(np.full(len(P), -1, dtype=np.int64), np.full(len(P), np.inf),
+                             np.full((len(P), 2), np.nan))
+        if len(P) == 0 or len(S) == 0:
+            return out
+        if np.any(np.hypot(S[:, 2] - S[:, 0], S[:, 3] - S[:, 1]) < EPS):
+            raise ValueError("線段兩端點重合")
+        bounds = np.column_stack([np.minimum(S[:, 0], S[:, 2]), np.minimum(S[:, 1], S[:, 3]),
+                                  np.maximum(S[:, 0], S[:, 2]), np.maximum(S[:, 1], S[:, 3])])
+        grid = self._grid(bounds, max_dist + EPS, fine=True)
+        arrays, params, keys, tasks = self._tiles(grid)
+        params["max_dist"] = float(max_dist)
+
+        # 點依所在 tile 排序；tile 範圍外的點（key = -1）不會被任何工作處理
+        pkey = grid.cell_of(P[:, 0], P[:, 1])
+        order = np.argsort(pkey, kind="stable")
+        sorted_keys = pkey[order]
+        lo = np.searchsorted(sorted_keys, keys, side="left")
+        hi = np.searchsorted(sorted_keys, keys, side="right")
+        tasks = [(t, box, int(a), int(b)) for (t, box), a, b in zip(tasks, lo, hi) if b > a]
+        arrays.update(points=P, segments=S, pt_order=order)
+
+        for pid, best, dist, feet in self._run(_nearest_tile, arrays, params, tasks):
+            out.index[pid] = best
+            out.dist[pid] = dist
+            out.feet[pid] = feet
+        return out
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    n = 200000
+    C = CircleArray(rng.uniform(0, 5000, size=(n, 2)), rng.uniform(0.5, 3.0, size=n))
+    ex = TileExecutor()
+    t0 = time.perf_counter()
+    hits = ex.circle_intersections(C)
+    print(ex, "circle intersection points:", len(hits.i), f"{time.perf_counter() - t0:.2f}s")
+
+    S = rng.uniform(0, 1000, size=(20000, 4))
+    S[:, 2:] = S[:, :2] + rng.uniform(-5, 5, size=(20000, 2))
+    t0 = time.perf_counter()
+    print("segment intersections:", len(ex.segment_intersections(S).i), f"{time.perf_counter() - t0:.2f}s")
+
+    P = rng.uniform(0, 1000, size=(100000, 2))
+    t0 = time.perf_counter()
+    res = ex.nearest_segments(P, S, max_dist=2.0)
+    print("points matched:", int((res.index >= 0).sum()), "/", len(P), f"{time.perf_counter() - t0:.2f}s")
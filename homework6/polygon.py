@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+from typing import Iterable, List
+
+import numpy as np
+
+from affine import Affine
+from arrays import PointArray
+from geometry import EPS, Point, Triangle
+from predicates import orient2d, orient_xy, orientation_array
+
+# 點集與多邊形：
+# 凸包（Andrew monotone chain）、多邊形面積 / 重心、
+# 整批的 point-in-polygon / point-in-triangle 判斷。
+# 所有「在左側 / 右側 / 共線」的判斷都走 predicates.py 的方向判斷（浮點 filter + 精確計算）。
+
+
+def _as_xy(points) -> np.ndarray:
+    if isinstance(points, PointArray):
+        return points.xy
+    if isinstance(points, Point):
+        return np.array([points.x, points.y], dtype=float)
+    arr = np.asarray(points)
+    if arr.dtype == object:  # Point 序列
+        return np.array([(p.x, p.y) for p in points], dtype=float).reshape(-1, 2)
+    return np.asarray(points, dtype=np.float64)
+
+
+def convex_hull(points) -> PointArray:
+    """凸包頂點（逆時針，不含共線點），O(n log n)。"""
+    xy = _as_xy(points).reshape(-1, 2)
+    if len(xy) > 8:
+        # Akl–Toussaint：先丟掉落在四個極點圍成的四邊形內部的點，只排序剩下的
+        quad = xy[[np.argmin(xy[:, 0]), np.argmin(xy[:, 1]), np.argmax(xy[:, 0]), np.argmax(xy[:, 1])]]
+        inside = np.ones(len(xy), dtype=bool)
+        for k in range(4):
+            inside &= orientation_array(quad[k], quad[(k + 1) % 4], xy) > 0
+        xy = xy[~inside]
+    xy = np.unique(xy, axis=0)  # 依 (x, y) 排序並去重
+    if len(xy) <= 2:
+        return PointArray(xy)
+    pts = xy.tolist()
+
+    def chain(seq) -> List[List[float]]:
+        h: List[List[float]] = []
+        for p in seq:
+            while len(h) >= 2:
+                (ax, ay), (bx, by) = h[-2], h[-1]
+                if orient_xy(ax, ay, bx, by, p[0], p[1]) > 0:
+                    break
+                h.pop()  # 右轉或共線
+            h.append(p)
+        return h
+
+    lower = chain(pts)
+    upper = chain(reversed(pts))
+    return PointArray(lower[:-1] + upper[:-1])
+
+
+def triangle_areas(a, b, c) -> np.ndarray:
+    """整批有號面積（逆時針為正）。"""
+    return 0.5 * orient2d(_as_xy(a), _as_xy(b), _as_xy(c))
+
+
+def points_in_triangle(a, b, c, points) -> np.ndarray:
+    """點是否在三角形 abc 內（含邊界）。
+
+    a, b, c 可為 Point 或 (M, 2) 陣列，與 points (N, 2) 互相廣播。
+    """
+    a, b, c, p = _as_xy(a), _as_xy(b), _as_xy(c), _as_xy(points)
+    o1 = orientation_array(a, b, p)
+    o2 = orientation_array(b, c, p)
+    o3 = orientation_array(c, a, p)
+    neg = (o1 < 0) | (o2 < 0) | (o3 < 0)
+    pos = (o1 > 0) | (o2 > 0) | (o3 > 0)
+    # 退化（面積 0）的三角形：三個方向都是 0 時還要落在外接矩形內
+    lo = np.minimum(np.minimum(a, b), c) - EPS
+    hi = np.maximum(np.maximum(a, b), c) + EPS
+    in_box = np.all((p >= lo) & (p <= hi), axis=-1)
+    return ~(neg & pos) & in_box
+
+
+def triangle_contains(tri: Triangle, points) -> np.ndarray:
+    return points_in_triangle(tri.a, tri.b, tri.c, points)
+
+
+def locate_in_mesh(vertices, faces, points, block: int = 1 << 22) -> np.ndarray:
+    """三角網格中每個點所在的三角形編號（第一個包含它的面），不在網格內為 -1。
+
+    vertices (V, 2)、faces (F, 3) 頂點索引；每次處理 N x (block / N) 個點-面配對。
+    """
+    V = _as_xy(vertices)
+    F = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    P = _as_xy(points).reshape(-1, 2)
+    out = np.full(len(P), -1, dtype=np.int64)
+    if len(P) == 0:
+        return out
+    step = max(1, block // len(P))
+    for f0 in range(0, len(F), step):
+        f = F[f0:f0 + step]
+        a, b, c = V[f[:, 0]], V[f[:, 1]], V[f[:, 2]]
+        hit = points_in_triangle(a[None], b[None], c[None], P[:, None])  # (N, f)
+        todo = (out < 0) & hit.any(axis=1)
+        out[todo] = f0 + np.argmax(hit[todo], axis=1)
+        if np.all(out >= 0):
+            break
+    return out
+
+
+class Polygon:
+    """簡單多邊形，頂點依序存成 (N, 2)，首尾不重複。"""
+
+    __slots__ = ("xy",)
+
+    def __init__(self, vertices) -> None:
+        xy = np.ascontiguousarray(_as_xy(vertices), dtype=np.float64).reshape(-1, 2)
+        if len(xy) >= 2 and np.all(np.abs(xy[0] - xy[-1]) <= EPS):
+            xy = xy[:-1]
+        if len(xy) < 3:
+            raise ValueError("多邊形至少需要 3 個頂點")
+        self.xy = xy
+
+    @classmethod
+    def from_points(cls, points: Iterable[Point]) -> "Polygon":
+        return cls(np.array([(p.x, p.y) for p in points], dtype=float))
+
+    @classmethod
+    def convex_hull(cls, points) -> "Polygon":
+        return cls(convex_hull(points).xy)
+
+    def to_points(self) -> List[Point]:
+        return [Point(x, y) for x, y in self.xy.tolist()]
+
+    def __len__(self) -> int:
+        return self.xy.shape[0]
+
+    def __repr__(self) -> str:
+        return f"Polygon(n={len(self)})"
+
+    def _edges(self):
+        return self.xy, np.roll(self.xy, -1, axis=0)
+
+    def signed_area(self) -> float:
+        # 鞋帶公式；先平移到第一個頂點，減少大座標的相消誤差
+        d = self.xy - self.xy[0]
+        x, y = d[:, 0], d[:, 1]
+        return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+    def area(self) -> float:
+        return abs(self.signed_area())
+
+    def perimeter(self) -> float:
+        p, q = self._edges()
+        return float(np.hypot(*(q - p).T).sum())
+
+    def centroid(self) -> Point:
+        # C = 1/(6A) * sum (p_i + p_{i+1}) * cross(p_i, p_{i+1})
+        o = self.xy[0]
+        p = self.xy - o
+        q = np.roll(p, -1, axis=0)
+        cross = p[:, 0] * q[:, 1] - q[:, 0] * p[:, 1]
+        A = 0.5 * cross.sum()
+        if abs(A) < EPS:
+            raise ValueError("多邊形面積為 0，沒有重心")
+        c = ((p + q) * cross[:, None]).sum(axis=0) / (6 * A)
+        return Point(float(c[0] + o[0]), float(c[1] + o[1]))
+
+    def is_convex(self) -> bool:
+        p, q = self._edges()
+        o = orientation_array(p, q, np.roll(q, -1, axis=0))
+        return not (np.any(o > 0) and np.any(o < 0))
+
+    def contains(self, points) -> np.ndarray:
+        """整批 point-in-polygon（含邊界），回傳 bool 陣列。
+
+        射線法：對每條邊整批處理所有點；
+        向上的邊若點在左側、向下的邊若點在右側，就算一次穿越。
+        """
+        P = _as_xy(points).reshape(-1, 2)
+        px, py = P[:, 0], P[:, 1]
+        inside = np.zeros(len(P), dtype=bool)
+        on_edge = np.zeros(len(P), dtype=bool)
+        for (x1, y1), (x2, y2) in zip(*(e.tolist() for e in self._edges())):
+            o = orientation_array((x1, y1), (x2, y2), P)
+            up = (y1 <= py) & (py < y2)
+            down = (y2 <= py) & (py < y1)
+            inside ^= (up & (o > 0)) | (down & (o < 0))
+            on_edge |= ((o == 0)
+                        & (px >= min(x1, x2) - EPS) & (px <= max(x1, x2) + EPS)
+                        & (py >= min(y1, y2) - EPS) & (py <= max(y1, y2) + EPS))
+        return inside | on_edge
+
+    # 幾何變換（與 arrays.py 相同，一次套用 Affine）
+    def transform(self, A: Affine) -> "Polygon":
+        return Polygon(A.apply_xy(self.xy))
+
+    def translate(self, dx: float, dy: float) -> "Polygon":
+        return self.transform(Affine.translation(dx, dy))
+
+    def scale(self, s: float, about: Point = None) -> "Polygon":
+        return self.transform(Affine.scaling(s, about))
+
+    def rotate(self, theta: float, about: Point = None) -> "Polygon":
+        return self.transform(Affine.rotation(theta, about))
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    P = PointArray(rng.normal(size=(100000, 2)))
+    H = Polygon.convex_hull(P)
+    print("hull:", H, "area:", H.area(), "centroid:", H.centroid())
+    print("all points inside hull:", bool(H.contains(P).all()))
+
+    sq = Polygon([(0, 0), (2, 0), (2, 2), (0, 2)])
+    print("square area / centroid:", sq.area(), sq.centroid())
+    print("contains:", sq.contains([(1, 1), (2, 1), (3, 1)]))
+
+    T = Triangle(Point(0, 0), Point(2, 0), Point(0, 1))
+    print("in triangle:", triangle_contains(T, [(0.5, 0.25), (1, 0.5), (1, 1)]))
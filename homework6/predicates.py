@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+from fractions import Fraction
+from typing import TYPE_CHECKING, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:   # 1.py 會匯入本模組，執行期不反向匯入 geometry
+    from geometry import Circle, Line, Point
+
+# 幾何判斷（adaptive precision）：
+# 先用浮點數算行列式，再用誤差上界（Shewchuk 的 filter）檢查符號是否可信；
+# 只有落在誤差範圍內的少數情況才改用精確計算（純量用 Fraction，整批用整數陣列）。
+# 因此結果與輸入的座標大小無關、每次都相同，速度仍接近純浮點數。
+#
+# 方向判斷（orientation）：
+#   cross = (b - a) x (c - a)
+#   > 0：a, b, c 逆時針（c 在 ab 左側）
+#   < 0：順時針
+#   = 0：三點共線（精確）
+# 圓內判斷（in-circle）：a, b, c 逆時針時，
+#   > 0：d 在外接圓內；< 0：圓外；= 0：四點共圓
+# 交點判斷：兩直線是否平行、線圓 / 圓圓交點個數（1.py 與 arrays.py 的交點計算都先問這裡）
+
+_U = np.finfo(np.float64).eps / 2  # 2^-53
+_ORIENT_BOUND = (3 + 16 * _U) * _U
+_INCIRCLE_BOUND = (10 + 96 * _U) * _U
+_CIRCLE_BOUND = 16 * _U
+
+
+def _sign(v) -> int:
+    return int(v > 0) - int(v < 0)
+
+
+# ---- 純量 ----
+def _orient_exact(ax, ay, bx, by, cx, cy) -> int:
+    ax, ay, bx, by, cx, cy = map(Fraction, (ax, ay, bx, by, cx, cy))
+    return _sign((ax - cx) * (by - cy) - (ay - cy) * (bx - cx))
+
+
+def orient_xy(ax: float, ay: float, bx: float, by: float, cx: float, cy: float) -> int:
+    """orientation 的座標版本（給內層迴圈用，避免建立 Point）。"""
+    left = (ax - cx) * (by - cy)
+    right = (ay - cy) * (bx - cx)
+    det = left - right
+    if abs(det) > _ORIENT_BOUND * (abs(left) + abs(right)):
+        return 1 if det > 0 else -1
+    return _orient_exact(ax, ay, bx, by, cx, cy)
+
+
+def orientation(a: Point, b: Point, c: Point) -> int:
+    """單一組三點的方向：1 逆時針、-1 順時針、0 共線。"""
+    return orient_xy(a.x, a.y, b.x, b.y, c.x, c.y)
+
+
+def _incircle_exact(ax, ay, bx, by, cx, cy, dx, dy) -> int:
+    ax, ay, bx, by, cx, cy, dx, dy = map(Fraction, (ax, ay, bx, by, cx, cy, dx, dy))
+    adx, ady, bdx, bdy, cdx, cdy = ax - dx, ay - dy, bx - dx, by - dy, cx - dx, cy - dy
+    return _sign((adx * adx + ady * ady) * (bdx * cdy - cdx * bdy)
+                 + (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy)
+                 + (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady))
+
+
+def _incircle_float(ax, ay, bx, by, cx, cy, dx, dy):
+    adx, ady, bdx, bdy, cdx, cdy = ax - dx, ay - dy, bx - dx, by - dy, cx - dx, cy - dy
+    bdxcdy, cdxbdy = bdx * cdy, cdx * bdy
+    cdxady, adxcdy = cdx * ady, adx * cdy
+    adxbdy, bdxady = adx * bdy, bdx * ady
+    alift = adx * adx + ady * ady
+    blift = bdx * bdx + bdy * bdy
+    clift = cdx * cdx + cdy * cdy
+    det = alift * (bdxcdy - cdxbdy) + blift * (cdxady - adxcdy) + clift * (adxbdy - bdxady)
+    permanent = ((abs(bdxcdy) + abs(cdxbdy)) * alift
+                 + (abs(cdxady) + abs(adxcdy)) * blift
+                 + (abs(adxbdy) + abs(bdxady)) * clift)
+    return det, _INCIRCLE_BOUND * permanent
+
+
+def incircle(a: Point, b: Point, c: Point, d: Point) -> int:
+    """d 相對於 a, b, c 外接圓的位置（a, b, c 逆時針）：1 圓內、-1 圓外、0 圓上。"""
+    args = (a.x, a.y, b.x, b.y, c.x, c.y, d.x, d.y)
+    det, bound = _incircle_float(*args)
+    if abs(det) > bound:
+        return 1 if det > 0 else -1
+    return _incircle_exact(*args)
+
+
+def circle_intersection_count(c1: Circle, c2: Circle) -> int:
+    """兩圓交點個數 0 / 1（相切）/ 2，精確判斷；圓心與半徑都相同時回傳 -1（無限多）。
+
+    比較 d^2 與 (r1 + r2)^2、(r1 - r2)^2，不開根號、不用固定 EPS。
+    """
+    x1, y1, r1 = c1.center.x, c1.center.y, c1.r
+    x2, y2, r2 = c2.center.x, c2.center.y, c2.r
+    dx, dy = x2 - x1, y2 - y1
+    d2 = dx * dx + dy * dy
+    far = d2 - (r1 + r2) ** 2        # > 0：分離
+    near = d2 - (r1 - r2) ** 2       # < 0：內含
+    bound = _CIRCLE_BOUND * (d2 + (abs(r1) + abs(r2)) ** 2)
+    if abs(far) <= bound or abs(near) <= bound:
+        X1, Y1, R1, X2, Y2, R2 = map(Fraction, (x1, y1, r1, x2, y2, r2))
+        d2 = (X2 - X1) ** 2 + (Y2 - Y1) ** 2
+        far = d2 - (R1 + R2) ** 2
+        near = d2 - (R1 - R2) ** 2
+        if d2 == 0 and R1 == R2:
+            return -1
+    if far > 0 or near < 0:
+        return 0
+    if far == 0 or near == 0:
+        return 1
+    return 2
+
+
+def lines_parallel(l1: Line, l2: Line) -> bool:
+    """兩直線是否平行或重合：法向量外積 a1 b2 - a2 b1 精確為 0。"""
+    left, right = l1.a * l2.b, l2.a * l1.b
+    if abs(left - right) > _ORIENT_BOUND * (abs(left) + abs(right)):
+        return False
+    a1, b1, a2, b2 = map(Fraction, (l1.a, l1.b, l2.a, l2.b))
+    return a1 * b2 == a2 * b1
+
+
+def _line_circle_float(a, b, c, cx, cy, r):
+    # r^2 (a^2 + b^2) - (a cx + b cy + c)^2：> 0 兩交點、= 0 相切、< 0 不相交
+    s = a * cx + b * cy + c
+    size = abs(a * cx) + abs(b * cy) + abs(c)
+    lhs = r * r * (a * a + b * b)
+    return lhs - s * s, _CIRCLE_BOUND * (lhs + size * size)
+
+
+def _line_circle_ints(a, b, c, cx, cy, r, one):
+    # one 是常數 1 換算後的值，讓 c 與 a cx 的單位一致（多項式變成齊次）
+    s = a * cx + b * cy + c * one
+    return r * r * (a * a + b * b) - s * s
+
+
+def line_circle_count(line: Line, circle: Circle) -> int:
+    """直線與圓的交點個數 0 / 1（相切）/ 2，精確判斷（比較圓心到直線的距離與 r）。"""
+    args = (line.a, line.b, line.c, circle.center.x, circle.center.y, circle.r)
+    v, bound = _line_circle_float(*args)
+    if not abs(v) > bound:
+        v = _line_circle_ints(*map(Fraction, args), 1)
+    return 1 + _sign(v)
+
+
+# ---- 整批 ----
+def orient2d(a, b, c) -> np.ndarray:
+    """整批 (b - a) x (c - a) 的浮點值，a, b, c 形狀 (..., 2)，可互相廣播。"""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    c = np.asarray(c, dtype=np.float64)
+    return ((b[..., 0] - a[..., 0]) * (c[..., 1] - a[..., 1])
+            - (b[..., 1] - a[..., 1]) * (c[..., 0] - a[..., 0]))
+
+
+def _broadcast_xy(*arrays) -> Tuple[np.ndarray, ...]:
+    arrs = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in arrays))
+    return tuple(a[..., k] for a in arrs for k in (0, 1))
+
+
+def _exact_ints(vals, max_bits: int) -> np.ndarray:
+    """同一組（每一行）座標換成以同一個 2 的次方為單位的精確整數，形狀 (len(vals), n)。
+
+    float64 都是 m * 2^e（m 為整數）；去掉 m 尾端的 0 位元後，取每行最小的 e 為單位。
+    行列式是齊次多項式，所有座標同乘 2^-e 不改變符號。
+    每個整數都不超過 max_bits 位元時用 int64，否則用 Python int（object 陣列，不會溢位）。
+    """
+    f, e = np.frexp(np.stack(vals))
+    m = (f * 2.0 ** 53).astype(np.int64)
+    e = e.astype(np.int64) - 53
+    tz = np.frexp((m & -m).astype(np.float64))[1] - 1   # 尾端 0 位元數
+    tz[m == 0] = 0
+    m >>= tz
+    e += tz
+    nz = m != 0
+    unit = np.where(nz, e, np.iinfo(np.int64).max).min(axis=0)
+    shift = np.where(nz, e - unit, 0)
+    bits = np.frexp(np.abs(m).astype(np.float64))[1] + shift
+    if bits.max() <= max_bits:
+        return m << shift
+    return m.astype(object) << shift.astype(object)
+
+
+def _sign_array(v: np.ndarray) -> np.ndarray:
+    return (v > 0).astype(np.int8) - (v < 0).astype(np.int8)
+
+
+def _refine(out: np.ndarray, unsure: np.ndarray, args, exact_ints, max_bits: int) -> None:
+    """out 中 filter 無法確定的位置改成 exact_ints(*args) 的精確符號。
+
+    exact_ints 只用 + - *，整批用整數陣列計算（max_bits 為 int64 不會溢位的座標位元數上限）；
+    只有非有限值（inf、NaN）才逐一改用 Fraction 計算（會丟出例外）。
+    """
+    idx = np.nonzero(unsure)
+    vals = [v[idx] for v in args]
+    finite = np.isfinite(np.stack(vals)).all(axis=0)
+    if finite.any():
+        ints = _exact_ints([v[finite] for v in vals], max_bits)
+        out[tuple(i[finite] for i in idx)] = _sign_array(exact_ints(*ints))
+    for k in np.flatnonzero(~finite):
+        out[tuple(i[k] for i in idx)] = _sign(exact_ints(*(Fraction(v[k]) for v in vals)))
+
+
+def _orient_ints(ax, ay, bx, by, cx, cy):
+    return (ax - cx) * (by - cy) - (ay - cy) * (bx - cx)
+
+
+def _incircle_ints(ax, ay, bx, by, cx, cy, dx, dy):
+    adx, ady, bdx, bdy, cdx, cdy = ax - dx, ay - dy, bx - dx, by - dy, cx - dx, cy - dy
+    return ((adx * adx + ady * ady) * (bdx * cdy - cdx * bdy)
+            + (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy)
+            + (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady))
+
+
+def _circle_far_ints(x1, y1, r1, x2, y2, r2):
+    return (x2 - x1) * (x2 - x1) + (y2 - y1) * (y2 - y1) - (r1 + r2) * (r1 + r2)
+
+
+def _circle_near_ints(x1, y1, r1, x2, y2, r2):
+    return (x2 - x1) * (x2 - x1) + (y2 - y1) * (y2 - y1) - (r1 - r2) * (r1 - r2)
+
+
+# int64 不溢位的座標位元數：方向判斷 |det| < 2^(2k+3)，in-circle < 2^(4k+8)，
+# 圓圓 < 2^(2k+4)，線圓 < 2^(4k+5)
+_ORIENT_INT_BITS = 30
+_INCIRCLE_INT_BITS = 13
+_CIRCLE_INT_BITS = 29
+_LINE_CIRCLE_INT_BITS = 14
+
+
+def orientation_array(a, b, c) -> np.ndarray:
+    """整批方向，回傳 int8 陣列（1 / -1 / 0），結果與 orientation 逐一相同。"""
+    ax, ay, bx, by, cx, cy = _broadcast_xy(a, b, c)
+    with np.errstate(over="ignore", invalid="ignore"):
+        left = (ax - cx) * (by - cy)
+        right = (ay - cy) * (bx - cx)
+        det = left - right
+        # 溢位得到 NaN 時比較為 False，同樣交給精確計算
+        unsure = ~(np.abs(det) > _ORIENT_BOUND * (np.abs(left) + np.abs(right)))
+    out = np.where(unsure, 0, np.sign(det)).astype(np.int8)
+    if unsure.any():
+        _refine(out, unsure, (ax, ay, bx, by, cx, cy), _orient_ints, _ORIENT_INT_BITS)
+    return out
+
+
+def incircle_array(a, b, c, d) -> np.ndarray:
+    """整批 in-circle，回傳 int8 陣列（1 圓內 / -1 圓外 / 0 圓上）。"""
+    args = _broadcast_xy(a, b, c, d)
+    with np.errstate(over="ignore", invalid="ignore"):
+        det, bound = _incircle_float(*args)
+        unsure = ~(np.abs(det) > bound)
+    out = np.where(unsure, 0, np.sign(det)).astype(np.int8)
+    if unsure.any():
+        _refine(out, unsure, args, _incircle_ints, _INCIRCLE_INT_BITS)
+    return out
+
+
+def circle_intersection_count_array(center1, r1, center2, r2) -> np.ndarray:
+    """整批 circle_intersection_count（可互相廣播），回傳 int64 陣列 0 / 1 / 2，重合的圓為 -1。"""
+    c1 = np.asarray(center1, dtype=np.float64)
+    c2 = np.asarray(center2, dtype=np.float64)
+    args = np.broadcast_arrays(c1[..., 0], c1[..., 1], np.asarray(r1, dtype=np.float64),
+                               c2[..., 0], c2[..., 1], np.asarray(r2, dtype=np.float64))
+    x1, y1, r1, x2, y2, r2 = args
+    with np.errstate(over="ignore", invalid="ignore"):
+        dx, dy = x2 - x1, y2 - y1
+        d2 = dx * dx + dy * dy
+        bound = _CIRCLE_BOUND * (d2 + (np.abs(r1) + np.abs(r2)) ** 2)
+        far = d2 - (r1 + r2) ** 2        # > 0：分離
+        near = d2 - (r1 - r2) ** 2       # < 0：內含
+        far_unsure = ~(np.abs(far) > bound)
+        near_unsure = ~(np.abs(near) > bound)
+    far_s = np.where(far_unsure, 0, np.sign(far)).astype(np.int8)
+    near_s = np.where(near_unsure, 0, np.sign(near)).astype(np.int8)
+    if far_unsure.any():
+        _refine(far_s, far_unsure, args, _circle_far_ints, _CIRCLE_INT_BITS)
+    if near_unsure.any():
+        _refine(near_s, near_unsure, args, _circle_near_ints, _CIRCLE_INT_BITS)
+    count = np.where((far_s > 0) | (near_s < 0), 0, np.where((far_s == 0) | (near_s == 0), 1, 2))
+    same = (x1 == x2) & (y1 == y2) & (r1 == r2)
+    return np.where(same, -1, count).astype(np.int64)
+
+
+def line_circle_count_array(abc, center, r) -> np.ndarray:
+    """整批 line_circle_count：直線係數 (..., 3)、圓心 (..., 2)、半徑 (...) 可互相廣播，回傳 int64 陣列。"""
+    abc = np.asarray(abc, dtype=np.float64)
+    center = np.asarray(center, dtype=np.float64)
+    args = np.broadcast_arrays(abc[..., 0], abc[..., 1], abc[..., 2],
+                               center[..., 0], center[..., 1], np.asarray(r, dtype=np.float64))
+    with np.errstate(over="ignore", invalid="ignore"):
+        v, bound = _line_circle_float(*args)
+        unsure = ~(np.abs(v) > bound)
+    out = np.where(unsure, 0, np.sign(v)).astype(np.int8)
+    if unsure.any():
+        _refine(out, unsure, (*args, np.ones(args[0].shape)), _line_circle_ints, _LINE_CIRCLE_INT_BITS)
+    return out.astype(np.int64) + 1
+
+
+if __name__ == "__main__":
+    from geometry import Circle, Line, Point
+
+    # 浮點數直接算會錯的例子：幾乎共線（相差 1 ulp）
+    a, b = Point(0.5, 0.5), Point(12.0, 12.0)
+    c = Point(24.0, 24.0)
+    for k in range(3):
+        p = Point(0.5 + k * 2.0 ** -53, 0.5)
+        naive = (b.x - p.x) * (c.y - p.y) - (b.y - p.y) * (c.x - p.x)
+        print("naive:", naive, "exact:", orientation(p, b, c))
+
+    print("incircle:", incircle(Point(0, 0), Point(1, 0), Point(0, 1), Point(1, 1)),
+          incircle(Point(0, 0), Point(1, 0), Point(0, 1), Point(0.5, 0.5)))
+
+    # 0.1 + 0.2 > 0.3（二進位下），精確判斷為兩個交點；固定 EPS 會當成相切
+    C1 = Circle(Point(0.0, 0.0), 0.1)
+    C2 = Circle(Point(0.3, 0.0), 0.2)
+    print("nearly tangent circles:", circle_intersection_count(C1, C2), "points:", len(C1.intersection_circle(C2)))
+    # 係數很小的直線：|a1 b2 - a2 b1| = 1e-12 < EPS，但並不平行
+    print("parallel:", lines_parallel(Line(1e-6, 1e-6, 0.0), Line(1e-6, 2e-6, -1e-6)))
+
+    rng = np.random.default_rng(0)
+    P = rng.uniform(-1, 1, size=(1_000_000, 2))
+    print("orientation_array:", np.bincount(orientation_array((0, 0), (1, 1), P) + 1))
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import heapq
+import math
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from geometry import EPS, Line, Point
+
+# 線段與 Bentley–Ottmann 掃描線：
+# 垂直掃描線由左往右（依 (x, y) 字典序）推進，
+# 狀態結構依「掃描線上的 y」排序，只有相鄰線段才需要檢查交點，
+# 總共 O((n + k) log n) 次比較，交點以 generator 逐一產生，不必整批存在記憶體。
+# 所有「相等」判斷都用 EPS（與 1.py 相同）。
+
+
+@dataclass(frozen=True)
+class Segment:
+    p: Point
+    q: Point
+
+    def line(self) -> Line:
+        return Line.from_points(self.p, self.q)
+
+    def length(self) -> float:
+        return self.p.dist(self.q)
+
+    def intersection_segment(self, other: "Segment") -> Optional[Point]:
+        # 單一交點；平行（含共線重疊）回傳 None
+        return _intersect(_raw(self), _raw(other))
+
+
+_Raw = Tuple[float, float, float, float]
+
+
+def _raw(s: Segment) -> _Raw:
+    return (float(s.p.x), float(s.p.y), float(s.q.x), float(s.q.y))
+
+
+def _cross(ax: float, ay: float, bx: float, by: float) -> float:
+    return ax * by - ay * bx
+
+
+def _intersect(s1: _Raw, s2: _Raw) -> Optional[Point]:
+    # p1 + t r = p2 + u s，t, u 都要在 [0, 1]（容許 EPS 長度）
+    x1, y1, x2, y2 = s1
+    x3, y3, x4, y4 = s2
+    rx, ry = x2 - x1, y2 - y1
+    sx, sy = x4 - x3, y4 - y3
+    d = _cross(rx, ry, sx, sy)
+    if abs(d) < EPS:
+        return None
+    qx, qy = x3 - x1, y3 - y1
+    t = _cross(qx, qy, sx, sy) / d
+    u = _cross(qx, qy, rx, ry) / d
+    tol_t = EPS / math.hypot(rx, ry)
+    tol_u = EPS / math.hypot(sx, sy)
+    if t < -tol_t or t > 1 + tol_t or u < -tol_u or u > 1 + tol_u:
+        return None
+    x, y = x1 + t * rx, y1 + t * ry
+    # 交在端點上時直接用端點座標，讓同一點的事件完全相等
+    for ex, ey in ((x1, y1), (x2, y2), (x3, y3), (x4, y4)):
+        if abs(x - ex) <= EPS and abs(y - ey) <= EPS:
+            return Point(ex, ey)
+    return Point(x, y)
+
+
+def _normalize(segments) -> List[_Raw]:
+    # 接受 Segment 序列或 (N, 4) 陣列 [x1, y1, x2, y2]；端點排成左下 -> 右上
+    if isinstance(segments, np.ndarray):
+        rows = np.asarray(segments, dtype=float).reshape(-1, 4).tolist()
+    else:
+        rows = [_raw(s) if isinstance(s, Segment) else tuple(map(float, s)) for s in segments]
+    out = []
+    for x1, y1, x2, y2 in rows:
+        if abs(x1 - x2) < EPS and abs(y1 - y2) < EPS:
+            raise ValueError("線段兩端點重合")
+        if (x2, y2) < (x1, y1):
+            x1, y1, x2, y2 = x2, y2, x1, y1
+        out.append((x1, y1, x2, y2))
+    return out
+
+
+def _after(x: float, y: float, px: float, py: float) -> bool:
+    # (x, y) 是否在事件點 (px, py) 之後（字典序，容許 EPS）
+    return x > px + EPS or (abs(x - px) <= EPS and y > py + EPS)
+
+
+def sweep_intersections(
+    segments: Union[Iterable[Segment], np.ndarray],
+) -> Iterator[Tuple[Point, Tuple[int, ...]]]:
+    """所有線段交點（Bentley–Ottmann），逐一產生 (交點, 經過該點的線段編號)。
+
+    端點碰到其他線段也算交點；共線重疊的線段只回報重疊區段的端點。
+    """
+    segs = _normalize(segments)
+    vertical = [abs(s[2] - s[0]) < EPS for s in segs]
+    slope = [math.inf if vertical[i] else (s[3] - s[1]) / (s[2] - s[0]) for i, s in enumerate(segs)]
+
+    # 事件佇列：(x, y)；起點事件另外記錄從這裡開始的線段
+    starts: Dict[Tuple[float, float], List[int]] = {}
+    heap: List[Tuple[float, float]] = []
+    for i, (x1, y1, x2, y2) in enumerate(segs):
+        starts.setdefault((x1, y1), []).append(i)
+        heap.append((x1, y1))
+        heap.append((x2, y2))
+    heapq.heapify(heap)
+
+    status: List[int] = []   # 線段編號，依掃描線上的 y 由下到上
+    sweep = [0.0, 0.0]       # 目前事件點，給排序鍵使用
+
+    def y_at(i: int) -> float:
+        x1, y1, x2, y2 = segs[i]
+        px, py = sweep
+        if vertical[i]:
+            # 垂直線段在掃描線上是一段區間，取最接近事件點的 y
+            return min(max(py, y1), y2)
+        return y1 + (px - x1) * slope[i]
+
+    def check(a: int, b: int, px: float, py: float) -> None:
+        pt = _intersect(segs[a], segs[b])
+        if pt is not None and _after(pt.x, pt.y, px, py):
+            heapq.heappush(heap, (pt.x, pt.y))
+
+    last: Optional[Tuple[float, float]] = None
+    while heap:
+        px, py = heapq.heappop(heap)
+        U = list(starts.get((px, py), ()))
+        # 合併 EPS 內重複的事件（端點重合、多條線段交於一點）
+        while heap and abs(heap[0][0] - px) <= EPS and abs(heap[0][1] - py) <= EPS:
+            U += starts.get(heapq.heappop(heap), ())
+        if last is not None and abs(px - last[0]) <= EPS and abs(py - last[1]) <= EPS:
+            if not U:
+                continue
+            px, py = last
+        last = (px, py)
+        sweep[0], sweep[1] = px, py
+
+        # 掃描線上經過事件點的線段是狀態中連續的一段 [lo, hi)
+        lo = bisect_left(status, py - EPS, key=y_at)
+        hi = bisect_right(status, py + EPS, key=y_at)
+        through = status[lo:hi]
+        ending = [i for i in through if abs(segs[i][2] - px) <= EPS and abs(segs[i][3] - py) <= EPS]
+        ending_set = set(ending)
+        cont = [i for i in through if i not in ending_set]
+
+        involved = set(U) | set(through)
+        if len(involved) > 1:
+            yield Point(px, py), tuple(sorted(involved))
+
+        # 事件點右側的順序 = 斜率由小到大（垂直線段在最上面）
+        new = sorted(set(U) | set(cont), key=lambda i: slope[i])
+        status[lo:hi] = new
+        if not new:
+            if 0 < lo < len(status):
+                check(status[lo - 1], status[lo], px, py)
+        else:
+            if lo > 0:
+                check(status[lo - 1], status[lo], px, py)
+            k = lo + len(new)
+            if k < len(status):
+                check(status[k - 1], status[k], px, py)
+
+
+def brute_force_intersections(segments: Union[Iterable[Segment], np.ndarray]) -> List[Tuple[Point, Tuple[int, int]]]:
+    """兩兩檢查的 O(n^2) 版本，用來對照 sweep_intersections。"""
+    segs = _normalize(segments)
+    out = []
+    for i in range(len(segs)):
+        for j in range(i + 1, len(segs)):
+            pt = _intersect(segs[i], segs[j])
+            if pt is not None:
+                out.append((pt, (i, j)))
+    return out
+
+
+if __name__ == "__main__":
+    S = [
+        Segment(Point(0, 0), Point(4, 4)),
+        Segment(Point(0, 4), Point(4, 0)),
+        Segment(Point(2, -1), Point(2, 5)),   # 垂直線，三線交於 (2, 2)
+        Segment(Point(0, 1), Point(4, 1)),    # 水平線
+        Segment(Point(3, 0), Point(5, 2)),
+    ]
+    for pt, ids in sweep_intersections(S):
+        print(pt, ids)
+
+    rng = np.random.default_rng(0)
+    arr = rng.uniform(0, 1000, size=(20000, 4))
+    arr[:, 2:] = arr[:, :2] + rng.uniform(-5, 5, size=(20000, 2))
+    k = sum(1 for _ in sweep_intersections(arr))
+    print("random segments:", len(arr), "intersections:", k)
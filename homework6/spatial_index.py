@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from arrays import CircleArray
+from geometry import EPS
+
+# 均勻網格空間索引（uniform grid hash）：
+# 每個外接矩形登記到它覆蓋的所有格子，同一格子內的物件才是候選配對。
+# 建索引、產生配對、去重全部用 NumPy 排序與遮罩完成，沒有逐對的 Python 迴圈。
+
+# 每個軸最多的格子數，避免 cell_size 太小時 key 溢位或登記項目爆量
+_MAX_CELLS_PER_AXIS = 1 << 20
+
+
+class GridIndex:
+    """外接矩形 bounds (N, 4) = xmin, ymin, xmax, ymax 的網格索引。"""
+
+    def __init__(self, bounds, cell_size: Optional[float] = None) -> None:
+        b = np.ascontiguousarray(bounds, dtype=np.float64).reshape(-1, 4)
+        self.bounds = b
+        n = b.shape[0]
+        if cell_size is None:
+            # 預設取典型物件大小：大多數矩形只跨 1～4 格
+            ext = np.maximum(b[:, 2] - b[:, 0], b[:, 3] - b[:, 1]) if n else np.ones(1)
+            cell_size = float(np.median(ext)) if n else 1.0
+        if n:
+            span = max(float(b[:, 2].max() - b[:, 0].min()), float(b[:, 3].max() - b[:, 1].min()))
+            cell_size = max(cell_size, span / _MAX_CELLS_PER_AXIS)
+        if not cell_size > 0:
+            cell_size = 1.0
+        self.cell_size = cell_size
+
+        self.origin = b[:, :2].min(axis=0) if n else np.zeros(2)
+        ix0, iy0 = self._cell(b[:, 0], b[:, 1])
+        ix1, iy1 = self._cell(b[:, 2], b[:, 3])
+        self._nx = int(ix1.max()) + 1 if n else 1
+        self._ny = int(iy1.max()) + 1 if n else 1
+
+        # 展開：物件 k 登記到 (ix0..ix1) x (iy0..iy1) 每一格
+        nx = ix1 - ix0 + 1
+        counts = nx * (iy1 - iy0 + 1)
+        ids = np.repeat(np.arange(n, dtype=np.int64), counts)
+        local = np.arange(ids.size, dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+        cx = ix0[ids] + local % nx[ids]
+        cy = iy0[ids] + local // nx[ids]
+        keys = cx * self._ny + cy
+
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._ids = ids[order]
+
+    def _cell(self, x: np.ndarray, y: np.ndarray):
+        ix = np.floor((x - self.origin[0]) / self.cell_size).astype(np.int64)
+        iy = np.floor((y - self.origin[1]) / self.cell_size).astype(np.int64)
+        return ix, iy
+
+    def __len__(self) -> int:
+        return self.bounds.shape[0]
+
+    def cell_of(self, x, y) -> np.ndarray:
+        """點 (x, y) 所在格子的 key（與登記時同一套編號），在網格範圍外為 -1。"""
+        ix, iy = self._cell(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        return np.where((ix >= 0) & (ix < self._nx) & (iy >= 0) & (iy < self._ny), ix * self._ny + iy, -1)
+
+    def cell_box(self, keys) -> np.ndarray:
+        """格子的範圍 (..., 4) = xmin, ymin, xmax, ymax。"""
+        ix, iy = np.divmod(np.asarray(keys, dtype=np.int64), self._ny)
+        x0 = self.origin[0] + ix * self.cell_size
+        y0 = self.origin[1] + iy * self.cell_size
+        return np.stack([x0, y0, x0 + self.cell_size, y0 + self.cell_size], axis=-1)
+
+    def cells(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """非空格子的 (keys, indptr, ids)：第 k 個格子的物件為 ids[indptr[k]:indptr[k+1]]。"""
+        keys, first = np.unique(self._keys, return_index=True)
+        return keys, np.append(first, len(self._keys)), self._ids
+
+    def _overlap(self, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        bi, bj = self.bounds[i], self.bounds[j]
+        return ((bi[:, 0] <= bj[:, 2]) & (bj[:, 0] <= bi[:, 2])
+                & (bi[:, 1] <= bj[:, 3]) & (bj[:, 1] <= bi[:, 3]))
+
+    def candidate_pairs(self) -> np.ndarray:
+        """外接矩形互相重疊的所有配對 (M, 2)，每對只出現一次且 i < j。"""
+        keys, ids = self._keys, self._ids
+        out_i, out_j, out_k = [], [], []
+        # 同一格的登記項目在排序後相鄰：比較位移 d 的兩項即可列出格內所有配對
+        d = 1
+        while d < keys.size:
+            same = keys[:-d] == keys[d:]
+            if not same.any():
+                break
+            out_i.append(ids[:-d][same])
+            out_j.append(ids[d:][same])
+            out_k.append(keys[:-d][same])
+            d += 1
+        if not out_i:
+            return np.empty((0, 2), dtype=np.int64)
+        i = np.concatenate(out_i)
+        j = np.concatenate(out_j)
+        k = np.concatenate(out_k)
+
+        keep = (i != j) & self._overlap(i, j)
+        i, j, k = i[keep], j[keep], k[keep]
+        # 去重：只在「兩矩形交集左下角」所在的格子回報這一對
+        bi, bj = self.bounds[i], self.bounds[j]
+        rx, ry = self._cell(np.maximum(bi[:, 0], bj[:, 0]), np.maximum(bi[:, 1], bj[:, 1]))
+        keep = rx * self._ny + ry == k
+        i, j = i[keep], j[keep]
+        return np.column_stack([np.minimum(i, j), np.maximum(i, j)])
+
+    def query(self, box) -> np.ndarray:
+        """外接矩形與 box = (xmin, ymin, xmax, ymax) 重疊的物件編號（遞增）。"""
+        xmin, ymin, xmax, ymax = (float(v) for v in box)
+        ix0, iy0 = self._cell(np.array([xmin]), np.array([ymin]))
+        ix1, iy1 = self._cell(np.array([xmax]), np.array([ymax]))
+        ix0, iy0 = max(int(ix0[0]), 0), max(int(iy0[0]), 0)
+        ix1, iy1 = min(int(ix1[0]), self._nx - 1), min(int(iy1[0]), self._ny - 1)
+        if ix1 < ix0 or iy1 < iy0:
+            return np.empty(0, dtype=np.int64)
+        cx, cy = np.meshgrid(np.arange(ix0, ix1 + 1), np.arange(iy0, iy1 + 1), indexing="ij")
+        wanted = (cx * self._ny + cy).ravel()
+        lo = np.searchsorted(self._keys, wanted, side="left")
+        hi = np.searchsorted(self._keys, wanted, side="right")
+        hits = [self._ids[a:b] for a, b in zip(lo, hi) if b > a]
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        cand = np.unique(np.concatenate(hits))
+        bc = self.bounds[cand]
+        ok = (bc[:, 0] <= xmax) & (xmin <= bc[:, 2]) & (bc[:, 1] <= ymax) & (ymin <= bc[:, 3])
+        return cand[ok]
+
+
+class CircleIntersections(NamedTuple):
+    i: np.ndarray       # (M,) 第一個圓的編號
+    j: np.ndarray       # (M,) 第二個圓的編號，i < j
+    count: np.ndarray   # (M,) 交點數 1 或 2
+    points: np.ndarray  # (M, 2, 2) 交點，count == 1 時 points[:, 1] 為 NaN
+
+
+def all_circle_intersections(circles: CircleArray, cell_size: Optional[float] = None) -> CircleIntersections:
+    """所有圓兩兩的交點：網格索引找候選，再對候選整批做 Circle.intersection_circle 的判斷。"""
+    # 外接矩形放大 EPS，讓剛好相切的圓也會成為候選
+    bounds = circles.bounds()
+    bounds[:, :2] -= EPS
+    bounds[:, 2:] += EPS
+    pairs = GridIndex(bounds, cell_size).candidate_pairs()
+    i, j = pairs[:, 0], pairs[:, 1]
+    count, pts = circles[i].intersection_circle(circles[j])
+    hit = count > 0
+    return CircleIntersections(i[hit], j[hit], count[hit], pts[hit])
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    n = 20000
+    C = CircleArray(rng.uniform(0, 1000, size=(n, 2)), rng.uniform(0.5, 3.0, size=n))
+    res = all_circle_intersections(C)
+    print("circles:", n, "intersecting pairs:", len(res.i), "points:", int(res.count.sum()))
+    k = 0
+    print("pair", res.i[k], res.j[k], "->", res.points[k],
+          "scalar:", C[int(res.i[k])].intersection_circle(C[int(res.j[k])]))
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import math
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Iterable, List, Literal, Optional, Tuple
+from functools import lru_cache
+from itertools import islice, zip_longest
+from typing import Dict, Iterable, Iterator, List, Literal, Optional, Tuple, Union
 
+import numpy as np
 
 Alternative = Literal["two-sided", "greater", "less"]
 
@@ -27,26 +31,146 @@ class TestResult:
             f"alternative={self.alternative})"
         )
 
+def _check(v) -> float:
+    if not isinstance(v, (int, float, np.integer, np.floating)) or math.isnan(v) or math.isinf(v):
+        raise ValueError(f"invalid numeric value in sample: {v!r}")
+    return float(v)
+
+
+# values per chunk in Moments.extend (Python iterables / NumPy arrays)
+_CHUNK = 1 << 16
+_ARRAY_CHUNK = 1 << 20
+
+
+def _is_numeric_array(x) -> bool:
+    return isinstance(x, np.ndarray) and x.dtype.kind in "biuf"
+
+
+def _array_blocks(a: np.ndarray) -> Iterator[np.ndarray]:
+    """
+    Validated float64 blocks of a numeric array (including np.memmap).
+    Blocks are bounded so a memory-mapped file is read sequentially without
+    materializing a full-size temporary.
+    """
+    flat = a.reshape(-1)
+    for start in range(0, flat.shape[0], _ARRAY_CHUNK):
+        block = np.asarray(flat[start:start + _ARRAY_CHUNK], dtype=np.float64)
+        ok = np.isfinite(block)
+        if not ok.all():
+            raise ValueError(f"invalid numeric value in sample: {block[np.argmin(ok)].item()!r}")
+        yield block
+
+
 def _to_list(x: Iterable[float]) -> List[float]:
-    xs = list(x)
+    if _is_numeric_array(x):
+        xs = [v for block in _array_blocks(x) for v in block.tolist()]
+    else:
+        xs = [_check(v) for v in x]
     if len(xs) == 0:
         raise ValueError("sample is empty")
-    for v in xs:
-        if not isinstance(v, (int, float)) or math.isnan(v) or math.isinf(v):
-            raise ValueError(f"invalid numeric value in sample: {v!r}")
-    return [float(v) for v in xs]
+    return xs
+
+
+@dataclass
+class Moments:
+    """
+    Streaming count / mean / M2 (sum of squared deviations) of a sample.
+
+    Values are consumed in a single pass and never stored: ``add`` is a Welford
+    update, ``extend`` summarizes fixed-size chunks and folds them in with Chan's
+    pairwise formula, and ``merge`` combines accumulators built on separate
+    chunks or workers. Every test below accepts a Moments in place of a sample.
+    """
+
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    @classmethod
+    def from_iterable(cls, xs: Iterable[float]) -> "Moments":
+        return cls().extend(xs)
+
+    @classmethod
+    def from_stats(cls, n: int, mean: float, std: float) -> "Moments":
+        """Build from reported summary statistics (std is the sample std, ddof=1)."""
+        if n < 0 or (n > 0 and (math.isnan(mean) or math.isinf(mean))) or not std >= 0:
+            raise ValueError("invalid summary statistics")
+        return cls(n, float(mean) if n else 0.0, float(std) ** 2 * (n - 1) if n > 1 else 0.0)
+
+    def add(self, x: float) -> "Moments":
+        x = _check(x)
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (x - self.mean)
+        return self
+
+    def extend(self, xs: Iterable[float]) -> "Moments":
+        if _is_numeric_array(xs):
+            return self._extend_blocks(_array_blocks(xs))
+        it = iter(xs)
+        while True:
+            chunk = [_check(v) for v in islice(it, _CHUNK)]
+            if not chunk:
+                return self
+            k = len(chunk)
+            m = math.fsum(chunk) / k
+            self._combine(k, m, sum((v - m) ** 2 for v in chunk))
+
+    def _extend_blocks(self, blocks: Iterable[np.ndarray]) -> "Moments":
+        for block in blocks:
+            k = block.shape[0]
+            if k:
+                m = float(block.sum()) / k
+                d = block - m
+                self._combine(k, m, float(np.dot(d, d)))
+        return self
+
+    def _combine(self, n: int, mean: float, m2: float) -> None:
+        if n == 0:
+            return
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+
+    def merge(self, other: "Moments") -> "Moments":
+        out = Moments(self.n, self.mean, self.m2)
+        out._combine(other.n, other.mean, other.m2)
+        return out
+
+    __add__ = merge
+
+    @property
+    def var(self) -> float:
+        if self.n < 2:
+            raise ValueError("need at least 2 observations to compute sample variance")
+        return self.m2 / (self.n - 1)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.var)
+
+
+Sample = Union[Iterable[float], Moments]
+
+
+def _moments(x: Sample) -> Moments:
+    m = x if isinstance(x, Moments) else Moments.from_iterable(x)
+    if m.n == 0:
+        raise ValueError("sample is empty")
+    return m
 
 
 def mean(xs: List[float]) -> float:
+    if _is_numeric_array(xs):
+        return _moments(xs).mean
     return sum(xs) / len(xs)
 
 
 def sample_var(xs: List[float]) -> float:
-    n = len(xs)
-    if n < 2:
-        raise ValueError("need at least 2 observations to compute sample variance")
-    m = mean(xs)
-    return sum((x - m) ** 2 for x in xs) / (n - 1)
+    return Moments.from_iterable(xs).var
 
 
 def sample_std(xs: List[float]) -> float:
@@ -62,47 +186,57 @@ def _normal_sf(z: float) -> float:
 
 
 
+@lru_cache(maxsize=1024)
 def _log_beta(a: float, b: float) -> float:
     return math.lgamma(a) + math.lgamma(b) - math.lgamma(a + b)
 
 
-def _betacf(a: float, b: float, x: float, max_iter: int = 200, eps: float = 3e-14) -> float:
-    am = 1.0
-    bm = 1.0
-    az = 1.0
+_FPMIN = 1e-300
+
+
+def _betacf(a: float, b: float, x: float, max_iter: int = 300, eps: float = 1e-15) -> float:
+    """
+    Continued fraction for the regularized incomplete beta (modified Lentz).
+    Converges in a few dozen terms when x < (a + 1) / (a + b + 2).
+    """
     qab = a + b
     qap = a + 1.0
     qam = a - 1.0
-    bz = 1.0 - qab * x / qap
+    c = 1.0
+    d = 1.0 - qab * x / qap
+    if abs(d) < _FPMIN:
+        d = _FPMIN
+    d = 1.0 / d
+    h = d
 
-    if abs(bz) < 1e-300:
-        bz = 1e-300
-
-    em2 = 0.0
     for m in range(1, max_iter + 1):
-        em = float(m)
-        tem = em + em
-        d = em * (b - em) * x / ((qam + tem) * (a + tem))
-        ap = az + d * am
-        bp = bz + d * bm
-
-        d = -(a + em) * (qab + em) * x / ((a + tem) * (qap + tem))
-        app = ap + d * az
-        bpp = bp + d * bz
-
-        am, bm = az, bz
-        az, bz = app, bpp
-
-        if abs(bz) < 1e-300:
-            bz = 1e-300
-
-        if m == 1:
-            em2 = 2.0
-
-        if abs(az - am) < eps * abs(az):
-            return az / bz
-
-    return az / bz 
+        m2 = m + m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        c = 1.0 + aa / c
+        # an exact zero is the only case the guard matters for in practice
+        if d == 0.0:
+            d = _FPMIN
+        if c == 0.0:
+            c = _FPMIN
+        d = 1.0 / d
+        h *= d * c
+
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        c = 1.0 + aa / c
+        if d == 0.0:
+            d = _FPMIN
+        if c == 0.0:
+            c = _FPMIN
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+
+        if -eps < delta - 1.0 < eps:
+            break
+
+    return h
 
 
 def _reg_incomplete_beta(x: float, a: float, b: float) -> float:
@@ -127,17 +261,92 @@ def _reg_incomplete_beta(x: float, a: float, b: float) -> float:
         return 1.0 - bt * cf / b
 
 
+def _t_cdf_cf(t: float, df: float) -> float:
+    # I_x(df/2, 1/2) with x = df / (df + t^2); 1 - x is formed as t^2 / (df + t^2)
+    # so the upper tail keeps its relative precision
+    tt = t * t
+    x = df / (df + tt)
+    if x == 1.0:
+        return 0.5
+    if x == 0.0:
+        return 1.0 if t > 0 else 0.0
+    y = tt / (df + tt)
+    a = df / 2.0
+    bt = math.exp(a * math.log(x) + 0.5 * math.log(y) - _log_beta(a, 0.5))
+    if x < (a + 1.0) / (a + 2.5):
+        ib = bt * _betacf(a, 0.5, x) / a
+    else:
+        ib = 1.0 - bt * _betacf(0.5, a, y) / 0.5
+    return 1.0 - 0.5 * ib if t >= 0 else 0.5 * ib
+
+
+def _t_pdf(t: float, df: float) -> float:
+    return math.exp(-_log_beta(df / 2.0, 0.5) - 0.5 * math.log(df) - 0.5 * (df + 1.0) * math.log1p(t * t / df))
+
+
+# Integer df get a cubic Hermite table (values and exact pdf slopes) on
+# _TABLE_T0 <= |t| < _TABLE_T1, where the continued fraction needs the most
+# terms; interpolation error there is about 4e-12 (see bench_t_cdf.py).
+# Outside that range the continued fraction is short and keeps relative
+# precision in the tails.
+_TABLE_T0 = 0.5
+_TABLE_T1 = 4.0
+_TABLE_STEP = 1.0 / 128
+# A table costs about as much as 300 continued-fraction calls, so it is only
+# built once a df has been asked for this many times (cold or one-off df,
+# e.g. a df that grows with every streaming update, never pay for one).
+_TABLE_MIN_CALLS = 256
+_TABLE_CACHE_SIZE = 256
+_TABLE_MAX_TRACKED = 4096
+
+_TTable = Tuple[Tuple[float, ...], Tuple[float, ...]]
+_t_tables: "OrderedDict[float, _TTable]" = OrderedDict()   # LRU of built tables
+_table_calls: Dict[float, int] = {}                         # calls per df without a table
+
+
+def _t_table(df: float) -> _TTable:
+    n = round((_TABLE_T1 - _TABLE_T0) / _TABLE_STEP)
+    ts = [_TABLE_T0 + k * _TABLE_STEP for k in range(n + 1)]
+    return tuple(_t_cdf_cf(t, df) for t in ts), tuple(_t_pdf(t, df) * _TABLE_STEP for t in ts)
+
+
+def _cached_t_table(df: float) -> Optional[_TTable]:
+    """The table for df, building it once df has recurred often enough; None while it is cold."""
+    table = _t_tables.get(df)
+    if table is not None:
+        _t_tables.move_to_end(df)
+        return table
+    k = _table_calls.get(df, 0) + 1
+    if k < _TABLE_MIN_CALLS:
+        if len(_table_calls) >= _TABLE_MAX_TRACKED:
+            _table_calls.clear()
+        _table_calls[df] = k
+        return None
+    # an evicted df has to recur again before it is rebuilt, so a working set
+    # larger than the cache cannot rebuild a table on every call
+    _table_calls.pop(df, None)
+    table = _t_tables[df] = _t_table(df)
+    if len(_t_tables) > _TABLE_CACHE_SIZE:
+        _t_tables.popitem(last=False)
+    return table
+
+
 def _t_cdf(t: float, df: float) -> float:
     if df <= 0:
         raise ValueError("df must be > 0")
-    x = df / (df + t * t)
-    a = df / 2.0
-    b = 0.5
-    ib = _reg_incomplete_beta(x, a, b)
-    if t >= 0:
-        return 1.0 - 0.5 * ib
-    else:
-        return 0.5 * ib
+    at = abs(t)
+    table = _cached_t_table(float(df)) if _TABLE_T0 <= at < _TABLE_T1 and float(df).is_integer() else None
+    if table is not None:
+        F, dF = table
+        u = (at - _TABLE_T0) / _TABLE_STEP
+        k = int(u)
+        s = u - k
+        s2 = s * s
+        s3 = s2 * s
+        c = ((2.0 * s3 - 3.0 * s2 + 1.0) * F[k] + (s3 - 2.0 * s2 + s) * dF[k]
+             + (3.0 * s2 - 2.0 * s3) * F[k + 1] + (s3 - s2) * dF[k + 1])
+        return c if t >= 0 else 1.0 - c
+    return _t_cdf_cf(t, df)
 
 
 def _p_value_from_cdf(cdf_at_stat: float, alternative: Alternative) -> float:
@@ -151,7 +360,7 @@ def _p_value_from_cdf(cdf_at_stat: float, alternative: Alternative) -> float:
         raise ValueError("alternative must be 'two-sided', 'greater', or 'less'")
 
 def z_test_1sample(
-    sample: Iterable[float],
+    sample: Sample,
     mu0: float,
     sigma: float,
     alternative: Alternative = "two-sided",
@@ -159,12 +368,12 @@ def z_test_1sample(
     """
     One-sample z-test: population mean mu0 known, population std sigma known.
     """
-    xs = _to_list(sample)
+    ms = _moments(sample)
     if sigma <= 0:
         raise ValueError("sigma must be > 0")
 
-    n = len(xs)
-    xbar = mean(xs)
+    n = ms.n
+    xbar = ms.mean
     se = sigma / math.sqrt(n)
     z = (xbar - mu0) / se
 
@@ -183,20 +392,20 @@ def z_test_1sample(
 
 
 def t_test_1sample(
-    sample: Iterable[float],
+    sample: Sample,
     mu0: float,
     alternative: Alternative = "two-sided",
 ) -> TestResult:
     """
     One-sample t-test: population mean mu0 known, population std unknown.
     """
-    xs = _to_list(sample)
-    n = len(xs)
+    ms = _moments(sample)
+    n = ms.n
     if n < 2:
         raise ValueError("need at least 2 observations for 1-sample t-test")
 
-    xbar = mean(xs)
-    s = sample_std(xs)
+    xbar = ms.mean
+    s = ms.std
     se = s / math.sqrt(n)
     t = (xbar - mu0) / se
     df = n - 1
@@ -216,8 +425,8 @@ def t_test_1sample(
 
 
 def t_test_independent(
-    sample1: Iterable[float],
-    sample2: Iterable[float],
+    sample1: Sample,
+    sample2: Sample,
     alternative: Alternative = "two-sided",
     equal_var: bool = False,
 ) -> TestResult:
@@ -226,14 +435,14 @@ def t_test_independent(
     - equal_var=False: Welch's t-test (default)
     - equal_var=True : pooled variance (classical Student t-test)
     """
-    x1 = _to_list(sample1)
-    x2 = _to_list(sample2)
-    n1, n2 = len(x1), len(x2)
+    s1 = _moments(sample1)
+    s2 = _moments(sample2)
+    n1, n2 = s1.n, s2.n
     if n1 < 2 or n2 < 2:
         raise ValueError("each group needs at least 2 observations")
 
-    m1, m2 = mean(x1), mean(x2)
-    v1, v2 = sample_var(x1), sample_var(x2)
+    m1, m2 = s1.mean, s2.mean
+    v1, v2 = s1.var, s2.var
 
     if equal_var:
         df = n1 + n2 - 2
@@ -281,16 +490,33 @@ def t_test_paired(
     """
     Paired t-test: same individuals measured twice.
     Performs 1-sample t-test on differences (after - before).
+    The differences are accumulated in one pass; to test precomputed summary
+    statistics of the differences, pass a Moments to t_test_1sample with mu0=0.
     """
-    b = _to_list(before)
-    a = _to_list(after)
-    if len(b) != len(a):
-        raise ValueError("paired samples must have the same length")
-    if len(b) < 2:
+    if _is_numeric_array(before) and _is_numeric_array(after):
+        if before.size != after.size:
+            raise ValueError("paired samples must have the same length")
+        ms = Moments()._extend_blocks(a - b for b, a in zip(_array_blocks(before), _array_blocks(after)))
+        return _paired_result(ms, alternative)
+
+    missing = object()
+
+    def diffs():
+        for bi, ai in zip_longest(before, after, fillvalue=missing):
+            if bi is missing or ai is missing:
+                raise ValueError("paired samples must have the same length")
+            yield _check(ai) - _check(bi)
+
+    return _paired_result(_moments(diffs()), alternative)
+
+
+def _paired_result(ms: Moments, alternative: Alternative) -> TestResult:
+    if ms.n == 0:
+        raise ValueError("sample is empty")
+    if ms.n < 2:
         raise ValueError("need at least 2 pairs")
 
-    diffs = [ai - bi for ai, bi in zip(a, b)]
-    res = t_test_1sample(diffs, mu0=0.0, alternative=alternative)
+    res = t_test_1sample(ms, mu0=0.0, alternative=alternative)
     return TestResult(
         test="t_test_paired",
         statistic=res.statistic,
@@ -315,3 +541,8 @@ if __name__ == "__main__":
     before = [50, 52, 49, 51, 50]
     after = [53, 54, 50, 52, 55]
     print(t_test_paired(before, after, alternative="greater"))
+
+    # summary statistics merged from two chunks, same result as the raw samples
+    s1 = Moments.from_iterable(g1[:3]) + Moments.from_iterable(g1[3:])
+    print(t_test_independent(s1, Moments.from_stats(len(g2), mean(g2), sample_std(g2)),
+                             alternative="greater", equal_var=False))
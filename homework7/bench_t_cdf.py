@@ -0,0 +1,189 @@
+"""Accuracy / speed report for the Student-t CDF used by the tests.
+
+Compares ``_t_cdf`` (Hermite tables + Lentz continued fraction) and the
+previous implementation (fixed 200-term continued fraction) against a
+50-digit ``decimal`` reference, and times both per call.
+
+Run ``python bench_t_cdf.py`` or ``python bench_t_cdf.py --out result.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+from decimal import Decimal, localcontext
+from typing import Callable, Dict, List, Tuple
+
+from stat_tests import _impl
+
+DFS = [1, 2, 3, 5, 10, 30, 100, 1000]
+# off the table nodes (step 1/128) so interpolation error is measured too
+T_GRID = [k / 16 + 0.00292969 * math.pi for k in range(-128, 128)]  # about -8 .. 8
+TIMING_CALLS = 20000
+
+_PI = Decimal("3.14159265358979323846264338327950288419716939937510582097494")
+
+
+def legacy_t_cdf(t: float, df: float) -> float:
+    """The CDF as computed before the Lentz / table change (for comparison)."""
+    x = df / (df + t * t)
+    a, b = df / 2.0, 0.5
+    if x == 0.0 or x == 1.0:
+        ib = x
+    else:
+        bt = math.exp(a * math.log(x) + b * math.log(1.0 - x)
+                      - (math.lgamma(a) + math.lgamma(b) - math.lgamma(a + b)))
+        if x < (a + 1.0) / (a + b + 2.0):
+            ib = bt * _legacy_betacf(a, b, x) / a
+        else:
+            ib = 1.0 - bt * _legacy_betacf(b, a, 1.0 - x) / b
+    return 1.0 - 0.5 * ib if t >= 0 else 0.5 * ib
+
+
+def _legacy_betacf(a: float, b: float, x: float, max_iter: int = 200, eps: float = 3e-14) -> float:
+    am, bm, az = 1.0, 1.0, 1.0
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    bz = 1.0 - qab * x / qap
+    if abs(bz) < 1e-300:
+        bz = 1e-300
+    for m in range(1, max_iter + 1):
+        em = float(m)
+        tem = em + em
+        d = em * (b - em) * x / ((qam + tem) * (a + tem))
+        ap = az + d * am
+        bp = bz + d * bm
+        d = -(a + em) * (qab + em) * x / ((a + tem) * (qap + tem))
+        app = ap + d * az
+        bpp = bp + d * bz
+        am, bm = az, bz
+        az, bz = app, bpp
+        if abs(bz) < 1e-300:
+            bz = 1e-300
+        if abs(az - am) < eps * abs(az):
+            return az / bz
+    return az / bz
+
+
+def _log_beta_half(df: int) -> Decimal:
+    # B(df/2, 1/2) in closed form for integer df
+    k = df // 2
+    if df % 2 == 0:
+        beta = Decimal(math.factorial(k - 1) * 4 ** k * math.factorial(k)) / Decimal(math.factorial(2 * k))
+    else:
+        beta = Decimal(math.factorial(2 * k)) * _PI / Decimal(4 ** k * math.factorial(k) ** 2)
+    return beta.ln()
+
+
+def reference_t_cdf(t: float, df: int) -> float:
+    """50-digit Lentz continued fraction, integer df only."""
+    with localcontext() as ctx:
+        ctx.prec = 50
+        T, D = Decimal(t), Decimal(df)
+        if T == 0:
+            return 0.5
+        x = D / (D + T * T)
+        y = T * T / (D + T * T)
+        a, b = D / 2, Decimal("0.5")
+        bt = (a * x.ln() + b * y.ln() - _log_beta_half(df)).exp()
+        if x < (a + 1) / (a + b + 2):
+            ib = bt * _decimal_betacf(a, b, x) / a
+        else:
+            ib = 1 - bt * _decimal_betacf(b, a, y) / b
+        cdf = 1 - ib / 2 if T > 0 else ib / 2
+        return float(cdf)
+
+
+def _decimal_betacf(a: Decimal, b: Decimal, x: Decimal) -> Decimal:
+    tiny, eps = Decimal("1e-300"), Decimal("1e-45")
+    qab, qap, qam = a + b, a + 1, a - 1
+    c, d = Decimal(1), 1 - qab * x / qap
+    d = 1 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 100000):
+        m2 = 2 * m
+        for aa in (m * (b - m) * x / ((qam + m2) * (a + m2)),
+                   -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))):
+            d = 1 + aa * d
+            d = 1 / (d if abs(d) > tiny else tiny)
+            c = 1 + aa / c
+            c = c if abs(c) > tiny else tiny
+            delta = d * c
+            h *= delta
+        if abs(delta - 1) < eps:
+            return h
+    return h
+
+
+def _warm_tables(dfs) -> None:
+    # tables are built only after a df recurs _TABLE_MIN_CALLS times
+    for df in dfs:
+        for _ in range(_impl._TABLE_MIN_CALLS):
+            _impl._t_cdf(1.0, float(df))
+
+
+def accuracy() -> List[dict]:
+    _warm_tables(DFS)
+    rows = []
+    for df in DFS:
+        err_new, err_old = 0.0, 0.0
+        for t in T_GRID:
+            ref = reference_t_cdf(t, df)
+            err_new = max(err_new, abs(_impl._t_cdf(t, df) - ref))
+            err_old = max(err_old, abs(legacy_t_cdf(t, df) - ref))
+        rows.append({"df": df, "max_abs_err": err_new, "legacy_max_abs_err": err_old})
+    return rows
+
+
+def _per_call(fn: Callable[[float, float], float], args: List[Tuple[float, float]]) -> float:
+    t0 = time.perf_counter()
+    for t, df in args:
+        fn(t, df)
+    return (time.perf_counter() - t0) / len(args)
+
+
+def timing(calls: int) -> Dict[str, dict]:
+    rng = random.Random(0)
+    workloads = {
+        # typical test statistics with recurring integer df (tables are built on first use)
+        "integer_df": [(rng.gauss(0.0, 2.0), float(rng.choice(DFS))) for _ in range(calls)],
+        # Welch-style fractional df: continued fraction only
+        "fractional_df": [(rng.gauss(0.0, 2.0), rng.uniform(2.0, 500.0)) for _ in range(calls)],
+    }
+    out = {}
+    for name, args in workloads.items():
+        _warm_tables(DFS)  # warm the per-df caches
+        new = _per_call(_impl._t_cdf, args)
+        old = _per_call(legacy_t_cdf, args[: max(1, calls // 10)])
+        out[name] = {"us_per_call": new * 1e6, "legacy_us_per_call": old * 1e6, "speedup": old / new}
+    return out
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--out", help="write the report as JSON")
+    ap.add_argument("--calls", type=int, default=TIMING_CALLS)
+    args = ap.parse_args(argv)
+
+    report = {
+        "python": platform.python_version(),
+        "accuracy": accuracy(),
+        "timing": timing(args.calls),
+    }
+    for row in report["accuracy"]:
+        print(f"df={row['df']:>5}  max|err|={row['max_abs_err']:.2e}  legacy={row['legacy_max_abs_err']:.2e}")
+    for name, row in report["timing"].items():
+        print(f"{name:>14}: {row['us_per_call']:.2f} us/call  legacy {row['legacy_us_per_call']:.2f} us/call"
+              f"  speedup {row['speedup']:.1f}x")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""Stream one numeric column from a large file into a Moments accumulator.
+
+Text files (CSV / TSV / whitespace) are memory-mapped and cut into fixed-size
+byte chunks at line boundaries; raw binary files are opened with np.memmap and
+read in fixed-size row chunks. Only one chunk is materialized at a time, so
+memory use does not depend on the file size.
+
+    res = column_moments("revenue.csv", column=2, skip_header=1)
+    print(res, t_test_1sample(res.moments, mu0=40.0))
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import time
+from dataclasses import dataclass
+from typing import Iterator, Optional, Union
+
+import numpy as np
+
+from stat_tests import Moments
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+# bytes of text parsed per chunk / rows of binary data per chunk
+CHUNK_BYTES = 1 << 23
+CHUNK_ROWS = 1 << 20
+
+
+@dataclass(frozen=True)
+class LoadResult:
+    moments: Moments
+    rows: int
+    bytes: int
+    seconds: float
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float("inf")
+
+    def __str__(self) -> str:
+        return (
+            f"LoadResult(rows={self.rows}, bytes={self.bytes}, seconds={self.seconds:.3f}, "
+            f"rows_per_sec={self.rows_per_sec:.4g}, mean={self.moments.mean:.6g})"
+        )
+
+
+def _parse_column(data: bytes, column: int, delimiter: Optional[bytes]) -> np.ndarray:
+    lines = data.splitlines()
+    try:
+        if column == 0 and delimiter is not None:
+            fields = [ln.split(delimiter, 1)[0] for ln in lines if ln.strip()]
+        else:
+            fields = [ln.split(delimiter)[column] for ln in lines if ln.strip()]
+    except IndexError:
+        raise ValueError(f"a row has no column {column}") from None
+    if not fields:
+        return np.empty(0, dtype=np.float64)
+    try:
+        # one C-level conversion of the whole chunk (bytes -> float64)
+        return np.array(fields).astype(np.float64)
+    except ValueError:
+        for v in fields:
+            try:
+                float(v)
+            except ValueError:
+                raise ValueError(f"invalid numeric value in sample: {v.decode(errors='replace').strip()!r}") from None
+        raise
+
+
+def iter_text_column(
+    path: PathLike,
+    column: int = 0,
+    delimiter: Optional[str] = ",",
+    skip_header: int = 0,
+    chunk_bytes: int = CHUNK_BYTES,
+) -> Iterator[np.ndarray]:
+    """
+    Yield float64 arrays holding `column` of consecutive rows of a text file.
+    delimiter=None splits on runs of whitespace. Blank lines are skipped.
+    """
+    if column < 0:
+        raise ValueError("column must be >= 0")
+    if chunk_bytes < 1:
+        raise ValueError("chunk_bytes must be >= 1")
+    delim = None if delimiter is None else delimiter.encode()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = 0
+            for _ in range(skip_header):
+                nl = mm.find(b"\n", pos)
+                pos = size if nl < 0 else nl + 1
+            while pos < size:
+                end = min(pos + chunk_bytes, size)
+                if end < size:
+                    nl = mm.rfind(b"\n", pos, end)
+                    if nl < 0:  # a single line longer than the chunk
+                        nl = mm.find(b"\n", end)
+                        nl = size - 1 if nl < 0 else nl
+                    end = nl + 1
+                chunk = _parse_column(mm[pos:end], column, delim)
+                pos = end
+                if chunk.size:
+                    yield chunk
+
+
+def iter_binary_column(
+    path: PathLike,
+    dtype: Union[str, np.dtype] = "<f8",
+    columns: int = 1,
+    column: int = 0,
+    offset: int = 0,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Iterator[np.ndarray]:
+    """
+    Yield float64 arrays of one column of a raw binary file of fixed-width
+    records (`columns` values of `dtype` per row, starting at byte `offset`).
+    """
+    if not 0 <= column < columns:
+        raise ValueError("column must be in [0, columns)")
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be >= 1")
+    dt = np.dtype(dtype)
+    row_bytes = dt.itemsize * columns
+    n_rows = max(0, os.path.getsize(path) - offset) // row_bytes
+    if n_rows == 0:
+        return
+    mm = np.memmap(path, dtype=dt, mode="r", offset=offset, shape=(n_rows, columns))
+    try:
+        for start in range(0, n_rows, chunk_rows):
+            # the copy brings only this chunk into memory (and converts to float64)
+            yield np.array(mm[start:start + chunk_rows, column], dtype=np.float64)
+    finally:
+        del mm
+
+
+def column_moments(
+    path: PathLike,
+    binary: bool = False,
+    moments: Optional[Moments] = None,
+    **options,
+) -> LoadResult:
+    """
+    Feed one column of `path` into a Moments accumulator (a new one, or
+    `moments` to continue an existing one) and report throughput.
+    Keyword options go to iter_text_column or iter_binary_column.
+    """
+    m = Moments() if moments is None else moments
+    chunks = iter_binary_column(path, **options) if binary else iter_text_column(path, **options)
+    rows = 0
+    t0 = time.perf_counter()
+    for chunk in chunks:
+        m.extend(chunk)
+        rows += chunk.shape[0]
+    seconds = time.perf_counter() - t0
+    return LoadResult(m, rows, os.path.getsize(path), seconds)
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    from stat_tests import t_test_1sample
+
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(3.0, 1.0, size=2_000_000)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "revenue.csv")
+        with open(csv_path, "w", encoding="utf-8") as f:
+            f.write("user_id,country,revenue\n")
+            for start in range(0, values.shape[0], 100_000):
+                block = values[start:start + 100_000]
+                f.write("".join(f"{start + i},TW,{v:.6f}\n" for i, v in enumerate(block.tolist())))
+        res = column_moments(csv_path, column=2, skip_header=1)
+        print("csv   :", res)
+
+        bin_path = os.path.join(tmp, "revenue.f8")
+        values.astype("<f8").tofile(bin_path)
+        res_bin = column_moments(bin_path, binary=True)
+        print("binary:", res_bin)
+        print(t_test_1sample(res_bin.moments, mu0=float(np.exp(3.5))))
@@ -0,0 +1,293 @@
+"""Sequential (online) two-sample tests that can be checked after every observation.
+
+Both arms are Moments accumulators, so each observation is an O(1) Welford
+update and no test ever looks at the raw data again.
+
+- MSPRT: mixture sequential probability ratio test with an always-valid
+  p-value (Johari et al.), safe to peek at any time.
+- GroupSequentialTest: planned interim looks with Lan-DeMets alpha spending
+  (O'Brien-Fleming or Pocock type); each look's boundary is found by
+  recursive numerical integration over a z-grid, O(grid^2) per look.
+
+The tested difference is mean(b) - mean(a) (treatment minus control).
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Iterable, List, Literal, Optional
+
+import numpy as np
+
+from stat_tests import Alternative, Moments, TestResult
+
+Spending = Literal["obf", "pocock"]
+
+_STD_NORMAL = NormalDist()
+# grid points per unit of z for the group-sequential recursion
+_GRID_PER_UNIT = 40
+_GRID_HALF_WIDTH = 8.0
+
+_erfc = np.frompyfunc(math.erfc, 1, 1)
+
+
+def _norm_cdf(x: np.ndarray) -> np.ndarray:
+    return 0.5 * _erfc(-np.asarray(x, dtype=np.float64) / math.sqrt(2.0)).astype(np.float64)
+
+
+class _TwoArms:
+    def __init__(self) -> None:
+        self.a = Moments()
+        self.b = Moments()
+
+    def add_a(self, x: float) -> None:
+        self.a.add(x)
+        self._observed()
+
+    def add_b(self, x: float) -> None:
+        self.b.add(x)
+        self._observed()
+
+    def extend_a(self, xs: Iterable[float]) -> None:
+        self.a.extend(xs)
+        self._observed()
+
+    def extend_b(self, xs: Iterable[float]) -> None:
+        self.b.extend(xs)
+        self._observed()
+
+    def _observed(self) -> None:
+        pass
+
+    @property
+    def ready(self) -> bool:
+        return self.a.n >= 2 and self.b.n >= 2
+
+    @property
+    def estimate(self) -> float:
+        return self.b.mean - self.a.mean
+
+    @property
+    def variance(self) -> float:
+        """Estimated variance of the difference in means (Welch)."""
+        return self.a.var / self.a.n + self.b.var / self.b.n
+
+    @property
+    def statistic(self) -> float:
+        if not self.ready:
+            raise ValueError("each group needs at least 2 observations")
+        v = self.variance
+        if v <= 0.0:
+            raise ValueError("both groups have zero variance")
+        return self.estimate / math.sqrt(v)
+
+
+class MSPRT(_TwoArms):
+    """
+    Mixture SPRT for mean(b) - mean(a) with a N(0, tau^2) mixing prior
+    (half-normal for one-sided alternatives). tau is on the scale of the
+    effect, e.g. the smallest difference worth detecting.
+
+    p_value is the always-valid p-value: the running minimum of 1 / Lambda_n.
+    add_* updates it after every observation; extend_* only at the end of the
+    chunk, which is conservative (the minimum is taken over fewer points).
+    The variance is a plug-in estimate, so p_value stays at 1 until both arms
+    have burn_in observations (with only a handful the estimate is too noisy
+    and early peeks inflate the type I error).
+    """
+
+    def __init__(self, tau: float, alternative: Alternative = "two-sided", burn_in: int = 30) -> None:
+        super().__init__()
+        if not tau > 0:
+            raise ValueError("tau must be > 0")
+        if burn_in < 2:
+            raise ValueError("burn_in must be >= 2")
+        if alternative not in ("two-sided", "greater", "less"):
+            raise ValueError("alternative must be 'two-sided', 'greater', or 'less'")
+        self.tau2 = float(tau) ** 2
+        self.alternative = alternative
+        self.burn_in = burn_in
+        self.p_value = 1.0
+
+    def log_likelihood_ratio(self) -> float:
+        v = self.variance
+        r = v + self.tau2
+        d = self.estimate
+        log_lr = 0.5 * math.log(v / r) + self.tau2 * d * d / (2.0 * v * r)
+        if self.alternative == "two-sided":
+            return log_lr
+        m = d * math.sqrt(self.tau2 / (v * r))
+        if self.alternative == "less":
+            m = -m
+        # half-normal prior: 2 * Phi(m) times the two-sided mixture
+        return log_lr + math.log(2.0) + math.log(max(_STD_NORMAL.cdf(m), 1e-300))
+
+    def _observed(self) -> None:
+        if min(self.a.n, self.b.n) >= self.burn_in and self.variance > 0.0:
+            self.p_value = min(self.p_value, math.exp(-max(self.log_likelihood_ratio(), 0.0)))
+
+    def reject(self, alpha: float = 0.05) -> bool:
+        return self.p_value <= alpha
+
+    def result(self) -> TestResult:
+        return TestResult(
+            test="msprt",
+            statistic=self.statistic,
+            p_value=self.p_value,
+            df=None,
+            n1=self.b.n,
+            n2=self.a.n,
+            alternative=self.alternative,
+        )
+
+
+@dataclass(frozen=True)
+class Look:
+    k: int
+    information: float   # fraction of the planned information, in (0, 1]
+    statistic: float     # Welch z at this look
+    boundary: float      # reject when |z| >= boundary
+    alpha_spent: float   # cumulative alpha spent up to this look
+    reject: bool
+
+
+class GroupSequentialTest(_TwoArms):
+    """
+    Two-sided group-sequential design with Lan-DeMets alpha spending.
+    n_per_arm is the planned (maximum) sample size per arm; the information
+    fraction at a look is 1/(1/n_a + 1/n_b) relative to the balanced plan.
+    Call look() at each interim analysis; looks need not be equally spaced.
+    """
+
+    def __init__(self, n_per_arm: int, alpha: float = 0.05, spending: Spending = "obf") -> None:
+        super().__init__()
+        if n_per_arm < 2:
+            raise ValueError("n_per_arm must be >= 2")
+        if not 0.0 < alpha < 1.0:
+            raise ValueError("alpha must be in (0, 1)")
+        if spending not in ("obf", "pocock"):
+            raise ValueError("spending must be 'obf' or 'pocock'")
+        self.n_per_arm = n_per_arm
+        self.alpha = alpha
+        self.spending = spending
+        self.looks: List[Look] = []
+        self._grid: Optional[np.ndarray] = None      # z values of the continuation region
+        self._density: Optional[np.ndarray] = None   # sub-density of Z there (not yet stopped)
+
+    def spent(self, t: float) -> float:
+        """Cumulative (two-sided) alpha allowed by information fraction t; alpha / 2 per side."""
+        t = min(max(t, 0.0), 1.0)
+        if t == 0.0:
+            return 0.0
+        if self.spending == "obf":
+            z = _STD_NORMAL.inv_cdf(1.0 - self.alpha / 4.0)
+            return 2.0 * (2.0 - 2.0 * _STD_NORMAL.cdf(z / math.sqrt(t)))
+        return self.alpha * math.log(1.0 + (math.e - 1.0) * t)
+
+    def information(self) -> float:
+        if self.a.n == 0 or self.b.n == 0:
+            return 0.0
+        return min(1.0, (1.0 / (1.0 / self.a.n + 1.0 / self.b.n)) / (self.n_per_arm / 2.0))
+
+    def look(self) -> Look:
+        if self.looks and self.looks[-1].reject:
+            raise ValueError("the test already stopped")
+        t = self.information()
+        t_prev = self.looks[-1].information if self.looks else 0.0
+        if not t > t_prev:
+            raise ValueError("no new information since the previous look")
+        z = self.statistic
+        target = self.spent(t) - self.spent(t_prev)
+        c = self._boundary(t_prev, t, target)
+        prev_spent = self.looks[-1].alpha_spent if self.looks else 0.0
+        look = Look(len(self.looks) + 1, t, z, c, prev_spent + target, abs(z) >= c)
+        self.looks.append(look)
+        return look
+
+    def _boundary(self, t_prev: float, t: float, target: float) -> float:
+        if self._grid is None:
+            # first look: P(|Z| >= c) = target
+            c = _STD_NORMAL.inv_cdf(1.0 - target / 2.0) if target > 0 else math.inf
+        else:
+            u, f = self._grid, self._density
+            w = self._weights(u)
+            scale = math.sqrt(t - t_prev)
+            mu = u * math.sqrt(t_prev)
+
+            def exit_prob(c: float) -> float:
+                hi = (c * math.sqrt(t) - mu) / scale
+                lo = (-c * math.sqrt(t) - mu) / scale
+                return float(np.sum(w * f * (_norm_cdf(lo) + _norm_cdf(-hi))))
+
+            lo_c, hi_c = 0.0, _GRID_HALF_WIDTH
+            if target <= 0.0 or exit_prob(hi_c) >= target:
+                c = math.inf if target <= 0.0 else hi_c
+            else:
+                for _ in range(60):
+                    mid = 0.5 * (lo_c + hi_c)
+                    if exit_prob(mid) > target:
+                        lo_c = mid
+                    else:
+                        hi_c = mid
+                c = hi_c
+        self._advance(t_prev, t, min(c, _GRID_HALF_WIDTH))
+        return c
+
+    @staticmethod
+    def _weights(u: np.ndarray) -> np.ndarray:
+        w = np.full(u.shape[0], u[1] - u[0] if u.shape[0] > 1 else 1.0)
+        w[0] *= 0.5
+        w[-1] *= 0.5
+        return w
+
+    def _advance(self, t_prev: float, t: float, c: float) -> None:
+        # density of Z_t on (-c, c) for paths that have not crossed any boundary
+        n = max(2, int(2.0 * c * _GRID_PER_UNIT) + 1)
+        z = np.linspace(-c, c, n)
+        if self._grid is None:
+            self._density = np.exp(-0.5 * z * z) / math.sqrt(2.0 * math.pi)
+        else:
+            u, f = self._grid, self._density
+            scale = math.sqrt(t - t_prev)
+            e = (z[:, None] * math.sqrt(t) - u[None, :] * math.sqrt(t_prev)) / scale
+            kern = np.exp(-0.5 * e * e) / math.sqrt(2.0 * math.pi) * (math.sqrt(t) / scale)
+            self._density = kern @ (self._weights(u) * f)
+        self._grid = z
+
+    def result(self) -> TestResult:
+        z = self.statistic
+        p = float(2.0 * _norm_cdf(-abs(z)))
+        return TestResult(
+            test="group_sequential",
+            statistic=z,
+            p_value=p,   # nominal p-value at the latest data; compare decisions via look()
+            df=None,
+            n1=self.b.n,
+            n2=self.a.n,
+            alternative="two-sided",
+        )
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+
+    seq = MSPRT(tau=0.2)
+    for i in range(20000):
+        seq.add_a(rng.normal(1.00, 1.0))
+        seq.add_b(rng.normal(1.05, 1.0))
+        if seq.reject(0.05):
+            print(f"mSPRT stopped after {i + 1} per arm:", seq.result())
+            break
+    else:
+        print("mSPRT did not stop:", seq.result())
+
+    gs = GroupSequentialTest(n_per_arm=5000, alpha=0.05, spending="obf")
+    for k in range(5):
+        gs.extend_a(rng.normal(1.00, 1.0, size=1000))
+        gs.extend_b(rng.normal(1.05, 1.0, size=1000))
+        look = gs.look()
+        print(look)
+        if look.reject:
+            break
@@ -0,0 +1,48 @@
+"""Importable name for homework7/1.py (``from stat_tests import t_test_1sample, Moments``)."""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import sys
+
+_MODULE_NAME = "homework7_stat_tests_impl"
+
+
+def _load():
+    mod = sys.modules.get(_MODULE_NAME)
+    if mod is not None:
+        return mod
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1.py")
+    spec = importlib.util.spec_from_file_location(_MODULE_NAME, path)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[_MODULE_NAME] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+_impl = _load()
+
+Alternative = _impl.Alternative
+TestResult = _impl.TestResult
+Moments = _impl.Moments
+mean = _impl.mean
+sample_var = _impl.sample_var
+sample_std = _impl.sample_std
+z_test_1sample = _impl.z_test_1sample
+t_test_1sample = _impl.t_test_1sample
+t_test_independent = _impl.t_test_independent
+t_test_paired = _impl.t_test_paired
+
+__all__ = [
+    "Alternative",
+    "TestResult",
+    "Moments",
+    "mean",
+    "sample_var",
+    "sample_std",
+    "z_test_1sample",
+    "t_test_1sample",
+    "t_test_independent",
+    "t_test_paired",
+]
@@ -0,0 +1,281 @@
+"""
+1.py 資訊量的 NumPy 版本：熵、交叉熵、KL 散度、互資訊
+
+- 稠密版本：最後一軸（互資訊為最後兩軸）是分佈，前面的軸都是批次軸，一次算完整批
+- 稀疏版本：COOJoint / CSRJoint 表示大部分為 0 的聯合分佈表（可含批次軸），
+  互資訊只走訪非零項，成本為 O(nnz + B*(X+Y))
+- 與 1.py 相同：以 ln 為底（nats）、自動正規化、log 前把機率夾在 [EPS, 1]
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from info_theory import EPS
+
+
+def _log_clip(p: np.ndarray) -> np.ndarray:
+    return np.log(np.clip(p, EPS, 1.0))
+
+
+def normalize_array(p, axis: int = -1, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """沿 axis 正規化；傳入 out（可以就是 p）時直接寫入，不另外配置陣列"""
+    p = np.asarray(p, dtype=np.float64)
+    s = p.sum(axis=axis, keepdims=True)
+    if np.any(s <= 0):
+        raise ValueError("distribution sum must be > 0")
+    return np.divide(p, s, out=out)
+
+
+def entropy_array(p) -> np.ndarray:
+    """H(p) = - sum p_i log p_i，沿最後一軸；回傳批次形狀的陣列（單一分佈為 0 維）"""
+    p = normalize_array(p)
+    return -np.sum(p * _log_clip(p), axis=-1)
+
+
+def _pair(p, q) -> Tuple[np.ndarray, np.ndarray]:
+    p = np.asarray(p, dtype=np.float64)
+    q = np.asarray(q, dtype=np.float64)
+    if p.shape[-1:] != q.shape[-1:]:
+        raise ValueError("p and q must have same length")
+    return normalize_array(p), normalize_array(q)
+
+
+def cross_entropy_array(p, q) -> np.ndarray:
+    """H(p, q) = - sum p_i log q_i；p、q 的批次軸可廣播"""
+    p, q = _pair(p, q)
+    return -np.sum(p * _log_clip(q), axis=-1)
+
+
+def kl_divergence_array(p, q) -> np.ndarray:
+    """KL(p||q) = sum p_i log(p_i/q_i)；p、q 的批次軸可廣播"""
+    p, q = _pair(p, q)
+    return np.sum(p * (_log_clip(p) - _log_clip(q)), axis=-1)
+
+
+def mutual_information_array(joint) -> np.ndarray:
+    """
+    I(X;Y)，joint 形狀 (..., X, Y)，最後兩軸是聯合分佈表，會自動正規化
+    邊際分佈各只算一次（axis 加總），p(x,y) <= 0 的格子不計入
+    """
+    p = np.asarray(joint, dtype=np.float64)
+    if p.ndim < 2:
+        raise ValueError("joint must have at least 2 dimensions")
+    total = p.sum(axis=(-2, -1), keepdims=True)
+    if np.any(total <= 0):
+        raise ValueError("joint sum must be > 0")
+    p = p / total
+    px = p.sum(axis=-1, keepdims=True)
+    py = p.sum(axis=-2, keepdims=True)
+    mask = p > 0
+    terms = np.log(p, where=mask, out=np.zeros_like(p))
+    terms -= _log_clip(px)
+    terms -= _log_clip(py)
+    terms *= np.where(mask, p, 0.0)
+    return terms.sum(axis=(-2, -1))
+
+
+def _joint_shape(shape) -> Tuple[int, int, int]:
+    shape = tuple(int(s) for s in shape)
+    if len(shape) == 2:
+        shape = (1,) + shape
+    if len(shape) != 3 or min(shape) < 1:
+        raise ValueError("shape must be (X, Y) or (B, X, Y) with positive sizes")
+    return shape
+
+
+def _index_array(a, size: int, name: str) -> np.ndarray:
+    a = np.asarray(a, dtype=np.int64).reshape(-1)
+    if a.size and (a.min() < 0 or a.max() >= size):
+        raise ValueError(f"{name} index out of range")
+    return a
+
+
+@dataclass(frozen=True)
+class COOJoint:
+    """
+    稀疏聯合分佈表（COO）：第 k 個值 data[k] 位於 (batch[k], row[k], col[k])
+    shape 為 (X, Y) 或 (B, X, Y)，batch=None 表示全部在第 0 批
+    同一格出現多次時數值相加；canonical=True 表示已排序且沒有重複
+    """
+    row: np.ndarray
+    col: np.ndarray
+    data: np.ndarray
+    shape: Tuple[int, int, int]
+    batch: Optional[np.ndarray] = None
+    canonical: bool = False
+
+    def __post_init__(self) -> None:
+        shape = _joint_shape(self.shape)
+        B, X, Y = shape
+        data = np.asarray(self.data, dtype=np.float64).reshape(-1)
+        row = _index_array(self.row, X, "row")
+        col = _index_array(self.col, Y, "col")
+        batch = np.zeros(data.shape[0], dtype=np.int64) if self.batch is None else _index_array(self.batch, B, "batch")
+        if not row.shape[0] == col.shape[0] == batch.shape[0] == data.shape[0]:
+            raise ValueError("row, col, batch and data must have the same length")
+        if not np.isfinite(data).all():
+            raise ValueError("joint values must be finite")
+        object.__setattr__(self, "shape", shape)
+        object.__setattr__(self, "row", row)
+        object.__setattr__(self, "col", col)
+        object.__setattr__(self, "data", data)
+        object.__setattr__(self, "batch", batch)
+
+    @property
+    def nnz(self) -> int:
+        return self.data.shape[0]
+
+    @classmethod
+    def from_dense(cls, joint) -> "COOJoint":
+        """由 (X, Y) 或 (B, X, Y) 稠密陣列建立，只保留非零值"""
+        a = np.asarray(joint, dtype=np.float64)
+        if a.ndim == 2:
+            a = a[None]
+        if a.ndim != 3:
+            raise ValueError("joint must be 2-D or 3-D")
+        b, r, c = np.nonzero(a)
+        return cls(r, c, a[b, r, c], a.shape, batch=b, canonical=True)
+
+    def coalesce(self) -> "COOJoint":
+        """依 (batch, row, col) 排序並合併重複的格子"""
+        if self.canonical:
+            return self
+        B, X, Y = self.shape
+        if self.nnz == 0:
+            return COOJoint(self.row, self.col, self.data, self.shape, batch=self.batch, canonical=True)
+        key = (self.batch * X + self.row) * Y + self.col
+        order = np.argsort(key, kind="stable")
+        key = key[order]
+        starts = np.flatnonzero(np.concatenate(([True], key[1:] != key[:-1])))
+        data = np.add.reduceat(self.data[order], starts)
+        key = key[starts]
+        rc, col = np.divmod(key, Y)
+        batch, row = np.divmod(rc, X)
+        return COOJoint(row, col, data, self.shape, batch=batch, canonical=True)
+
+    def to_csr(self) -> "CSRJoint":
+        B, X, Y = self.shape
+        coo = self.coalesce()
+        counts = np.bincount(coo.batch * X + coo.row, minlength=B * X)
+        indptr = np.concatenate(([0], np.cumsum(counts)))
+        return CSRJoint(indptr, coo.col, coo.data, self.shape)
+
+    def to_dense(self) -> np.ndarray:
+        out = np.zeros(self.shape)
+        np.add.at(out, (self.batch, self.row, self.col), self.data)
+        return out
+
+
+@dataclass(frozen=True)
+class CSRJoint:
+    """
+    稀疏聯合分佈表（CSR）：把 (B, X, Y) 看成 B*X 列，
+    第 i 列（批次 i // X、x = i % X）的值為 data[indptr[i]:indptr[i+1]]，欄為 indices
+    同一列內的欄索引不可重複（COOJoint.to_csr() 產生的都符合）
+    """
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+    shape: Tuple[int, int, int]
+
+    def __post_init__(self) -> None:
+        shape = _joint_shape(self.shape)
+        B, X, Y = shape
+        indptr = np.asarray(self.indptr, dtype=np.int64).reshape(-1)
+        data = np.asarray(self.data, dtype=np.float64).reshape(-1)
+        indices = _index_array(self.indices, Y, "col")
+        if indptr.shape[0] != B * X + 1 or indptr[0] != 0 or np.any(np.diff(indptr) < 0):
+            raise ValueError("indptr must be non-decreasing, start at 0 and have B*X+1 entries")
+        if not indptr[-1] == indices.shape[0] == data.shape[0]:
+            raise ValueError("indices and data must have indptr[-1] entries")
+        if not np.isfinite(data).all():
+            raise ValueError("joint values must be finite")
+        object.__setattr__(self, "shape", shape)
+        object.__setattr__(self, "indptr", indptr)
+        object.__setattr__(self, "indices", indices)
+        object.__setattr__(self, "data", data)
+
+    @property
+    def nnz(self) -> int:
+        return self.data.shape[0]
+
+    @classmethod
+    def from_dense(cls, joint) -> "CSRJoint":
+        return COOJoint.from_dense(joint).to_csr()
+
+    def row_ids(self) -> np.ndarray:
+        """每個非零值所在的列（0..B*X-1），O(nnz)"""
+        return np.repeat(np.arange(self.indptr.shape[0] - 1), np.diff(self.indptr))
+
+    def to_coo(self) -> COOJoint:
+        B, X, Y = self.shape
+        batch, row = np.divmod(self.row_ids(), X)
+        return COOJoint(row, self.indices, self.data, self.shape, batch=batch, canonical=True)
+
+    def to_dense(self) -> np.ndarray:
+        return self.to_coo().to_dense()
+
+
+SparseJoint = Union[COOJoint, CSRJoint]
+
+
+def _sparse_mi(flat_row: np.ndarray, col: np.ndarray, data: np.ndarray,
+               shape: Tuple[int, int, int]) -> np.ndarray:
+    # flat_row = batch * X + x；每格只出現一次
+    B, X, Y = shape
+    batch = flat_row // X
+    total = np.bincount(batch, weights=data, minlength=B)
+    if np.any(total <= 0):
+        raise ValueError("joint sum must be > 0")
+    px = np.bincount(flat_row, weights=data, minlength=B * X) / np.repeat(total, X)
+    flat_col = batch * Y + col
+    py = np.bincount(flat_col, weights=data, minlength=B * Y) / np.repeat(total, Y)
+    keep = data > 0
+    batch, flat_row, flat_col = batch[keep], flat_row[keep], flat_col[keep]
+    p = data[keep] / total[batch]
+    terms = p * (np.log(p) - _log_clip(px[flat_row]) - _log_clip(py[flat_col]))
+    return np.bincount(batch, weights=terms, minlength=B)
+
+
+def mutual_information_sparse(joint: SparseJoint) -> np.ndarray:
+    """
+    稀疏聯合分佈表的 I(X;Y)，回傳形狀 (B,)
+    邊際分佈以 bincount 一次算出，只有非零項參與 log 與加總
+    """
+    if isinstance(joint, CSRJoint):
+        return _sparse_mi(joint.row_ids(), joint.indices, joint.data, joint.shape)
+    if isinstance(joint, COOJoint):
+        coo = joint.coalesce()
+        return _sparse_mi(coo.batch * coo.shape[1] + coo.row, coo.col, coo.data, coo.shape)
+    raise TypeError("joint must be a COOJoint or CSRJoint")
+
+
+if __name__ == "__main__":
+    import time
+
+    from info_theory import entropy, mutual_information_from_joint
+
+    p = [0.1, 0.2, 0.7]
+    print("H(p)       =", float(entropy_array(p)), entropy(p))
+    print("H(batch)   =", entropy_array([[0.1, 0.2, 0.7], [1.0, 1.0, 1.0]]))
+    joint = [[0.10, 0.10], [0.20, 0.60]]
+    print("I(X;Y)     =", float(mutual_information_array(joint)), mutual_information_from_joint(joint))
+    print("I sparse   =", mutual_information_sparse(COOJoint.from_dense(joint)))
+
+    # 4 張 10^4 x 10^4 的列聯表，每張約 2.5*10^5 個非零格
+    rng = np.random.default_rng(0)
+    B, X, Y, nnz = 4, 10_000, 10_000, 1_000_000
+    b = rng.integers(0, B, nnz)
+    x = rng.integers(0, X, nnz)
+    y = (x + rng.integers(0, 50, nnz)) % Y   # y 與 x 相關
+    coo = COOJoint(x, y, rng.random(nnz), (B, X, Y), batch=b)
+    t0 = time.perf_counter()
+    csr = coo.to_csr()
+    t1 = time.perf_counter()
+    mi = mutual_information_sparse(csr)
+    t2 = time.perf_counter()
+    print(f"sparse MI  = {mi}  (to_csr {t1 - t0:.3f}s, MI {t2 - t1:.3f}s, nnz={csr.nnz})")
@@ -0,0 +1,443 @@
+"""
+由事件串流逐步估計熵與互資訊（以 ln 為底，nats）
+
+事件一筆一筆（add）或一批一批（update）進來，只維護次數表，隨時可以算：
+  H(X) = log N - (1/N) sum c log c，只走訪出現過的符號，O(distinct)
+  I(X;Y) = H(X) + H(Y) - H(X,Y)（plug-in 估計，與把次數表交給 1.py 的結果相同）
+
+次數表有三種模式：
+- "hash"  ：dict 計數，符號可以是任何 hashable（整數、字串、tuple）
+- "array" ：符號為 0..size-1 的整數，以 np.bincount 累積到固定長度的陣列
+- "sketch"：記憶體固定，適合高基數符號。count-min sketch（depth 列、每列 width 格）
+            提供點查詢；佔用格比例低（碰撞少）時熵直接由各列算，
+            否則改用穩定隨機投影草圖（projections 個），誤差約 sqrt(3 / projections) nats，
+            與不同符號數無關
+
+同一模式、同樣參數（sketch 還要同 seed）的估計器可以 merge / 相加，
+讓多個 worker 各自累積後再合併。
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import math
+from collections import Counter
+from typing import Hashable, Iterable, Literal, Optional
+
+import numpy as np
+
+Mode = Literal["hash", "array", "sketch"]
+
+_MASK64 = (1 << 64) - 1
+# 批次筆數小於表長 / 此值時直接累加被碰到的格子，否則整張表做一次 bincount
+_SMALL_BATCH_RATIO = 16
+_PAIR_MULT = np.uint64(0x9E3779B97F4A7C15)
+# 一次產生隨機投影變量的不同符號數（暫存陣列為 projections x 此值）
+_PROJ_BLOCK = 4096
+_HALF_PI = math.pi / 2.0
+
+
+def _entropy_from_counts(c: np.ndarray, n: int) -> float:
+    if n <= 0:
+        raise ValueError("no events observed")
+    c = c[c > 0].astype(np.float64)
+    return max(0.0, math.log(n) - float(np.dot(c, np.log(c))) / n)
+
+
+def _symbol_id(v) -> int:
+    # 各行程一致的 64 位元符號編號（不能用 hash()，字串的 hash 每個行程都不同）
+    if isinstance(v, (bool, int, np.integer, np.bool_)):
+        return int(v) & _MASK64
+    if isinstance(v, (float, np.floating)):
+        return int(np.float64(v).view(np.uint64))   # 與 _symbol_ids 對 float 陣列的編號一致
+    if isinstance(v, np.generic):
+        v = v.item()   # NumPy 2 的 repr(np.str_('a')) 是 "np.str_('a')"，先轉成 Python 值
+    data = v if isinstance(v, bytes) else repr(v).encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def _symbol_ids(xs) -> np.ndarray:
+    if isinstance(xs, np.ndarray):
+        if xs.dtype.kind in "iub":
+            return xs.astype(np.int64, copy=False).view(np.uint64).reshape(-1)
+        if xs.dtype.kind == "f":
+            return xs.astype(np.float64).view(np.uint64).reshape(-1)
+        xs = xs.reshape(-1).tolist()   # 字串 / 物件陣列：與逐筆餵 Python 值得到相同編號
+    return np.fromiter((_symbol_id(v) for v in xs), dtype=np.uint64)
+
+
+def _mix64(z: np.ndarray) -> np.ndarray:
+    # splitmix64 的混合步驟，uint64 運算自然 mod 2^64
+    z = z + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _skewed_stable(ids: np.ndarray, salts: np.ndarray) -> np.ndarray:
+    """
+    由 (符號, 投影) 決定的最大偏斜 1-穩定變量 R，形狀 (len(salts), len(ids))
+    Chambers-Mallows-Stuck 產生 S(1, -1) 後調整尺度，使 E[exp(tR)] = t^t（t > 0）；
+    兩個均勻亂數取自同一個 64 位元雜湊的高、低 32 位元
+    """
+    h = _mix64(ids[None, :] ^ salts[:, None])
+    u = (h >> np.uint64(32)).astype(np.float64)
+    u += 0.5
+    u *= math.pi / 4294967296.0
+    u -= _HALF_PI                                   # U ~ (-pi/2, pi/2)
+    e = (h & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    e += 0.5
+    e *= 1.0 / 4294967296.0
+    np.log(e, out=e)
+    np.negative(e, out=e)                           # W ~ Exp(1)
+    a = _HALF_PI - u
+    t = np.tan(u)
+    # log(pi/2 * W * cos U / (pi/2 - U))，cos U = 1 / sqrt(1 + tan^2 U)
+    r = np.log(e / a)
+    r -= 0.5 * np.log1p(t * t)
+    r += a * t
+    # R = (pi/2) * (2/pi) * (...) + (pi/2) * (2/pi) * log(pi/2) - log(pi/2)
+    return r
+
+
+class _HashCounts:
+    def __init__(self) -> None:
+        self.counts: Counter = Counter()
+        self.n = 0
+
+    def update(self, keys) -> None:
+        if isinstance(keys, np.ndarray):
+            u, c = np.unique(keys, axis=0, return_counts=True)
+            u = u.tolist()
+            if keys.ndim > 1:
+                u = map(tuple, u)
+            for k, m in zip(u, c.tolist()):
+                self.counts[k] += m
+            self.n += int(c.sum())
+        else:
+            keys = list(keys)
+            self.counts.update(keys)
+            self.n += len(keys)
+
+    def update_pairs(self, xs: np.ndarray, ys: np.ndarray) -> None:
+        if xs.dtype.kind in "iu" and ys.dtype.kind in "iu" and xs.size and min(
+                xs.min(), ys.min()) >= -(1 << 31) and max(xs.max(), ys.max()) < (1 << 31):
+            # 兩個 32 位元整數併成一個 int64，一維 np.unique 比 axis=0 快得多
+            key = (xs.astype(np.int64) << 32) | (ys.astype(np.int64) & 0xFFFFFFFF)
+            u, c = np.unique(key, return_counts=True)
+            hi, lo = u >> 32, u & 0xFFFFFFFF
+            lo = np.where(lo >= 1 << 31, lo - (1 << 32), lo)
+            for k, m in zip(zip(hi.tolist(), lo.tolist()), c.tolist()):
+                self.counts[k] += m
+            self.n += xs.shape[0]
+        else:
+            self.update(np.stack([xs, ys], axis=1))
+
+    def merge(self, other: "_HashCounts") -> None:
+        self.counts.update(other.counts)
+        self.n += other.n
+
+    def distinct(self) -> int:
+        return len(self.counts)
+
+    def entropy(self) -> float:
+        return _entropy_from_counts(np.fromiter(self.counts.values(), dtype=np.int64, count=len(self.counts)), self.n)
+
+    def compatible(self, other) -> bool:
+        return isinstance(other, _HashCounts)
+
+
+class _ArrayCounts:
+    def __init__(self, size: int) -> None:
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.n = 0
+
+    def check(self, keys) -> np.ndarray:
+        """keys 轉成一維整數陣列並檢查範圍，不修改計數"""
+        k = np.asarray(keys if isinstance(keys, np.ndarray) else list(keys)).reshape(-1)
+        if k.size == 0:
+            return k
+        if k.dtype.kind not in "iu":
+            raise ValueError("array mode needs integer symbols")
+        if k.min() < 0 or k.max() >= self.counts.shape[0]:
+            raise ValueError(f"symbol out of range [0, {self.counts.shape[0]})")
+        return k
+
+    def update(self, keys) -> None:
+        self.add_checked(self.check(keys))
+
+    def add_checked(self, k: np.ndarray) -> None:
+        if k.size == 0:
+            return
+        if k.shape[0] * _SMALL_BATCH_RATIO < self.counts.shape[0]:
+            np.add.at(self.counts, k, 1)
+        else:
+            self.counts += np.bincount(k, minlength=self.counts.shape[0])
+        self.n += k.shape[0]
+
+    def merge(self, other: "_ArrayCounts") -> None:
+        self.counts += other.counts
+        self.n += other.n
+
+    def distinct(self) -> int:
+        return int(np.count_nonzero(self.counts))
+
+    def entropy(self) -> float:
+        return _entropy_from_counts(self.counts, self.n)
+
+    def compatible(self, other) -> bool:
+        return isinstance(other, _ArrayCounts) and other.counts.shape == self.counts.shape
+
+
+class _CountMin:
+    """
+    count-min 表（點查詢、碰撞少時的熵）加上熵的穩定隨機投影草圖：
+    proj[j] = sum_i c_i R_ij，E[exp(proj[j] / N)] = prod p_i^p_i = exp(-H)，
+    所以 H ~ -log mean_j exp(proj[j] / N)，標準差約 sqrt(3 / projections) nats，
+    與不同符號數無關（Clifford & Cosma 的熵草圖）；兩者都是線性的，可以直接相加合併
+    """
+
+    def __init__(self, width: int, depth: int, seed: int, projections: int) -> None:
+        if width < 2 or width & (width - 1):
+            raise ValueError("width must be a power of two >= 2")
+        if depth < 1:
+            raise ValueError("depth must be >= 1")
+        if projections < 1:
+            raise ValueError("projections must be >= 1")
+        self.width, self.depth, self.seed = width, depth, seed
+        self._shift = np.uint64(64 - (width.bit_length() - 1))
+        rng = np.random.default_rng(seed)
+        # multiply-shift 雜湊：每列一組 (a 為奇數, b)
+        self._a = rng.integers(0, 1 << 63, size=depth, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, size=depth, dtype=np.uint64)
+        self._salt = rng.integers(0, 1 << 63, size=projections, dtype=np.uint64)
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.proj = np.zeros(projections)
+        self.n = 0
+
+    def buckets(self, ids: np.ndarray) -> np.ndarray:
+        """各列的格子編號，形狀 (depth, len(ids))；uint64 乘法自然 mod 2^64"""
+        return ((ids[None, :] * self._a[:, None] + self._b[:, None]) >> self._shift).astype(np.intp)
+
+    def update_ids(self, ids: np.ndarray) -> None:
+        if ids.size == 0:
+            return
+        cols = self.buckets(ids)
+        if ids.shape[0] * _SMALL_BATCH_RATIO < self.width:
+            np.add.at(self.table, (np.arange(self.depth)[:, None], cols), 1)
+        else:
+            for r, col in enumerate(cols):
+                self.table[r] += np.bincount(col, minlength=self.width)
+        u, c = np.unique(ids, return_counts=True)
+        for b0 in range(0, u.shape[0], _PROJ_BLOCK):
+            self.proj += _skewed_stable(u[b0:b0 + _PROJ_BLOCK], self._salt) @ c[b0:b0 + _PROJ_BLOCK]
+        self.n += ids.shape[0]
+
+    def update(self, keys) -> None:
+        self.update_ids(_symbol_ids(keys))
+
+    def estimate(self, symbol) -> int:
+        """count-min 點查詢：真實次數的上界"""
+        col = self.buckets(np.array([_symbol_id(symbol)], dtype=np.uint64))[:, 0]
+        return int(self.table[np.arange(self.depth), col].min())
+
+    def merge(self, other: "_CountMin") -> None:
+        self.table += other.table
+        self.proj += other.proj
+        self.n += other.n
+
+    def distinct(self) -> int:
+        # 非零格數的最大值：不同符號數的下界
+        return int(np.count_nonzero(self.table, axis=1).max())
+
+    def entropy(self) -> float:
+        # 每列是雜湊後符號的直方圖，H(h(X)) <= H(X)：各列最大值是下界，碰撞少時幾乎就是 H
+        lower = max(_entropy_from_counts(row, self.n) for row in self.table)
+        # 碰撞造成的低估約為 (佔用格比例) * log 2；比投影草圖的標準差小就用各列的結果
+        occupied = np.count_nonzero(self.table, axis=1).max() / self.width
+        if occupied * math.log(2.0) <= math.sqrt(3.0 / self.proj.shape[0]):
+            return lower
+        y = self.proj / self.n
+        top = float(y.max())
+        est = -(top + math.log(float(np.mean(np.exp(y - top)))))
+        return max(lower, est)
+
+    def compatible(self, other) -> bool:
+        return (isinstance(other, _CountMin) and other.width == self.width and other.depth == self.depth
+                and other.seed == self.seed and other.proj.shape == self.proj.shape)
+
+
+def _make_counts(mode: Mode, size: Optional[int], width: int, depth: int, seed: int, projections: int):
+    if mode == "hash":
+        return _HashCounts()
+    if mode == "array":
+        if size is None:
+            raise ValueError("array mode needs the alphabet size")
+        return _ArrayCounts(size)
+    if mode == "sketch":
+        return _CountMin(width, depth, seed, projections)
+    raise ValueError("mode must be 'hash', 'array', or 'sketch'")
+
+
+def _as_batch(xs):
+    if isinstance(xs, np.ndarray):
+        return xs.reshape(-1)
+    return list(xs)
+
+
+class StreamingEntropy:
+    """
+    單一變數 X 的串流熵估計
+    mode="array" 需給 size（符號為 0..size-1）；mode="sketch" 用 width、depth、seed、projections
+    """
+
+    def __init__(self, mode: Mode = "hash", size: Optional[int] = None, width: int = 1 << 16,
+                 depth: int = 4, seed: int = 0, projections: int = 256) -> None:
+        self.mode = mode
+        self._counts = _make_counts(mode, size, width, depth, seed, projections)
+
+    @property
+    def n(self) -> int:
+        return self._counts.n
+
+    def add(self, x: Hashable) -> None:
+        self.update([x])
+
+    def update(self, xs: Iterable[Hashable]) -> None:
+        self._counts.update(_as_batch(xs))
+
+    def distinct(self) -> int:
+        """出現過的不同符號數（sketch 模式為下界）"""
+        return self._counts.distinct()
+
+    def entropy(self) -> float:
+        return self._counts.entropy()
+
+    def merge(self, other: "StreamingEntropy") -> "StreamingEntropy":
+        """把 other 的次數加進來（原地），回傳 self"""
+        if not isinstance(other, StreamingEntropy) or not self._counts.compatible(other._counts):
+            raise ValueError("cannot merge estimators with different mode or parameters")
+        self._counts.merge(other._counts)
+        return self
+
+    def __add__(self, other: "StreamingEntropy") -> "StreamingEntropy":
+        out = StreamingEntropy.__new__(StreamingEntropy)
+        out.mode = self.mode
+        out._counts = copy.deepcopy(self._counts)
+        return out.merge(other)
+
+
+class StreamingMutualInformation:
+    """
+    (x, y) 事件串流的 I(X;Y) 估計，同時維護 X、Y 與 (X, Y) 三個次數表
+    mode="array" 需給 size_x、size_y（聯合表為 size_x*size_y 的陣列，適合小字母集）；
+    mode="sketch" 的三個表共用 width、depth、projections（seed 各自錯開）；
+    三個熵各有約 sqrt(3 / projections) 的誤差，互資訊很小時要加大 projections
+    """
+
+    def __init__(self, mode: Mode = "hash", size_x: Optional[int] = None, size_y: Optional[int] = None,
+                 width: int = 1 << 16, depth: int = 4, seed: int = 0, projections: int = 256) -> None:
+        self.mode = mode
+        if mode == "array" and (size_x is None or size_y is None):
+            raise ValueError("array mode needs size_x and size_y")
+        self._size_y = size_y
+        self._x = _make_counts(mode, size_x, width, depth, seed, projections)
+        self._y = _make_counts(mode, size_y, width, depth, seed + 1, projections)
+        joint_size = size_x * size_y if mode == "array" else None
+        self._xy = _make_counts(mode, joint_size, width, depth, seed + 2, projections)
+
+    @property
+    def n(self) -> int:
+        return self._xy.n
+
+    def add(self, x: Hashable, y: Hashable) -> None:
+        self.update([x], [y])
+
+    def update(self, xs: Iterable[Hashable], ys: Iterable[Hashable]) -> None:
+        xs, ys = _as_batch(xs), _as_batch(ys)
+        if len(xs) != len(ys):
+            raise ValueError("xs and ys must have same length")
+        if self.mode == "array":
+            # 兩邊都檢查完才更新，任一邊超出範圍時三張表都不動
+            xa, ya = self._x.check(xs), self._y.check(ys)
+            if xa.size:
+                self._x.add_checked(xa)
+                self._y.add_checked(ya)
+                self._xy.add_checked(xa.astype(np.int64) * self._size_y + ya)
+        elif self.mode == "sketch":
+            ix, iy = _symbol_ids(xs), _symbol_ids(ys)
+            self._x.update_ids(ix)
+            self._y.update_ids(iy)
+            self._xy.update_ids(ix * _PAIR_MULT + iy)
+        else:
+            self._x.update(xs)
+            self._y.update(ys)
+            if isinstance(xs, np.ndarray) and isinstance(ys, np.ndarray) and xs.dtype == ys.dtype:
+                self._xy.update_pairs(xs, ys)
+            else:
+                self._xy.update(zip(xs.tolist() if isinstance(xs, np.ndarray) else xs,
+                                    ys.tolist() if isinstance(ys, np.ndarray) else ys))
+
+    def entropy_x(self) -> float:
+        return self._x.entropy()
+
+    def entropy_y(self) -> float:
+        return self._y.entropy()
+
+    def joint_entropy(self) -> float:
+        return self._xy.entropy()
+
+    def mutual_information(self) -> float:
+        """I(X;Y) = H(X) + H(Y) - H(X,Y)，O(不同符號數 + 不同配對數)"""
+        return max(0.0, self.entropy_x() + self.entropy_y() - self.joint_entropy())
+
+    def merge(self, other: "StreamingMutualInformation") -> "StreamingMutualInformation":
+        """把 other 的次數加進來（原地），回傳 self"""
+        if (not isinstance(other, StreamingMutualInformation) or not self._xy.compatible(other._xy)
+                or not self._x.compatible(other._x) or not self._y.compatible(other._y)):
+            raise ValueError("cannot merge estimators with different mode or parameters")
+        self._x.merge(other._x)
+        self._y.merge(other._y)
+        self._xy.merge(other._xy)
+        return self
+
+    def __add__(self, other: "StreamingMutualInformation") -> "StreamingMutualInformation":
+        out = StreamingMutualInformation.__new__(StreamingMutualInformation)
+        out.mode, out._size_y = self.mode, self._size_y
+        out._x, out._y, out._xy = (copy.deepcopy(c) for c in (self._x, self._y, self._xy))
+        return out.merge(other)
+
+
+if __name__ == "__main__":
+    import time
+
+    from info_arrays import mutual_information_array
+
+    rng = np.random.default_rng(0)
+    n = 1_000_000
+    x = rng.integers(0, 50, n)
+    y = (x + rng.integers(0, 5, n)) % 50   # y 與 x 相關
+
+    joint = np.zeros((50, 50))
+    np.add.at(joint, (x, y), 1.0)
+    print("table MI        =", float(mutual_information_array(joint)))
+
+    for mode, kw in (("array", {"size_x": 50, "size_y": 50}), ("hash", {}), ("sketch", {"width": 1 << 12})):
+        t0 = time.perf_counter()
+        est = StreamingMutualInformation(mode, **kw)
+        for k in range(0, n, 100_000):
+            est.update(x[k:k + 100_000], y[k:k + 100_000])
+        print(f"{mode:>6} MI     = {est.mutual_information()}  ({time.perf_counter() - t0:.3f}s)")
+
+    # 4 個 worker 各自累積，最後合併
+    parts = [StreamingEntropy("sketch", width=1 << 14) for _ in range(4)]
+    words = rng.zipf(1.3, size=400_000)
+    for k, part in enumerate(parts):
+        part.update(words[k::4])
+    merged = parts[0] + parts[1] + parts[2] + parts[3]
+    exact = StreamingEntropy("hash")
+    exact.update(words)
+    print("sketch H        =", merged.entropy(), " exact H =", exact.entropy(), " distinct =", exact.distinct())